@@ -0,0 +1,63 @@
+# corpus.py
+"""
+Acceso compartido al archivo unificado del Requerimiento 1
+(resultados/requerimiento1/resultados_unificados.ris) para las cinco pestañas.
+
+- Cada requerimiento pasa su propio lector (función ruta -> datos) a
+  load_corpus(project_root, lector); el resultado queda en st.cache_data.
+- La clave de la caché es (módulo.nombre del lector, ruta, versión). La versión es el hash SHA-1 del contenido;
+  el hash solo se recalcula cuando cambian el tamaño o la fecha de modificación del archivo.
+  Así el corpus se interpreta una vez por cambio (y no una vez por pestaña en cada
+  interacción), y reescribir el archivo con el mismo contenido no invalida nada.
+"""
+import os
+import hashlib
+import threading
+from typing import Any, Callable, Dict
+
+import streamlit as st
+
+UNIFIED_FILE = os.path.join("resultados", "requerimiento1", "resultados_unificados.ris")
+
+_versions: Dict[str, tuple] = {}
+_versions_lock = threading.Lock()
+
+
+def unified_path(project_root) -> str:
+    return os.path.join(str(project_root), UNIFIED_FILE)
+
+
+def corpus_exists(project_root) -> bool:
+    return os.path.exists(unified_path(project_root))
+
+
+def corpus_version(path: str) -> str:
+    """Hash del contenido; se reutiliza mientras tamaño y fecha de modificación no cambien"""
+    stat = os.stat(path)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    with _versions_lock:
+        cached = _versions.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(block)
+    version = sha1.hexdigest()
+    with _versions_lock:
+        _versions[path] = (signature, version)
+    return version
+
+
+@st.cache_data(max_entries=8, show_spinner="Leyendo el archivo unificado...")
+def _load(loader_name: str, path: str, version: str, _loader: Callable[[str], Any]):
+    return _loader(path)
+
+
+def load_corpus(project_root, loader: Callable[[str], Any]):
+    """Resultado de loader(ruta del archivo unificado), en caché hasta que cambie el archivo"""
+    path = unified_path(project_root)
+    if not os.path.exists(path):
+        raise FileNotFoundError("No se encontró el archivo unificado. Ejecuta primero el Requerimiento 1.")
+    return _load(f"{loader.__module__}.{loader.__qualname__}", path, corpus_version(path), loader)
@@ -1,5 +1,6 @@
 import subprocess
 import os
+import re
 from datetime import datetime
 
 def get_project_root():
@@ -80,6 +81,10 @@ def parsear_ris(contenido: str) -> list:
                 registro_actual['language'] = valor
             elif campo == 'N1':
                 registro_actual['notes'] = valor
+            elif campo == 'C1':
+                registro_actual['citations'] = valor
+            elif campo == 'C2':
+                registro_actual['versions'] = valor
     
     return registros
 
@@ -113,6 +118,13 @@ def cargar_resultados() -> list:
     
     return resultados
 
+def extraer_numero(valor) -> str:
+    """Primer número entero de un campo ('Citado por 1.234' -> '1234'); '' si no hay"""
+    coincidencia = re.search(r'\d[\d.,]*', str(valor or ''))
+    if not coincidencia:
+        return ''
+    return re.sub(r'[.,]', '', coincidencia.group())
+
 def limpiar_datos(item: dict) -> dict:
     """Normaliza y limpia los datos del registro"""
     cleaned = {
@@ -129,6 +141,8 @@ def limpiar_datos(item: dict) -> dict:
         'issue': item.get('issue', ''),
         'pages': item.get('pages', ''),
         'language': item.get('language', ''),
+        'citations': extraer_numero(item.get('citations')),
+        'versions': extraer_numero(item.get('versions')),
         'fuente': item.get('fuente', '')
     }
     
@@ -145,7 +159,7 @@ def identificar_duplicados(resultados: list) -> tuple:
     """Identifica registros duplicados basados en título, autores y año"""
     registros_unicos = []
     registros_duplicados = []
-    claves_vistas = set()
+    claves_vistas = {}
     
     for registro in resultados:
         registro_limpio = limpiar_datos(registro)
@@ -158,9 +172,15 @@ def identificar_duplicados(resultados: list) -> tuple:
         )
         
         if clave not in claves_vistas:
-            claves_vistas.add(clave)
+            claves_vistas[clave] = registro_limpio
             registros_unicos.append(registro_limpio)
         else:
+            # El registro conservado se queda con el mayor conteo de citas/versiones
+            unico = claves_vistas[clave]
+            for campo in ('citations', 'versions'):
+                valores = [int(v) for v in (unico[campo], registro_limpio[campo]) if v]
+                if valores:
+                    unico[campo] = str(max(valores))
             registros_duplicados.append(registro_limpio)
     
     return registros_unicos, registros_duplicados
@@ -201,6 +221,8 @@ def generar_registro_ris(item: dict) -> str:
     if item.get('issue'): ris += f"IS  - {item['issue']}\n"
     if item.get('pages'): ris += f"SP  - {item['pages']}\n"
     if item.get('language'): ris += f"LA  - {item['language']}\n"
+    if item.get('citations'): ris += f"C1  - {item['citations']}\n"
+    if item.get('versions'): ris += f"C2  - {item['versions']}\n"
     if item.get('fuente'): ris += f"N1  - Fuente: {item['fuente']}\n"
     
     ris += "ER  -\n\n"
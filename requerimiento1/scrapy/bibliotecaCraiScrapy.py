@@ -341,6 +341,8 @@ class GoogleLoginBibliometricSpider(scrapy.Spider):
             f"N2  - {item.get('summary', '')}\n"
             f"AB  - {item.get('abstract', '')}\n"
             f"UR  - {item.get('url', '')}\n"
+            f"C1  - {item.get('citations', '')}\n"
+            f"C2  - {item.get('versions', '')}\n"
             "ER  -\n\n"
         )
         return ris
@@ -355,7 +357,9 @@ class GoogleLoginBibliometricSpider(scrapy.Spider):
             f"  journal={{ {item.get('source', '')} }},\n"
             f"  publisher={{ {item.get('publisher', '')} }},\n"
             f"  abstract={{ {item.get('abstract', '')} }},\n"
-            f"  url={{ {item.get('url', '')} }}\n"
+            f"  url={{ {item.get('url', '')} }},\n"
+            f"  citations={{ {item.get('citations', '')} }},\n"
+            f"  versions={{ {item.get('versions', '')} }}\n"
             "}}\n\n"
         )
         return bib
\ No newline at end of file
@@ -197,6 +197,8 @@ class BibliometricSpider(scrapy.Spider):
             f"PB  - {item.get('publisher', '')}\n"
             f"N2  - {item.get('summary', '')}\n"
             f"AB  - {item.get('abstract', '')}\n"
+            f"C1  - {item.get('citations', '')}\n"
+            f"C2  - {item.get('versions', '')}\n"
             f"ER  -\n\n"
         )
         return ris
@@ -210,7 +212,9 @@ class BibliometricSpider(scrapy.Spider):
             f"  journal={{ {item.get('source', '')} }},\n"
             f"  publisher={{ {item.get('publisher', '')} }},\n"
             f"  summary={{ {item.get('summary', '')} }},\n"
-            f"  abstract={{ {item.get('abstract', '')} }}\n"
+            f"  abstract={{ {item.get('abstract', '')} }},\n"
+            f"  citations={{ {item.get('citations', '')} }},\n"
+            f"  versions={{ {item.get('versions', '')} }}\n"
             "}\n\n"
         )
         return bib
\ No newline at end of file
@@ -0,0 +1,130 @@
+# benchmark_embeddings.py
+"""
+Benchmark de los backends de embeddings SBERT sobre los abstracts del archivo unificado.
+
+Para cada backend mide el throughput (textos/segundo) y la deriva respecto al camino
+original SentenceTransformer.encode ('torch'):
+- coseno medio y mínimo entre el embedding de cada texto y su referencia
+- diferencia máxima y media en la matriz de similitud coseno
+
+Uso:
+    python requerimiento2/benchmark_embeddings.py --backends torch int8 onnx onnx-int8 --n 500
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from requerimiento2 import embeddings as sbert_embeddings
+from requerimiento2.requerimiento2_similitud import load_unified_ris, normalize_text
+
+
+def _normalize_rows(m):
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return m / norms
+
+
+def benchmark_backend(texts, backend, batch_size=32, repeats=3):
+    """Codifica `texts` con el backend dado y devuelve embeddings y tiempos"""
+    load_start = time.perf_counter()
+    sbert_embeddings.get_model(sbert_embeddings.DEFAULT_MODEL, backend)
+    load_time = time.perf_counter() - load_start
+
+    # Calentamiento (primeras inferencias incluyen inicialización de kernels)
+    sbert_embeddings.encode(texts[:batch_size], backend=backend, batch_size=batch_size)
+
+    times = []
+    embeddings = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        embeddings = sbert_embeddings.encode(texts, backend=backend, batch_size=batch_size)
+        times.append(time.perf_counter() - start)
+
+    best = min(times)
+    return embeddings, {
+        'backend': backend,
+        'load_seconds': round(load_time, 3),
+        'encode_seconds': round(best, 3),
+        'texts_per_second': round(len(texts) / best, 1) if best > 0 else None,
+    }
+
+
+def similarity_drift(reference, candidate):
+    """Compara embeddings de un backend contra los de referencia"""
+    ref = _normalize_rows(reference.astype(np.float64))
+    cand = _normalize_rows(candidate.astype(np.float64))
+    row_cos = np.sum(ref * cand, axis=1)
+    sim_diff = np.abs(ref @ ref.T - cand @ cand.T)
+    return {
+        'mean_row_cosine': round(float(row_cos.mean()), 6),
+        'min_row_cosine': round(float(row_cos.min()), 6),
+        'max_similarity_diff': round(float(sim_diff.max()), 6),
+        'mean_similarity_diff': round(float(sim_diff.mean()), 6),
+    }
+
+
+def run_benchmark(texts, backends, batch_size=32, repeats=3):
+    results = []
+    reference = None
+    for backend in backends:
+        try:
+            embeddings, stats = benchmark_backend(texts, backend, batch_size, repeats)
+        except ImportError as e:
+            print(f" Backend {backend} no disponible: {e}")
+            continue
+        if reference is None:
+            reference = embeddings
+            stats['reference'] = backend
+        stats.update(similarity_drift(reference, embeddings))
+        results.append(stats)
+        print(f" {backend:10s} {stats['texts_per_second']:>8} textos/s  "
+              f"coseno medio {stats['mean_row_cosine']:.4f}  max |ΔS| {stats['max_similarity_diff']:.4f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de backends de embeddings SBERT")
+    parser.add_argument('--backends', nargs='+', default=list(sbert_embeddings.BACKENDS),
+                        help="Backends a comparar; el primero se usa como referencia")
+    parser.add_argument('--n', type=int, default=None, help="Número máximo de abstracts")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    unified_path = os.path.join(project_root, "resultados", "requerimiento1", "resultados_unificados.ris")
+    if not os.path.exists(unified_path):
+        print("No se encontró el archivo unificado. Ejecuta primero el Requerimiento 1.")
+        return
+
+    df = load_unified_ris(unified_path)
+    texts = [normalize_text(ab or ti) for ab, ti in zip(df['AB'], df['TI']) if (ab or ti)]
+    if args.n:
+        texts = texts[:args.n]
+
+    print("=== Benchmark de embeddings SBERT ===")
+    print(f"Textos: {len(texts)}  batch_size: {args.batch_size}\n")
+    results = run_benchmark(texts, args.backends, args.batch_size, args.repeats)
+
+    output_dir = os.path.join(project_root, "resultados", "requerimiento2")
+    os.makedirs(output_dir, exist_ok=True)
+    out_path = os.path.join(output_dir, "benchmark_embeddings.json")
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'n_texts': len(texts),
+            'batch_size': args.batch_size,
+            'results': results
+        }, f, indent=2)
+    print(f"\nResultados guardados en {out_path}")
+
+
+if __name__ == "__main__":
+    main()
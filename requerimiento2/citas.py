@@ -0,0 +1,96 @@
+# citas.py
+"""
+Analítica de citas sobre el corpus unificado (campos RIS C1 = citas, C2 = versiones).
+
+Todo se calcula con operaciones columnares de pandas (sort + groupby), sin recorrer filas:
+- h-index: mayor h tal que h artículos del grupo tienen al menos h citas.
+- g-index: mayor g tal que los g artículos más citados suman al menos g² citas
+  (acotado al número de artículos del grupo).
+- Percentiles de la distribución de citas y listas de los artículos más citados.
+Los grupos pueden ser autores (formato largo, un autor por fila) o revistas/venues.
+"""
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from requerimiento2.coautoria import split_authors, normalize_author_names
+
+PERCENTILES = (50, 75, 90, 95, 99)
+
+
+def to_numeric_counts(values: pd.Series) -> pd.Series:
+    """Convierte un campo de conteo ('1.234', 'Citado por 12', '12.0', '') a número; vacío -> NaN"""
+    digits = values.astype(str).str.extract(r'(\d[\d.,]*)', expand=False).str.rstrip('.,')
+    # Solo se quitan separadores de miles ("1.234", "12,345,678"); "12.0" sigue siendo 12
+    thousands = digits.str.fullmatch(r'\d{1,3}(?:\.\d{3})+|\d{1,3}(?:,\d{3})+').fillna(False)
+    digits = digits.where(~thousands, digits.str.replace(r'[.,]', '', regex=True)).str.replace(',', '.', regex=False)
+    return pd.to_numeric(digits, errors='coerce')
+
+
+def impact_by_group(df: pd.DataFrame, group_col: str, citations_col: str = 'citations') -> pd.DataFrame:
+    """
+    Artículos, citas totales, media, máximo, h-index y g-index por grupo.
+    Solo cuentan los artículos con conteo de citas conocido.
+    """
+    data = df[[group_col, citations_col]].dropna()
+    data = data[data[group_col].astype(str).str.strip() != '']
+    if data.empty:
+        return pd.DataFrame(columns=[group_col, 'papers', 'total_citations', 'mean_citations',
+                                     'max_citations', 'h_index', 'g_index'])
+
+    data = data.sort_values([group_col, citations_col], ascending=[True, False])
+    grouped = data.groupby(group_col, sort=False)[citations_col]
+    rank = grouped.cumcount() + 1
+    cumulative = grouped.cumsum()
+
+    h = rank.where(data[citations_col] >= rank, 0).groupby(data[group_col]).max()
+    g = rank.where(cumulative >= rank ** 2, 0).groupby(data[group_col]).max()
+
+    stats = grouped.agg(papers='size', total_citations='sum', mean_citations='mean', max_citations='max')
+    stats['h_index'] = h
+    stats['g_index'] = g
+    stats['mean_citations'] = stats['mean_citations'].round(2)
+    return (stats.reset_index()
+            .sort_values(['h_index', 'total_citations'], ascending=False)
+            .reset_index(drop=True))
+
+
+def author_long_format(df: pd.DataFrame, authors_col: str = 'AU', citations_col: str = 'citations') -> pd.DataFrame:
+    """Una fila por (artículo, autor) con las citas del artículo y el nombre normalizado"""
+    long = split_authors(df[authors_col])
+    long['author'] = normalize_author_names(long['author_raw'])
+    long = long[long['author'] != ''].drop_duplicates(['paper', 'author'])
+    long[citations_col] = df[citations_col].reset_index(drop=True).to_numpy()[long['paper'].to_numpy()]
+    return long
+
+
+def citation_percentiles(citations: pd.Series, percentiles: Sequence[int] = PERCENTILES) -> Dict[str, float]:
+    values = citations.dropna()
+    if values.empty:
+        return {}
+    result = {f'p{p}': float(np.percentile(values, p)) for p in percentiles}
+    result.update({'mean': round(float(values.mean()), 2), 'max': float(values.max()),
+                   'uncited_share': round(float((values == 0).mean()), 4), 'n_with_counts': int(len(values))})
+    return result
+
+
+def top_cited(df: pd.DataFrame, n: int = 15, citations_col: str = 'citations',
+              columns: Sequence[str] = ('TI', 'first_author', 'year', 'journal')) -> pd.DataFrame:
+    cols = [c for c in columns if c in df.columns] + [citations_col]
+    return df.dropna(subset=[citations_col]).nlargest(n, citations_col)[cols].reset_index(drop=True)
+
+
+def citation_report(df: pd.DataFrame, authors_col: str = 'AU', venue_col: str = 'journal',
+                    citations_col: str = 'citations', top_n: int = 15) -> Dict:
+    """Resumen completo: percentiles, más citados e impacto por autor y por venue"""
+    report = {
+        'percentiles': citation_percentiles(df[citations_col]),
+        'top_cited': top_cited(df, top_n, citations_col),
+    }
+    if authors_col in df.columns:
+        report['author_impact'] = impact_by_group(author_long_format(df, authors_col, citations_col),
+                                                  'author', citations_col).head(top_n)
+    if venue_col in df.columns:
+        report['venue_impact'] = impact_by_group(df, venue_col, citations_col).head(top_n)
+    return report
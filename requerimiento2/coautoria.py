@@ -0,0 +1,198 @@
+# coautoria.py
+"""
+Red de co-autoría a partir de los campos AU del archivo unificado.
+
+- Los autores de cada registro se separan y normalizan con operaciones vectorizadas de
+  pandas (sin acentos, minúsculas, forma "apellido inicial"); cada nombre normalizado
+  recibe un ID entero (pd.factorize) y se conserva la forma original más frecuente.
+- B: matriz dispersa de incidencia artículos x autores (CSR, binaria).
+- A = Bᵀ·B: en la diagonal, artículos por autor; fuera de ella, artículos en común
+  (peso de la arista de co-autoría).
+- Centralidades sobre el grafo disperso: grado y grado ponderado directo de A,
+  componentes conexas y vector propio con scipy, intermediación (betweenness) con
+  networkx muestreando k nodos fuente cuando la red es grande.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse import csgraph
+from scipy.sparse.linalg import eigsh
+
+AUTHOR_SEPARATORS = r'\s*;\s*|\s+and\s+|\s*&\s*'
+# Parte que solo contiene iniciales ("J.", "JA", "A. M.", "J.-P."): completa un "Apellido, Iniciales"
+INITIALS = r'(?:[A-ZÀ-Ý]\.?[\s-]*){1,4}'
+# Nombre ya completo en forma "Iniciales Apellido" ("L Banh", "P.G. Naik")
+INITIALS_SURNAME = r'(?:(?:[A-ZÀ-Ý]\.?){1,3}[\s-]+)+\S{2,}.*'
+
+
+def split_authors(authors: pd.Series) -> pd.DataFrame:
+    """
+    Formato largo (paper, author_raw): una fila por autor de cada registro.
+    Acepta cadenas ("A; B", "A and B", "J Smith, A Doe") o listas (varias líneas AU).
+    Las comas separan autores, salvo cuando lo que sigue a la coma son solo iniciales:
+    "Smith, J., Doe, A." -> "Smith, J." y "Doe, A.".
+    """
+    authors = authors.reset_index(drop=True)
+    joined = authors.map(lambda v: '; '.join(map(str, v)) if isinstance(v, (list, tuple)) else v)
+    pieces = (joined.fillna('').astype(str)
+              .str.split(AUTHOR_SEPARATORS, regex=True)
+              .explode()
+              .str.strip())
+    pieces = pieces[pieces != '']
+    papers = pieces.index.to_numpy(dtype=np.int64)
+
+    # Cada pieza se parte por comas (índice = número de pieza)
+    parts = pd.Series(pieces.to_numpy(), dtype=object).str.split(',').explode().str.strip()
+    parts = parts[parts != '']
+    piece = parts.index.to_numpy(dtype=np.int64)
+    starts = np.ones(len(piece), dtype=bool)
+    starts[1:] = piece[1:] != piece[:-1]
+    # Las iniciales se pegan a la parte anterior de la misma pieza si esta es solo un apellido
+    # ("Smith, J."); tras un nombre completo ("L Banh, X Y") son otro autor
+    complete = parts.str.fullmatch(INITIALS_SURNAME).fillna(False).to_numpy(dtype=bool)
+    after_complete = np.zeros(len(piece), dtype=bool)
+    after_complete[1:] = complete[:-1]
+    attach = parts.str.fullmatch(INITIALS).fillna(False).to_numpy(dtype=bool) & ~starts & ~after_complete
+    name_id = np.cumsum(~attach) - 1
+    names = parts.groupby(name_id).agg(', '.join)
+    return pd.DataFrame({'paper': papers[piece[~attach]], 'author_raw': names.to_numpy()})
+
+
+def normalize_author_names(names: pd.Series) -> pd.Series:
+    """
+    Clave normalizada "apellido inicial" (sin acentos ni puntuación):
+    "García-López, A. M." y "Ana Garcia-Lopez" -> "garcia lopez a"
+    Solo se lee "X, Y" como "apellido, nombres" cuando Y son iniciales (como en split_authors).
+    """
+    s = (names.astype(str)
+         .str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii'))
+    after_comma = s.str.split(',', n=1).str[1].fillna('').str.strip()
+    has_comma = after_comma.str.fullmatch(INITIALS).fillna(False)
+    s = (s.str.lower()
+         .str.replace(r'[^a-z,\s-]', ' ', regex=True)
+         .str.replace(r'\s+', ' ', regex=True)
+         .str.strip(' ,'))
+
+    # "apellido, iniciales"
+    last_c = s.str.split(',', n=1).str[0].str.strip()
+    first_c = s.str.split(',', n=1).str[1].fillna('').str.strip()
+    # "nombres apellido" (una coma que no precede a iniciales se trata como espacio)
+    s = s.str.replace(r'\s*,\s*', ' ', regex=True)
+    last_s = s.str.rsplit(' ', n=1).str[-1]
+    first_s = s.str.rsplit(' ', n=1).str[0].where(s.str.contains(' ', regex=False), '')
+
+    last = last_c.where(has_comma, last_s)
+    first = first_c.where(has_comma, first_s)
+    initial = first.str[:1].fillna('')
+    # Apellidos compuestos con guion equivalen a separados por espacio
+    return (last.str.replace('-', ' ', regex=False) + ' ' + initial).str.strip()
+
+
+class CoauthorshipNetwork:
+    def __init__(self, incidence: sparse.csr_matrix, names: np.ndarray, keys: np.ndarray):
+        self.B = incidence
+        self.names = names
+        self.keys = keys
+        self.A = (self.B.T @ self.B).tocsr()
+
+    @classmethod
+    def from_authors(cls, authors: pd.Series) -> 'CoauthorshipNetwork':
+        """Construye la red desde la columna de autores (una entrada por artículo)"""
+        n_papers = len(authors)
+        long = split_authors(authors)
+        long['key'] = normalize_author_names(long['author_raw'])
+        long = long[long['key'] != '']
+
+        # Tabla de IDs: una entrada por nombre normalizado
+        author_ids, keys = pd.factorize(long['key'])
+        long['author_id'] = author_ids
+        long = long.drop_duplicates(['paper', 'author_id'])
+        names = (long.groupby(['author_id', 'author_raw']).size()
+                 .sort_values(ascending=False)
+                 .reset_index()
+                 .drop_duplicates('author_id')
+                 .set_index('author_id')['author_raw']
+                 .reindex(range(len(keys))).to_numpy())
+
+        data = np.ones(len(long), dtype=np.int32)
+        B = sparse.csr_matrix((data, (long['paper'].to_numpy(), long['author_id'].to_numpy())),
+                              shape=(n_papers, len(keys)), dtype=np.int32)
+        return cls(B, names, np.asarray(keys))
+
+    @property
+    def n_authors(self) -> int:
+        return self.A.shape[0]
+
+    @property
+    def papers_per_author(self) -> np.ndarray:
+        return self.A.diagonal()
+
+    def adjacency(self, min_weight: int = 1) -> sparse.csr_matrix:
+        """Matriz de adyacencia sin diagonal, solo aristas con al menos min_weight artículos en común"""
+        adj = self.A.copy()
+        adj.setdiag(0)
+        if min_weight > 1:
+            adj.data[adj.data < min_weight] = 0
+        adj.eliminate_zeros()
+        return adj
+
+    def edges(self, min_weight: int = 1):
+        """Aristas (i, j, peso) con i < j"""
+        upper = sparse.triu(self.adjacency(min_weight), k=1).tocoo()
+        return [(int(i), int(j), float(w)) for i, j, w in zip(upper.row, upper.col, upper.data)]
+
+    def centralities(self, betweenness_k: Optional[int] = 200, seed: int = 42) -> pd.DataFrame:
+        """
+        Tabla de centralidades por autor. La intermediación es exacta hasta betweenness_k
+        autores; por encima se estima con k nodos fuente (networkx).
+        """
+        adj = self.adjacency()
+        n = self.n_authors
+        degree = np.diff(adj.indptr)
+        strength = np.asarray(adj.sum(axis=1)).ravel()
+        _, component = csgraph.connected_components(adj, directed=False)
+
+        eigenvector = np.zeros(n)
+        if n > 2 and adj.nnz:
+            try:
+                _, vec = eigsh(adj.astype(np.float64), k=1, which='LA')
+                eigenvector = np.abs(vec[:, 0])
+            except Exception:
+                pass
+
+        betweenness = np.zeros(n)
+        if adj.nnz:
+            import networkx as nx
+            G = nx.from_scipy_sparse_array(adj)
+            k = betweenness_k if betweenness_k is not None and n > betweenness_k else None
+            bc = nx.betweenness_centrality(G, k=k, normalized=True, seed=seed)
+            betweenness = np.array([bc[i] for i in range(n)])
+
+        return pd.DataFrame({
+            'author': self.names,
+            'key': self.keys,
+            'papers': self.papers_per_author,
+            'coauthors': degree,
+            'collaborations': strength,
+            'degree_centrality': degree / max(n - 1, 1),
+            'betweenness': betweenness,
+            'eigenvector': eigenvector,
+            'component': component,
+        }).sort_values(['papers', 'coauthors'], ascending=False).reset_index(drop=True)
+
+    def summary(self) -> Dict:
+        adj = self.adjacency()
+        n_components, labels = csgraph.connected_components(adj, directed=False)
+        sizes = np.bincount(labels) if self.n_authors else np.zeros(0, dtype=np.int64)
+        n_edges = adj.nnz // 2
+        return {
+            'n_papers': self.B.shape[0],
+            'n_authors': self.n_authors,
+            'n_edges': int(n_edges),
+            'density': float(2 * n_edges / (self.n_authors * (self.n_authors - 1))) if self.n_authors > 1 else 0.0,
+            'n_components': int(n_components),
+            'largest_component': int(sizes.max()) if len(sizes) else 0,
+            'mean_authors_per_paper': float(np.diff(self.B.indptr).mean()) if self.B.shape[0] else 0.0,
+        }
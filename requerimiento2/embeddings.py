@@ -0,0 +1,84 @@
+# embeddings.py
+"""
+Backends de inferencia para los embeddings de oraciones (SBERT) usados en
+requerimiento2 (sbert_similarity) y requerimiento4 (create_sbert_embeddings).
+
+Backends disponibles:
+- 'torch'     : SentenceTransformer.encode tal cual (comportamiento original)
+- 'int8'      : mismo modelo con cuantización dinámica int8 de las capas Linear (solo CPU)
+- 'onnx'      : modelo exportado a ONNX ejecutado con onnxruntime
+- 'onnx-int8' : variante ONNX cuantizada int8 publicada junto al modelo
+
+Los backends ONNX requieren `pip install optimum[onnxruntime]` (sentence-transformers >= 3.2).
+El backend se elige con el parámetro `backend` o con la variable de entorno SBERT_BACKEND.
+"""
+import os
+import platform
+from typing import List, Optional
+
+import numpy as np
+
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+BACKENDS = ('torch', 'int8', 'onnx', 'onnx-int8')
+
+# Archivos ONNX cuantizados que acompañan a los modelos sentence-transformers en el Hub
+_ONNX_INT8_FILES = {
+    'arm64': 'onnx/model_qint8_arm64.onnx',
+    'aarch64': 'onnx/model_qint8_arm64.onnx',
+}
+_ONNX_INT8_DEFAULT = 'onnx/model_quint8_avx2.onnx'
+
+# Modelos cargados, uno por (nombre, backend)
+_models = {}
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Devuelve el backend a usar: el indicado, el de SBERT_BACKEND o 'torch'"""
+    backend = (backend or os.environ.get('SBERT_BACKEND', 'torch')).strip().lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de embeddings no soportado: {backend}. Use uno de {BACKENDS}")
+    return backend
+
+
+def _load_model(name: str, backend: str):
+    from sentence_transformers import SentenceTransformer
+
+    if backend == 'torch':
+        return SentenceTransformer(name)
+
+    if backend == 'int8':
+        import torch
+        model = SentenceTransformer(name, device='cpu')
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    if backend == 'onnx':
+        return SentenceTransformer(name, device='cpu', backend='onnx')
+
+    # onnx-int8
+    file_name = _ONNX_INT8_FILES.get(platform.machine().lower(), _ONNX_INT8_DEFAULT)
+    return SentenceTransformer(name, device='cpu', backend='onnx', model_kwargs={'file_name': file_name})
+
+
+def get_model(name: str = DEFAULT_MODEL, backend: Optional[str] = None):
+    """Carga (una sola vez por proceso) el modelo para el backend pedido"""
+    backend = resolve_backend(backend)
+    key = (name, backend)
+    if key not in _models:
+        _models[key] = _load_model(name, backend)
+    return _models[key]
+
+
+def encode(texts: List[str], model_name: str = DEFAULT_MODEL, backend: Optional[str] = None,
+           batch_size: int = 32) -> np.ndarray:
+    """
+    Codifica una lista de textos y devuelve una matriz (n, dim) float32.
+    SentenceTransformer.encode ordena los textos por longitud antes de armar los lotes
+    (sorted-length batching) y restaura el orden original, así el padding por lote es mínimo
+    en todos los backends.
+    """
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    model = get_model(model_name, backend)
+    embeddings = model.encode(texts, batch_size=batch_size, show_progress_bar=False, convert_to_numpy=True)
+    return np.asarray(embeddings, dtype=np.float32)
@@ -2,6 +2,8 @@ import streamlit as st
 import os
 import pandas as pd
 from requerimiento2.requerimiento2_similitud import load_unified_ris, compute_similarities, save_sim_results
+from requerimiento2.tfidf_corpus import get_corpus_tfidf
+from requerimiento1.corpus import load_corpus
 
 def mostrar_requerimiento_2(project_root):
     st.markdown('<div class="requirement-title">Requerimiento 2: Similitud Textual</div>', unsafe_allow_html=True)
@@ -13,7 +15,7 @@ def mostrar_requerimiento_2(project_root):
         st.warning("⚠️ No se encontró el archivo unificado de Requerimiento 1. Ejecútalo primero.")
         return
 
-    df = load_unified_ris(unified_path)
+    df = load_corpus(project_root, load_unified_ris)
     titles = df['TI'].fillna('Sin título').tolist()
 
     st.subheader("Selecciona artículos para comparar:")
@@ -46,10 +48,24 @@ def mostrar_requerimiento_2(project_root):
     }
     selected_methods = [method_map[m] for m in friendly_methods]
 
+    # --- backend de inferencia para SBERT (CPU: int8 / ONNX son más rápidos) ---
+    sbert_backend = None
+    if 'sbert' in selected_methods:
+        sbert_backend = st.selectbox(
+            "Backend de inferencia SBERT:",
+            ['torch', 'int8', 'onnx', 'onnx-int8'],
+            index=0,
+            help="int8 y ONNX aceleran la codificación en servidores solo-CPU"
+        )
+
     if st.button("🔍 Calcular similitud"):
         with st.spinner("Calculando similitudes..."):
             # 1️⃣ CALCULO DE SIMILITUD
-            results = compute_similarities(texts, selected_methods)
+            tfidf_model = None
+            if 'tfidf' in selected_methods:
+                # Modelo TF-IDF del corpus completo: se ajusta una vez por versión del archivo unificado
+                tfidf_model = get_corpus_tfidf(project_root)
+            results = compute_similarities(texts, selected_methods, sbert_backend=sbert_backend, tfidf_model=tfidf_model)
             
             # 2️⃣ VISUALIZACIÓN DE RESULTADOS (AGREGAR AQUÍ)
             # ================================================
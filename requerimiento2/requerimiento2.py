@@ -1,20 +1,61 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-from collections import defaultdict
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import json
 from pathlib import Path
+
+from requerimiento2.citas import citation_report, to_numeric_counts
+from requerimiento2.coautoria import split_authors, normalize_author_names
+
+def _chart_hash(spec):
+    """Hash de la serie de entrada y de los textos/opciones del gráfico"""
+    digest = hashlib.sha1()
+    digest.update(pd.util.hash_pandas_object(spec['data'], index=True).to_numpy().tobytes())
+    if isinstance(spec['data'], pd.DataFrame):
+        digest.update(repr(list(spec['data'].columns)).encode('utf-8'))
+    digest.update(repr((spec['kind'], spec['title'], spec['xlabel'], spec['ylabel'],
+                        sorted(spec['options'].items()))).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _render_chart(spec):
+    """Dibuja un gráfico con la API orientada a objetos (sin estado global de pyplot)"""
+    fig = Figure(figsize=(8, 8) if spec['kind'] == 'pie' else (12, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    spec['data'].plot(kind=spec['kind'], ax=ax, **spec['options'])
+    ax.set_title(spec['title'])
+    if spec['xlabel'] is not None:
+        ax.set_xlabel(spec['xlabel'])
+    ax.set_ylabel(spec['ylabel'])
+    if spec['kind'] == 'barh':
+        ax.invert_yaxis()
+    if spec['options'].get('stacked'):
+        ax.legend(title='Tipo')
+    fig.tight_layout()
+    fig.savefig(spec['path'])
+    return spec['path']
+
+
 class BibliometricAnalyzer:
     def __init__(self, unified_file_path):
         self.unified_file_path = unified_file_path
         self.df = None
+        self.authors = None
         self.results = {
             'top_authors': None,
             'publications_by_year_type': None,
             'publication_types': None,
             'top_journals': None,
-            'top_publishers': None
+            'top_publishers': None,
+            'author_stats': None,
+            'author_productivity': None,
+            'citations': None
         }
 
     def load_data(self):
@@ -115,16 +156,15 @@ class BibliometricAnalyzer:
         if 'type' in self.df.columns:
             self.df['type'] = self.df['type'].map(lambda x: type_mapping.get(x, x.lower()))
 
-        if 'AU' in self.df.columns:
-            self.df['first_author'] = self.df['AU'].apply(self._extract_first_author)
-        elif 'author' in self.df.columns:
-            self.df['first_author'] = self.df['author'].apply(self._extract_first_author)
-
         if 'PY' in self.df.columns:
             self.df['year'] = pd.to_numeric(self.df['PY'], errors='coerce')
         elif 'year' in self.df.columns:
             self.df['year'] = pd.to_numeric(self.df['year'], errors='coerce')
 
+        self.authors = self._build_author_table()
+        first = self.authors[self.authors['position'] == 0].set_index('paper')['author_raw']
+        self.df['first_author'] = first.reindex(range(len(self.df))).fillna('').to_numpy()
+
         if 'JO' in self.df.columns:
             self.df['journal'] = self.df['JO']
         elif 'journal' not in self.df.columns:
@@ -135,26 +175,84 @@ class BibliometricAnalyzer:
         elif 'publisher' not in self.df.columns:
             self.df['publisher'] = ''
 
-    def _extract_first_author(self, authors):
-        if pd.isna(authors) or not authors:
-            return ''
-        if isinstance(authors, list):
-            authors = '; '.join(authors)
-        if ';' in authors:
-            return authors.split(';')[0].strip()
-        elif ' and ' in authors:
-            return authors.split(' and ')[0].strip()
-        elif ',' in authors:
-            parts = authors.split(',')
-            return f"{parts[0].strip()}, {parts[1].strip().split()[0]}" if len(parts) > 1 else authors.strip()
-        else:
-            return authors.strip()
+        # Citas (C1) y versiones (C2) como columnas numéricas
+        for tag, column in (('C1', 'citations'), ('C2', 'versions')):
+            if tag in self.df.columns:
+                self.df[column] = to_numeric_counts(self.df[tag])
+            elif column in self.df.columns:
+                self.df[column] = to_numeric_counts(self.df[column])
+            else:
+                self.df[column] = np.nan
+
+    def _build_author_table(self):
+        """
+        Tabla larga (una fila por artículo-autor) con separación vectorizada de AU:
+        posición del autor, número de autores del artículo, clave normalizada y año.
+        """
+        authors_col = 'AU' if 'AU' in self.df.columns else 'author' if 'author' in self.df.columns else None
+        if authors_col is None:
+            return pd.DataFrame(columns=['paper', 'author_raw', 'author', 'position', 'n_authors', 'year'])
+
+        long = split_authors(self.df[authors_col])
+        long['author'] = normalize_author_names(long['author_raw'])
+        long = long[long['author'] != ''].drop_duplicates(['paper', 'author'])
+        long['position'] = long.groupby('paper').cumcount()
+        long['n_authors'] = long.groupby('paper')['paper'].transform('size')
+        long['year'] = self.df['year'].to_numpy()[long['paper'].to_numpy()] if 'year' in self.df.columns else np.nan
+        return long.reset_index(drop=True)
+
+    def author_statistics(self):
+        """
+        Conteos por autor: completo (un punto por artículo), fraccionario (1/n autores),
+        como primer autor y rango de años activos.
+        """
+        long = self.authors
+        if long is None or long.empty:
+            return pd.DataFrame(columns=['author', 'full_count', 'fractional_count', 'first_author_count',
+                                         'first_year', 'last_year'])
+
+        # Nombre a mostrar: la variante original más frecuente de cada autor normalizado
+        display = (long.groupby(['author', 'author_raw']).size()
+                   .sort_values(ascending=False).reset_index()
+                   .drop_duplicates('author').set_index('author')['author_raw'])
+
+        stats = long.assign(
+            fraction=1.0 / long['n_authors'],
+            is_first=(long['position'] == 0).astype(int)
+        ).groupby('author').agg(
+            full_count=('paper', 'size'),
+            fractional_count=('fraction', 'sum'),
+            first_author_count=('is_first', 'sum'),
+            first_year=('year', 'min'),
+            last_year=('year', 'max')
+        )
+        stats['fractional_count'] = stats['fractional_count'].round(3)
+        stats.insert(0, 'display_name', display.reindex(stats.index))
+        return (stats.sort_values(['full_count', 'fractional_count'], ascending=False)
+                .reset_index())
+
+    def author_productivity(self, top_n=15):
+        """Artículos por año de los top_n autores (autores x años)"""
+        long = self.authors
+        if long is None or long.empty or long['year'].isna().all():
+            return None
+        stats = self.results['author_stats']
+        top = stats['author'].head(top_n)
+        table = (long[long['author'].isin(top)]
+                 .dropna(subset=['year'])
+                 .groupby(['author', 'year']).size()
+                 .unstack(fill_value=0))
+        names = stats.set_index('author')['display_name']
+        return table.reindex(top).dropna(how='all').rename(index=names)
 
     def calculate_statistics(self):
         if self.df is None:
             self.load_data()
 
-        self.results['top_authors'] = self.df['first_author'].value_counts().head(15)
+        self.results['author_stats'] = self.author_statistics()
+        self.results['top_authors'] = (self.results['author_stats']
+                                       .set_index('display_name')['full_count'].head(15))
+        self.results['author_productivity'] = self.author_productivity()
 
         if 'year' in self.df.columns and 'type' in self.df.columns:
             self.results['publications_by_year_type'] = self.df.groupby(['year', 'type']).size().unstack(fill_value=0)
@@ -168,61 +266,69 @@ class BibliometricAnalyzer:
         if 'publisher' in self.df.columns:
             self.results['top_publishers'] = self.df['publisher'].value_counts().head(15)
 
-    def generate_visualizations(self, output_dir='output'):
+        if self.df['citations'].notna().any():
+            authors_col = 'AU' if 'AU' in self.df.columns else 'author'
+            self.results['citations'] = citation_report(self.df, authors_col=authors_col)
+
+    def _chart_specs(self, output_dir):
+        """Una especificación por gráfico (serie de entrada, tipo y textos); solo los que tienen datos"""
+        specs = [
+            ('top_authors', 'barh', 'Top 15 Autores por Producción (conteo completo)',
+             'Número de Publicaciones', 'Autor', {'color': 'steelblue'}),
+            ('publications_by_year_type', 'bar', 'Publicaciones por Año y Tipo',
+             'Año', 'Número de Publicaciones', {'stacked': True}),
+            ('publication_types', 'pie', 'Distribución de Tipos de Publicación',
+             None, '', {'autopct': '%1.1f%%'}),
+            ('top_journals', 'barh', 'Top 15 Journals por Publicaciones',
+             'Número de Publicaciones', 'Journal', {'color': 'green'}),
+            ('top_publishers', 'barh', 'Top 15 Publishers por Publicaciones',
+             'Número de Publicaciones', 'Publisher', {'color': 'purple'}),
+        ]
+        return [
+            {
+                'name': name, 'kind': kind, 'title': title, 'xlabel': xlabel, 'ylabel': ylabel,
+                'options': options, 'data': self.results[name],
+                'path': os.path.join(output_dir, f"{name}.png"),
+            }
+            for name, kind, title, xlabel, ylabel, options in specs
+            if self.results[name] is not None
+        ]
+
+    def generate_visualizations(self, output_dir='output', max_workers=None):
+        """
+        Genera los gráficos en paralelo (un proceso por gráfico). Un gráfico se omite si su
+        serie de entrada no cambió desde la última ejecución (hash en charts_manifest.json)
+        y el PNG sigue en disco. Devuelve {'generated': [...], 'skipped': [...]}.
+        """
         os.makedirs(output_dir, exist_ok=True)
-
-        if self.results['top_authors'] is not None:
-            plt.figure(figsize=(12, 6))
-            self.results['top_authors'].plot(kind='barh', color='steelblue')
-            plt.title('Top 15 Autores por Producción')
-            plt.xlabel('Número de Publicaciones')
-            plt.ylabel('Autor')
-            plt.gca().invert_yaxis()
-            plt.tight_layout()
-            plt.savefig(f"{output_dir}/top_authors.png")
-            plt.close()
-
-        if self.results['publications_by_year_type'] is not None:
-            plt.figure(figsize=(12, 6))
-            self.results['publications_by_year_type'].plot(kind='bar', stacked=True)
-            plt.title('Publicaciones por Año y Tipo')
-            plt.xlabel('Año')
-            plt.ylabel('Número de Publicaciones')
-            plt.legend(title='Tipo')
-            plt.tight_layout()
-            plt.savefig(f"{output_dir}/publications_by_year_type.png")
-            plt.close()
-
-        if self.results['publication_types'] is not None:
-            plt.figure(figsize=(8, 8))
-            self.results['publication_types'].plot(kind='pie', autopct='%1.1f%%')
-            plt.title('Distribución de Tipos de Publicación')
-            plt.ylabel('')
-            plt.tight_layout()
-            plt.savefig(f"{output_dir}/publication_types.png")
-            plt.close()
-
-        if self.results['top_journals'] is not None:
-            plt.figure(figsize=(12, 6))
-            self.results['top_journals'].plot(kind='barh', color='green')
-            plt.title('Top 15 Journals por Publicaciones')
-            plt.xlabel('Número de Publicaciones')
-            plt.ylabel('Journal')
-            plt.gca().invert_yaxis()
-            plt.tight_layout()
-            plt.savefig(f"{output_dir}/top_journals.png")
-            plt.close()
-
-        if self.results['top_publishers'] is not None:
-            plt.figure(figsize=(12, 6))
-            self.results['top_publishers'].plot(kind='barh', color='purple')
-            plt.title('Top 15 Publishers por Publicaciones')
-            plt.xlabel('Número de Publicaciones')
-            plt.ylabel('Publisher')
-            plt.gca().invert_yaxis()
-            plt.tight_layout()
-            plt.savefig(f"{output_dir}/top_publishers.png")
-            plt.close()
+        manifest_path = os.path.join(output_dir, 'charts_manifest.json')
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+
+        pending, skipped = [], []
+        for spec in self._chart_specs(output_dir):
+            spec['hash'] = _chart_hash(spec)
+            if manifest.get(spec['name']) == spec['hash'] and os.path.exists(spec['path']):
+                skipped.append(spec['name'])
+            else:
+                pending.append(spec)
+
+        generated = []
+        if len(pending) == 1:
+            generated.append(_render_chart(pending[0]))
+        elif pending:
+            workers = max_workers or min(len(pending), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                generated = list(executor.map(_render_chart, pending))
+
+        for spec in pending:
+            manifest[spec['name']] = spec['hash']
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        return {'generated': generated, 'skipped': skipped}
 
     def export_results(self, output_dir=None):
         #output_dir = r"C:/Users/erikp/OneDrive/Documentos/GitHub/ProyectoAlgoritmos/resultados/requerimiento2"
@@ -247,7 +353,10 @@ class BibliometricAnalyzer:
             'publications_by_year_type': self.results['publications_by_year_type'].to_dict() if self.results['publications_by_year_type'] is not None else None,
             'publication_types': self.results['publication_types'].to_dict() if self.results['publication_types'] is not None else None,
             'top_journals': self.results['top_journals'].to_dict() if self.results['top_journals'] is not None else None,
-            'top_publishers': self.results['top_publishers'].to_dict() if self.results['top_publishers'] is not None else None
+            'top_publishers': self.results['top_publishers'].to_dict() if self.results['top_publishers'] is not None else None,
+            'author_stats': self.results['author_stats'].head(50).to_dict(orient='records') if self.results['author_stats'] is not None else None,
+            'author_productivity': self.results['author_productivity'].rename(columns=lambda y: str(int(y))).to_dict(orient='index') if self.results['author_productivity'] is not None else None,
+            'citations': self._citations_to_dict()
         }
 
         json_path = os.path.join(output_dir, "bibliometric_stats.json")
@@ -262,6 +371,15 @@ class BibliometricAnalyzer:
             ]
         }
 
+    def _citations_to_dict(self):
+        report = self.results['citations']
+        if report is None:
+            return None
+        return {
+            key: value.to_dict(orient='records') if isinstance(value, pd.DataFrame) else value
+            for key, value in report.items()
+        }
+
 def main():
     print("=== Analizador Bibliométrico - Requerimiento 2 ===")
     print("Este script genera estadísticas a partir del archivo unificado\n")
@@ -5,7 +5,7 @@ import numpy as np
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
+from requerimiento2 import embeddings as sbert_embeddings
 from rapidfuzz.distance import Levenshtein  # rápido
 import jellyfish
 from collections import Counter
@@ -106,10 +106,12 @@ def jaccard_shingle_similarity(a: str, b: str, k: int = 3) -> Dict[str, Any]:
     return {'score': float(j), 'steps': {'|A∩B|': len(inter), '|A∪B|': len(union), 'k': k}}
 
 
-def cosine_tfidf_similarity(a_list):
+def cosine_tfidf_similarity(a_list, tfidf_model=None):
     """
     Calcula la similitud coseno usando TF-IDF entre una lista de textos.
     Maneja textos vacíos automáticamente.
+    Si se pasa `tfidf_model` (CorpusTfidf) se usan sus filas e idf del corpus completo
+    en lugar de reajustar un vectorizador sobre los textos seleccionados.
     """
     # Normalizar y filtrar textos vacíos
     normed = [t.lower().strip() for t in a_list if t and t.strip() != '']
@@ -122,6 +124,16 @@ def cosine_tfidf_similarity(a_list):
             # Ningún texto válido
             normed = ["", ""]
 
+    if tfidf_model is not None:
+        # Conteos del corpus sin stop words, igual que el vectorizador local
+        cols = tfidf_model.feature_columns(max_features=5000)
+        X = tfidf_model.tfidf_texts(normed, cols=cols)
+        sim_matrix = cosine_similarity(X)
+        used = np.unique(X.indices)[:20]
+        feature_names = tfidf_model.feature_names(cols[used])
+        return {'matrix': sim_matrix, 'steps': {'n_features': X.shape[1], 'sample_features': feature_names,
+                                                'corpus_docs': tfidf_model.n_docs}}
+
     try:
         # vectorizador sin stop_words para evitar problemas de idioma
         vectorizer = TfidfVectorizer(stop_words=None, max_features=5000)
@@ -136,27 +148,27 @@ def cosine_tfidf_similarity(a_list):
         return {'matrix': sim_matrix, 'steps': {'n_features': 0, 'sample_features': []}}
 
 # SBERT (sentence-transformers)
-_sbert_model = None
-def get_sbert_model(name='all-MiniLM-L6-v2'):
-    global _sbert_model
-    if _sbert_model is None:
-        _sbert_model = SentenceTransformer(name)
-    return _sbert_model
-
-def sbert_similarity(a_list: List[str], model_name='all-MiniLM-L6-v2') -> Dict[str, Any]:
-    model = get_sbert_model(model_name)
+# El modelo se carga una vez por (nombre, backend) en requerimiento2/embeddings.py
+def get_sbert_model(name='all-MiniLM-L6-v2', backend=None):
+    return sbert_embeddings.get_model(name, backend)
+
+def sbert_similarity(a_list: List[str], model_name='all-MiniLM-L6-v2', backend=None) -> Dict[str, Any]:
     texts = [normalize_text(t) for t in a_list]
-    embeddings = model.encode(texts, show_progress_bar=False, convert_to_numpy=True)
+    embeddings = sbert_embeddings.encode(texts, model_name=model_name, backend=backend)
     sim = cosine_similarity(embeddings)
-    return {'matrix': sim, 'steps': {'embedding_dim': int(embeddings.shape[1])}}
+    return {'matrix': sim, 'steps': {'embedding_dim': int(embeddings.shape[1]),
+                                     'backend': sbert_embeddings.resolve_backend(backend)}}
 
 # ------------------------------
 # Orquestador: recibe indices seleccionados y realiza todos los métodos
 # ------------------------------
-def compute_similarities(texts: List[str], methods: List[str] = None) -> Dict[str, Any]:
+def compute_similarities(texts: List[str], methods: List[str] = None, sbert_backend: str = None,
+                         tfidf_model=None) -> Dict[str, Any]:
     """
     texts: list of abstracts selected (order matters)
     methods: list of method keys: 'lev', 'jw', 'jaccard', 'tfidf', 'sbert'
+    sbert_backend: 'torch', 'int8', 'onnx' or 'onnx-int8' (None -> SBERT_BACKEND / 'torch')
+    tfidf_model: corpus-level CorpusTfidf; if None TF-IDF is fitted on `texts` only
     Returns a dict with scores by pair and matrices for tfidf/sbert
     """
     if methods is None:
@@ -183,11 +195,11 @@ def compute_similarities(texts: List[str], methods: List[str] = None) -> Dict[st
 
     # vector/matrix methods
     if 'tfidf' in methods:
-        tf = cosine_tfidf_similarity(texts)
+        tf = cosine_tfidf_similarity(texts, tfidf_model=tfidf_model)
         result['matrices']['tfidf'] = tf['matrix'].tolist()
         result['details']['tfidf_steps'] = tf['steps']
     if 'sbert' in methods:
-        sb = sbert_similarity(texts)
+        sb = sbert_similarity(texts, backend=sbert_backend)
         result['matrices']['sbert'] = sb['matrix'].tolist()
         result['details']['sbert_steps'] = sb['steps']
 
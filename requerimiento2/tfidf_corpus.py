@@ -0,0 +1,332 @@
+# tfidf_corpus.py
+"""
+Modelo TF-IDF a nivel de corpus, ajustado una sola vez sobre el archivo unificado.
+
+Guarda conteos de términos (matriz dispersa documentos x términos), vocabulario y
+frecuencia documental; el idf se deriva de ellos. Hay un documento por registro del archivo
+unificado (su abstract, o el título si no tiene abstract), identificado por su número de
+registro, así que el idf no depende de qué pestaña se ejecutó primero.
+
+Cuando cambia la versión (hash) del archivo unificado:
+- Si solo se agregaron registros al final (las claves de los registros anteriores no cambian),
+  se cuentan los nuevos y se agregan sus filas; conteos y frecuencia documental quedan exactos,
+  pero los términos nuevos van al final del vocabulario.
+- Si se editó o borró algún registro, o si el idf medio se alejó más de IDF_DRIFT_LIMIT del
+  idf del último ajuste completo, se reajusta todo: los registros borrados o modificados no
+  quedan en las estadísticas y el vocabulario vuelve al orden de un ajuste desde cero.
+
+Los conteos se hacen sin stop words (como la similitud TF-IDF original del Requerimiento 2);
+cada etapa aplica las suyas al elegir columnas (el clustering usa las de inglés). Como el idf
+de un término solo depende de su propia frecuencia documental, quitar columnas equivale a
+haber ajustado con esas stop words.
+
+Las etapas de similitud (req2) y clustering (req4) toman sus filas con `tfidf_texts`; los
+textos que no están en el corpus se proyectan sobre el vocabulario sin modificar el modelo.
+
+Archivos persistidos en resultados/tfidf_corpus/:
+    meta.json (versión, números y claves de registro), vocabulary.json, doc_keys.json, idf.npy,
+    fit_idf.npy (idf del último ajuste completo), df.npy, counts.npz
+"""
+import os
+import re
+import json
+import hashlib
+import unicodedata
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, ENGLISH_STOP_WORDS
+from sklearn.preprocessing import normalize
+
+# Cambio medio del idf (desde el último ajuste completo) a partir del cual se reajusta
+IDF_DRIFT_LIMIT = 0.1
+
+
+def clean_text(text: str) -> str:
+    """Normaliza texto para TF-IDF: minúsculas, sin puntuación ni números"""
+    text = str(text).lower()
+    text = unicodedata.normalize('NFKD', text)
+    text = re.sub(r'[^\w\s]', ' ', text)
+    text = re.sub(r'\d+', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def doc_key(text: str) -> str:
+    """Clave estable de un documento a partir de su texto normalizado"""
+    return hashlib.sha1(clean_text(text).encode('utf-8')).hexdigest()
+
+
+def document_texts(df) -> List[str]:
+    """Texto de cada registro del archivo unificado (columnas TI/AB): el abstract o, si falta, el título"""
+    abstracts = df['AB'].fillna('').astype(str)
+    titles = df['TI'].fillna('').astype(str)
+    return abstracts.where(abstracts.str.strip() != '', titles).tolist()
+
+
+class CorpusTfidf:
+    def __init__(self, storage_dir: Optional[str] = None):
+        self.storage_dir = storage_dir
+        self.version: Optional[str] = None
+        self.doc_ids: List[int] = []
+        self.record_keys: List[str] = []
+        self.fit_idf = np.zeros(0, dtype=np.float64)
+        self.vocabulary: Dict[str, int] = {}
+        self.terms: List[str] = []
+        self.doc_index: Dict[str, int] = {}
+        self.counts = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self.df = np.zeros(0, dtype=np.int64)
+
+    @property
+    def n_docs(self) -> int:
+        return self.counts.shape[0]
+
+    @property
+    def idf(self) -> np.ndarray:
+        """idf suavizado, igual que TfidfVectorizer(smooth_idf=True)"""
+        return np.log((1 + self.n_docs) / (1 + self.df)) + 1.0
+
+    @property
+    def idf_drift(self) -> float:
+        """Cambio medio del idf de los términos del último ajuste completo"""
+        if len(self.fit_idf) == 0:
+            return 0.0
+        return float(np.abs(self.idf[:len(self.fit_idf)] - self.fit_idf).mean())
+
+    # ------------------------------
+    # Ajuste sobre el corpus completo
+    # ------------------------------
+    def fit(self, texts: Sequence[str], doc_ids: Optional[Sequence[int]] = None,
+            version: Optional[str] = None) -> 'CorpusTfidf':
+        """
+        Ajusta el modelo con un documento por registro. Los textos vacíos se omiten;
+        doc_ids (por defecto la posición de cada texto) identifica el registro de cada fila.
+        """
+        if doc_ids is None:
+            doc_ids = range(len(texts))
+        kept = [(int(i), t) for i, t in zip(doc_ids, texts) if t and clean_text(t)]
+        self.doc_ids = [i for i, _ in kept]
+        docs = [t for _, t in kept]
+        self.version = version
+        self.record_keys = [doc_key(t) for t in texts]
+
+        vectorizer = CountVectorizer(preprocessor=clean_text, dtype=np.int32)
+        try:
+            self.counts = vectorizer.fit_transform(docs).tocsr()
+            self.terms = vectorizer.get_feature_names_out().tolist()
+        except ValueError:
+            # Ningún término válido en el corpus
+            self.counts = sparse.csr_matrix((len(docs), 0), dtype=np.int32)
+            self.terms = []
+        self.counts.sort_indices()
+        self.vocabulary = {t: i for i, t in enumerate(self.terms)}
+        self.df = np.bincount(self.counts.indices, minlength=len(self.terms)).astype(np.int64)
+
+        self.doc_index = {}
+        for row, text in enumerate(docs):
+            self.doc_index.setdefault(doc_key(text), row)
+        self.fit_idf = self.idf
+        return self
+
+    def add_documents(self, texts: Sequence[str], doc_ids: Sequence[int]) -> int:
+        """
+        Agrega al modelo los registros nuevos (texto y número de registro) sin reajustar:
+        extiende el vocabulario y suma su frecuencia documental. Devuelve cuántas filas agregó.
+        """
+        kept = [(int(i), t) for i, t in zip(doc_ids, texts) if t and clean_text(t)]
+        docs = [t for _, t in kept]
+        if not docs:
+            return 0
+
+        vectorizer = CountVectorizer(preprocessor=clean_text, dtype=np.int32)
+        try:
+            new_counts = vectorizer.fit_transform(docs).tocsr()
+            new_terms = vectorizer.get_feature_names_out().tolist()
+        except ValueError:
+            # Ningún término válido en los registros nuevos
+            new_counts = sparse.csr_matrix((len(docs), 0), dtype=np.int32)
+            new_terms = []
+
+        # Columnas locales -> vocabulario del modelo (los términos nuevos van al final)
+        for term in new_terms:
+            if term not in self.vocabulary:
+                self.vocabulary[term] = len(self.terms)
+                self.terms.append(term)
+        col_map = np.array([self.vocabulary[t] for t in new_terms], dtype=np.int64)
+        n_terms = len(self.terms)
+        new_counts = sparse.csr_matrix((new_counts.data, col_map[new_counts.indices], new_counts.indptr),
+                                       shape=(len(docs), n_terms), dtype=np.int32)
+        new_counts.sort_indices()
+
+        old_counts = self.counts.tocsr()
+        old_counts.resize((self.n_docs, n_terms))
+        first_row = self.n_docs
+        self.counts = sparse.vstack([old_counts, new_counts], format='csr')
+        df = np.zeros(n_terms, dtype=np.int64)
+        df[:len(self.df)] = self.df
+        self.df = df + np.bincount(new_counts.indices, minlength=n_terms)
+
+        self.doc_ids.extend(i for i, _ in kept)
+        for row, text in enumerate(docs, start=first_row):
+            self.doc_index.setdefault(doc_key(text), row)
+        return len(docs)
+
+    def update(self, texts: Sequence[str], version: Optional[str] = None) -> 'CorpusTfidf':
+        """
+        Lleva el modelo a una nueva versión del corpus (un texto por registro): agrega los
+        registros nuevos si solo se añadieron al final; si no, o si el idf se desvió más de
+        IDF_DRIFT_LIMIT desde el último ajuste completo, reajusta todo.
+        """
+        keys = [doc_key(t) for t in texts]
+        n_old = len(self.record_keys)
+        appended_only = n_old > 0 and len(keys) >= n_old and keys[:n_old] == self.record_keys
+        if not appended_only:
+            return self.fit(texts, version=version)
+
+        self.add_documents(texts[n_old:], range(n_old, len(texts)))
+        if self.idf_drift > IDF_DRIFT_LIMIT:
+            return self.fit(texts, version=version)
+        self.record_keys = keys
+        self.version = version
+        return self
+
+    def counts_for(self, texts: List[str]) -> sparse.csr_matrix:
+        """
+        Conteos de `texts`: las filas del corpus para los textos conocidos y, para los demás,
+        sus conteos sobre el vocabulario del corpus (sin agregarlos al modelo)
+        """
+        rows = [self.doc_index.get(doc_key(t)) for t in texts]
+        missing = [i for i, row in enumerate(rows) if row is None]
+        if not missing:
+            return self.counts[rows]
+        if self.terms:
+            vectorizer = CountVectorizer(preprocessor=clean_text, vocabulary=self.vocabulary, dtype=np.int32)
+            projected = vectorizer.transform([texts[i] for i in missing]).tocsr()
+        else:
+            projected = sparse.csr_matrix((len(missing), 0), dtype=np.int32)
+        known = [i for i, row in enumerate(rows) if row is not None]
+        stacked = sparse.vstack([self.counts[[rows[i] for i in known]], projected], format='csr')
+        # stacked tiene primero los conocidos y luego los proyectados: volver al orden de `texts`
+        position = np.empty(len(texts), dtype=np.int64)
+        position[known + missing] = np.arange(len(texts))
+        return stacked[position]
+
+    # ------------------------------
+    # Selección de columnas y matriz TF-IDF
+    # ------------------------------
+    def feature_columns(self, min_df=1, max_df=1.0, max_features: Optional[int] = None,
+                        stop_words=None) -> np.ndarray:
+        """
+        Columnas a usar según frecuencia documental en el corpus completo.
+        min_df/max_df aceptan enteros (documentos) o fracciones, como en sklearn;
+        stop_words acepta 'english' o una colección de palabras a excluir.
+        """
+        n = max(self.n_docs, 1)
+        min_count = min_df if isinstance(min_df, int) else int(np.ceil(min_df * n))
+        max_count = max_df if isinstance(max_df, int) else int(np.floor(max_df * n))
+        mask = (self.df >= min_count) & (self.df <= max_count)
+        if stop_words:
+            excluded = ENGLISH_STOP_WORDS if stop_words == 'english' else set(stop_words)
+            mask &= ~np.isin(np.asarray(self.terms, dtype=object), list(excluded))
+        cols = np.flatnonzero(mask)
+        if max_features is not None and len(cols) > max_features:
+            term_freq = np.asarray(self.counts[:, cols].sum(axis=0)).ravel()
+            top = np.argsort(-term_freq, kind='stable')[:max_features]
+            cols = np.sort(cols[top])
+        return cols
+
+    def _tfidf(self, counts: sparse.csr_matrix, cols: np.ndarray) -> sparse.csr_matrix:
+        X = counts[:, cols].astype(np.float64)
+        X = X.multiply(self.idf[cols]).tocsr()
+        if X.shape[1] == 0:
+            return X
+        return normalize(X, norm='l2', copy=False)
+
+    def tfidf_rows(self, rows: List[int], min_df=1, max_df=1.0, max_features: Optional[int] = None,
+                   cols: Optional[np.ndarray] = None, stop_words=None) -> sparse.csr_matrix:
+        """Matriz TF-IDF (CSR, filas normalizadas L2) para las filas pedidas"""
+        if cols is None:
+            cols = self.feature_columns(min_df, max_df, max_features, stop_words)
+        return self._tfidf(self.counts[rows], cols)
+
+    def tfidf_texts(self, texts: List[str], min_df=1, max_df=1.0, max_features: Optional[int] = None,
+                    cols: Optional[np.ndarray] = None, stop_words=None) -> sparse.csr_matrix:
+        """Matriz TF-IDF para textos (filas del corpus o proyectados sobre su vocabulario)"""
+        if cols is None:
+            cols = self.feature_columns(min_df, max_df, max_features, stop_words)
+        return self._tfidf(self.counts_for(texts), cols)
+
+    def feature_names(self, cols: np.ndarray) -> List[str]:
+        return [self.terms[c] for c in cols]
+
+    # ------------------------------
+    # Persistencia
+    # ------------------------------
+    def save(self, storage_dir: Optional[str] = None) -> str:
+        storage_dir = storage_dir or self.storage_dir
+        os.makedirs(storage_dir, exist_ok=True)
+        with open(os.path.join(storage_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'doc_ids': self.doc_ids, 'record_keys': self.record_keys}, f)
+        with open(os.path.join(storage_dir, 'vocabulary.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.terms, f)
+        with open(os.path.join(storage_dir, 'doc_keys.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.doc_index, f)
+        np.save(os.path.join(storage_dir, 'idf.npy'), self.idf)
+        np.save(os.path.join(storage_dir, 'fit_idf.npy'), self.fit_idf)
+        np.save(os.path.join(storage_dir, 'df.npy'), self.df)
+        sparse.save_npz(os.path.join(storage_dir, 'counts.npz'), self.counts.tocsr())
+        return storage_dir
+
+    @classmethod
+    def load(cls, storage_dir: str) -> 'CorpusTfidf':
+        model = cls(storage_dir)
+        with open(os.path.join(storage_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        model.version = meta['version']
+        model.doc_ids = meta['doc_ids']
+        # Sin claves de registro (formato anterior) la próxima versión se reajusta completa
+        model.record_keys = meta.get('record_keys', [])
+        with open(os.path.join(storage_dir, 'vocabulary.json'), 'r', encoding='utf-8') as f:
+            model.terms = json.load(f)
+        with open(os.path.join(storage_dir, 'doc_keys.json'), 'r', encoding='utf-8') as f:
+            model.doc_index = json.load(f)
+        model.vocabulary = {t: i for i, t in enumerate(model.terms)}
+        model.df = np.load(os.path.join(storage_dir, 'df.npy'))
+        model.counts = sparse.load_npz(os.path.join(storage_dir, 'counts.npz')).tocsr()
+        fit_idf_path = os.path.join(storage_dir, 'fit_idf.npy')
+        model.fit_idf = np.load(fit_idf_path) if os.path.exists(fit_idf_path) else model.idf
+        return model
+
+
+# Un modelo por carpeta de almacenamiento, compartido por todas las etapas del proceso
+_models: Dict[str, CorpusTfidf] = {}
+
+
+def corpus_tfidf_dir(project_root: str) -> str:
+    return os.path.join(project_root, "resultados", "tfidf_corpus")
+
+
+def get_corpus_tfidf(project_root: str) -> CorpusTfidf:
+    """
+    Devuelve el modelo TF-IDF del archivo unificado: desde memoria o disco si corresponde a la
+    versión actual del archivo; si no, lo actualiza (registros agregados) o lo reajusta
+    (registros editados o borrados, o desvío del idf) y lo guarda.
+    """
+    from requerimiento1.corpus import corpus_version, load_corpus, unified_path
+    from requerimiento2.requerimiento2_similitud import load_unified_ris
+
+    storage_dir = corpus_tfidf_dir(project_root)
+    version = corpus_version(unified_path(project_root))
+    model = _models.get(storage_dir)
+    if model is not None and model.version == version:
+        return model
+
+    if model is None and os.path.exists(os.path.join(storage_dir, 'meta.json')):
+        model = CorpusTfidf.load(storage_dir)
+    if model is None or model.version != version:
+        texts = document_texts(load_corpus(project_root, load_unified_ris))
+        model = (model or CorpusTfidf(storage_dir)).update(texts, version=version)
+        model.save()
+    _models[storage_dir] = model
+    return model
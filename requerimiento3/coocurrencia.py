@@ -0,0 +1,128 @@
+# coocurrencia.py
+"""
+Co-ocurrencia de términos con matrices dispersas (NumPy/SciPy) para el Requerimiento 3.
+
+- X: matriz binaria documentos x términos (CSR), 1 si el término aparece en el documento.
+- C = Xᵀ·X: en la diagonal, número de documentos con cada término (s_i); fuera de ella,
+  número de documentos donde aparecen juntos (c_ij).
+- Medidas de asociación sobre C (solo fuera de la diagonal, manteniendo la dispersión):
+    count                : c_ij
+    association_strength : N·c_ij / (s_i·s_j)   (fuerza de asociación, como en VOSviewer)
+    pmi                  : log(N·c_ij / (s_i·s_j))
+    jaccard              : c_ij / (s_i + s_j - c_ij)
+- threshold_edges filtra aristas por co-ocurrencia mínima, peso mínimo o las top_k más fuertes.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+MEASURES = ('count', 'association_strength', 'pmi', 'jaccard')
+
+
+def binary_matrix(doc_terms: Iterable[Iterable[str]], terms: Optional[Sequence[str]] = None):
+    """
+    Matriz binaria documentos x términos a partir de los términos de cada documento.
+    Si no se indica `terms`, el vocabulario se arma en orden de aparición; los términos
+    fuera de `terms` se ignoran. Devuelve (X, terms).
+    """
+    index: Dict[str, int] = {t: i for i, t in enumerate(terms)} if terms is not None else {}
+    fixed = terms is not None
+    rows, cols = [], []
+    n_docs = 0
+    for doc in doc_terms:
+        for term in set(doc):
+            col = index.get(term)
+            if col is None:
+                if fixed:
+                    continue
+                col = index[term] = len(index)
+            rows.append(n_docs)
+            cols.append(col)
+        n_docs += 1
+
+    terms = list(terms) if fixed else list(index)
+    data = np.ones(len(rows), dtype=np.int32)
+    X = sparse.csr_matrix((data, (rows, cols)), shape=(n_docs, len(terms)), dtype=np.int32)
+    return X, terms
+
+
+def cooccurrence_matrix(X: sparse.spmatrix) -> sparse.csr_matrix:
+    """C = Xᵀ·X (términos x términos); diagonal = frecuencia documental de cada término"""
+    X = sparse.csr_matrix(X, dtype=np.int32)
+    return (X.T @ X).tocsr()
+
+
+def matrix_from_counts(terms: Sequence[str], frequencies: Dict[str, int],
+                       pairs: Dict[Tuple[str, str], int]) -> sparse.csr_matrix:
+    """Reconstruye C a partir de frecuencias por término y conteos por par (p. ej. del JSON guardado)"""
+    index = {t: i for i, t in enumerate(terms)}
+    n = len(terms)
+    rows = list(range(n))
+    cols = list(range(n))
+    data = [frequencies.get(t, 0) for t in terms]
+    for (t1, t2), w in pairs.items():
+        if t1 in index and t2 in index:
+            i, j = index[t1], index[t2]
+            rows.extend((i, j))
+            cols.extend((j, i))
+            data.extend((w, w))
+    return sparse.csr_matrix((data, (rows, cols)), shape=(n, n), dtype=np.int64)
+
+
+def association_matrix(C: sparse.spmatrix, measure: str = 'association_strength',
+                       n_docs: Optional[int] = None) -> sparse.csr_matrix:
+    """Medida de asociación entre términos (dispersa, sin diagonal)"""
+    if measure not in MEASURES:
+        raise ValueError(f"Medida no soportada: {measure}. Use una de {MEASURES}")
+
+    C = sparse.csr_matrix(C)
+    s = C.diagonal().astype(np.float64)
+    coo = C.tocoo()
+    mask = (coo.row != coo.col) & (coo.data != 0)
+    i, j, c = coo.row[mask], coo.col[mask], coo.data[mask].astype(np.float64)
+    if measure == 'count':
+        values = c
+    elif measure == 'jaccard':
+        values = c / (s[i] + s[j] - c)
+    else:
+        if n_docs is None:
+            raise ValueError("n_docs es necesario para association_strength y pmi")
+        values = n_docs * c / (s[i] * s[j])
+        if measure == 'pmi':
+            values = np.log(values)
+
+    return sparse.csr_matrix((values, (i, j)), shape=C.shape)
+
+
+def threshold_edges(A: sparse.spmatrix, C: Optional[sparse.spmatrix] = None, min_cooccurrence: int = 1,
+                    min_weight: Optional[float] = None, top_k: Optional[int] = None) -> List[Tuple[int, int, float]]:
+    """
+    Aristas (i, j, peso) con i < j que superan los umbrales:
+    co-ocurrencia mínima (sobre C), peso mínimo (sobre A) y, al final, las top_k de mayor peso.
+    """
+    upper = sparse.triu(A, k=1).tocoo()
+    i, j, w = upper.row, upper.col, upper.data
+
+    keep = np.ones(len(w), dtype=bool)
+    if C is not None and min_cooccurrence > 1:
+        counts = np.asarray(sparse.csr_matrix(C)[i, j]).ravel()
+        keep &= counts >= min_cooccurrence
+    if min_weight is not None:
+        keep &= w >= min_weight
+    i, j, w = i[keep], j[keep], w[keep]
+
+    order = np.argsort(-w, kind='stable')
+    if top_k is not None:
+        order = order[:top_k]
+    return [(int(i[k]), int(j[k]), float(w[k])) for k in order]
+
+
+def pair_counts(C: sparse.spmatrix, terms: Sequence[str]) -> Dict[Tuple[str, str], int]:
+    """Conteos de co-ocurrencia por par de términos (orden alfabético dentro del par)"""
+    upper = sparse.triu(C, k=1).tocoo()
+    pairs = {}
+    for i, j, w in zip(upper.row, upper.col, upper.data):
+        t1, t2 = sorted((terms[i], terms[j]))
+        pairs[(t1, t2)] = int(w)
+    return pairs
@@ -0,0 +1,198 @@
+# extraccion_terminos.py
+"""
+Extracción de términos candidatos (n-gramas de 1 a 3 palabras) para sugerir palabras nuevas
+en el Requerimiento 3.
+
+Una sola pasada vectorizada (CountVectorizer, sin stopwords) produce la matriz dispersa
+documentos x n-gramas; esa matriz se guarda en disco y todas las clasificaciones se calculan
+sobre ella, sin volver a leer el corpus:
+- tfidf : promedio del peso TF-IDF (filas normalizadas L2) de cada candidato.
+- chi2  : chi-cuadrado entre la presencia del candidato y los documentos de la categoría
+          (documentos que contienen alguno de sus términos o sinónimos).
+- cvalue: C-value (Frantzi et al.), favorece términos multi-palabra frecuentes que no
+          solo aparecen anidados dentro de otros más largos.
+Los vectores de puntajes tfidf y cvalue no dependen de la categoría: se calculan una sola
+vez por objeto (cached_property). chi2 depende solo de las etiquetas de los documentos y se
+guarda por conjunto de columnas de la categoría, así que volver a clasificar es inmediato.
+
+Archivos en resultados/requerimiento3/candidatos/: counts.npz, terms.json, meta.json
+"""
+import os
+import json
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.feature_selection import chi2
+from sklearn.preprocessing import normalize
+
+from requerimiento2.tfidf_corpus import clean_text
+
+METHODS = ('tfidf', 'chi2', 'cvalue')
+
+
+class CandidateStats:
+    def __init__(self, counts: sparse.csr_matrix, terms: List[str], sources: Optional[dict] = None):
+        self.counts = counts.tocsr()
+        self.terms = terms
+        self.sources = sources or {}
+        self.index = {t: i for i, t in enumerate(terms)}
+        self.df = np.bincount(self.counts.indices, minlength=len(terms))
+        self.tf = np.asarray(self.counts.sum(axis=0)).ravel()
+        self._chi2_cache: Dict[tuple, np.ndarray] = {}
+
+    @property
+    def n_docs(self) -> int:
+        return self.counts.shape[0]
+
+    @classmethod
+    def fit(cls, abstracts: Iterable[str], ngram_range=(1, 3), min_df=2, sources=None) -> 'CandidateStats':
+        """Cuenta los n-gramas candidatos de todos los abstracts en una pasada"""
+        abstracts = [a for a in abstracts if a]
+        vectorizer = CountVectorizer(preprocessor=clean_text, stop_words='english',
+                                     ngram_range=ngram_range, min_df=min_df, dtype=np.int32)
+        try:
+            counts = vectorizer.fit_transform(abstracts)
+        except ValueError:
+            # Corpus muy pequeño: ningún n-grama llega a min_df
+            vectorizer.set_params(min_df=1)
+            counts = vectorizer.fit_transform(abstracts)
+        return cls(counts, vectorizer.get_feature_names_out().tolist(), sources)
+
+    # ------------------------------
+    # Persistencia
+    # ------------------------------
+    def save(self, storage_dir: str) -> str:
+        os.makedirs(storage_dir, exist_ok=True)
+        sparse.save_npz(os.path.join(storage_dir, 'counts.npz'), self.counts)
+        with open(os.path.join(storage_dir, 'terms.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.terms, f, ensure_ascii=False)
+        with open(os.path.join(storage_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'sources': self.sources, 'n_docs': self.n_docs}, f, indent=2)
+        return storage_dir
+
+    @classmethod
+    def load(cls, storage_dir: str) -> 'CandidateStats':
+        counts = sparse.load_npz(os.path.join(storage_dir, 'counts.npz'))
+        with open(os.path.join(storage_dir, 'terms.json'), 'r', encoding='utf-8') as f:
+            terms = json.load(f)
+        with open(os.path.join(storage_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        return cls(counts, terms, meta.get('sources'))
+
+    # ------------------------------
+    # Etiquetas de categoría
+    # ------------------------------
+    def term_columns(self, category_terms: Iterable[str]) -> np.ndarray:
+        """Columnas de los términos de la categoría (normalizados igual que los candidatos)"""
+        cols = {self.index[clean_text(t)] for t in category_terms if clean_text(t) in self.index}
+        return np.array(sorted(cols), dtype=np.int64)
+
+    def category_documents(self, category_terms: Iterable[str]) -> np.ndarray:
+        """Máscara de documentos que contienen al menos un término de la categoría"""
+        cols = self.term_columns(category_terms)
+        if len(cols) == 0:
+            return np.zeros(self.n_docs, dtype=bool)
+        return np.asarray(self.counts[:, cols].sum(axis=1)).ravel() > 0
+
+    # ------------------------------
+    # Puntajes
+    # ------------------------------
+    @cached_property
+    def presence(self) -> sparse.csr_matrix:
+        """Matriz binaria documentos x candidatos"""
+        presence = self.counts.copy()
+        presence.data[:] = 1
+        return presence
+
+    @cached_property
+    def tfidf_scores(self) -> np.ndarray:
+        idf = np.log((1 + self.n_docs) / (1 + self.df)) + 1.0
+        X = normalize(self.counts.multiply(idf).tocsr(), norm='l2')
+        return np.asarray(X.sum(axis=0)).ravel() / max(self.n_docs, 1)
+
+    def chi2_scores(self, category_terms: Iterable[str]) -> np.ndarray:
+        key = tuple(self.term_columns(category_terms))
+        if key in self._chi2_cache:
+            return self._chi2_cache[key]
+        labels = self.category_documents(category_terms)
+        if labels.all() or not labels.any():
+            scores = np.zeros(len(self.terms))
+        else:
+            scores, _ = chi2(self.presence, labels)
+            scores = np.nan_to_num(scores)
+            # Solo interesan los términos asociados positivamente a la categoría
+            in_category = np.asarray(self.presence[labels].mean(axis=0)).ravel()
+            outside = np.asarray(self.presence[~labels].mean(axis=0)).ravel()
+            scores = np.where(in_category > outside, scores, 0.0)
+        self._chi2_cache[key] = scores
+        return scores
+
+    @cached_property
+    def cvalue_scores(self) -> np.ndarray:
+        """C-value(a) = log2(|a|+1)·(f(a) − promedio de f(b) de los candidatos b que contienen a)"""
+        nested_sum = np.zeros(len(self.terms))
+        nested_count = np.zeros(len(self.terms))
+        for idx, term in enumerate(self.terms):
+            words = term.split()
+            n = len(words)
+            if n < 2:
+                continue
+            # Sub-n-gramas contiguos del candidato que también son candidatos
+            subterms = {' '.join(words[i:i + size]) for size in range(1, n) for i in range(n - size + 1)}
+            for sub in subterms:
+                sub_idx = self.index.get(sub)
+                if sub_idx is not None:
+                    nested_sum[sub_idx] += self.tf[idx]
+                    nested_count[sub_idx] += 1
+
+        lengths = np.array([len(t.split()) for t in self.terms])
+        freq = self.tf.astype(np.float64)
+        nested_mean = np.divide(nested_sum, nested_count, out=np.zeros_like(nested_sum), where=nested_count > 0)
+        return np.log2(lengths + 1) * (freq - nested_mean)
+
+    def rank(self, method: str = 'tfidf', category_terms: Sequence[str] = (),
+             exclude: Iterable[str] = (), top_n: int = 15) -> List[Dict]:
+        """Mejores candidatos según el método, sin los términos que ya están en la categoría"""
+        if method not in METHODS:
+            raise ValueError(f"Método no soportado: {method}. Use uno de {METHODS}")
+        if method == 'tfidf':
+            scores = self.tfidf_scores
+        elif method == 'chi2':
+            scores = self.chi2_scores(category_terms)
+        else:
+            scores = self.cvalue_scores
+
+        excluded = {clean_text(t) for t in list(category_terms) + list(exclude)}
+        suggestions = []
+        for idx in np.argsort(-scores, kind='stable'):
+            if len(suggestions) >= top_n or scores[idx] <= 0:
+                break
+            term = self.terms[idx]
+            if term in excluded:
+                continue
+            suggestions.append({
+                'term': term,
+                'score': round(float(scores[idx]), 4),
+                'df': int(self.df[idx]),
+                'frequency': int(self.tf[idx]),
+            })
+        return suggestions
+
+
+def candidates_dir(output_dir: str) -> str:
+    return os.path.join(output_dir, 'candidatos')
+
+
+def get_candidate_stats(abstracts: Iterable[str], output_dir: str, sources: Optional[dict] = None) -> CandidateStats:
+    """Carga las estadísticas guardadas si las fuentes no cambiaron; si no, las calcula y guarda"""
+    storage_dir = candidates_dir(output_dir)
+    if sources is not None and os.path.exists(os.path.join(storage_dir, 'meta.json')):
+        stats = CandidateStats.load(storage_dir)
+        if stats.sources == sources:
+            return stats
+    stats = CandidateStats.fit(abstracts, sources=sources)
+    stats.save(storage_dir)
+    return stats
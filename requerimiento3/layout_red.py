@@ -0,0 +1,230 @@
+# layout_red.py
+"""
+Disposición (layout) y dibujo de redes bibliométricas: co-ocurrencia de términos (req3)
+y co-autoría.
+
+- force_layout: layout de fuerzas tipo Fruchterman-Reingold vectorizado con NumPy.
+  Con pocos nodos la repulsión se calcula entre todos los pares; con muchos nodos cada
+  nodo se repele de una muestra aleatoria de nodos (escalada a n), así cada iteración
+  es O(n·muestra + aristas) en lugar de O(n²).
+- Arranque en caliente: las posiciones calculadas se guardan en JSON por nombre de nodo,
+  junto con una huella de la red (nodos y aristas). Si la red no cambió se devuelven tal
+  cual, sin recalcular ni escribir el archivo; si cambió se parte de ellas (los nodos nuevos
+  se ubican junto a sus vecinos) y basta con pocas iteraciones a baja temperatura.
+- prune_edges: deja las aristas más fuertes (conservando la mejor de cada nodo) para que
+  redes grandes sigan siendo legibles y rápidas de dibujar.
+- network_figure: figura Plotly interactiva con una traza para todas las aristas y una
+  traza WebGL para los nodos.
+"""
+import os
+import json
+import hashlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Edge = Tuple[int, int, float]
+
+# Por encima de este número de nodos la repulsión se estima con muestreo
+MAX_EXACT_NODES = 400
+
+
+def prune_edges(edges: Sequence[Edge], n_nodes: int, max_edges: Optional[int] = None) -> List[Edge]:
+    """
+    Conserva las max_edges aristas de mayor peso más la arista más fuerte de cada nodo
+    (ningún nodo con aristas queda aislado por la poda).
+    """
+    if max_edges is None or len(edges) <= max_edges:
+        return list(edges)
+
+    edges = sorted(edges, key=lambda e: -e[2])
+    keep = set(range(max_edges))
+    best = {}
+    for k, (i, j, _) in enumerate(edges):
+        best.setdefault(i, k)
+        best.setdefault(j, k)
+    keep.update(best.values())
+    return [edges[k] for k in sorted(keep)]
+
+
+def _initial_positions(n, edge_i, edge_j, init_pos, rng):
+    """Posiciones iniciales: las conocidas se respetan, las nuevas van cerca de sus vecinos"""
+    pos = rng.uniform(-1, 1, size=(n, 2))
+    if init_pos is None:
+        return pos, np.zeros(n, dtype=bool)
+
+    known = np.zeros(n, dtype=bool)
+    for idx, xy in init_pos.items():
+        pos[idx] = xy
+        known[idx] = True
+
+    if known.any() and not known.all():
+        # Promedio de los vecinos ya ubicados, con un poco de ruido
+        acc = np.zeros((n, 2))
+        cnt = np.zeros(n)
+        for a, b in ((edge_i, edge_j), (edge_j, edge_i)):
+            mask = known[b] & ~known[a]
+            np.add.at(acc, a[mask], pos[b[mask]])
+            np.add.at(cnt, a[mask], 1)
+        placed = cnt > 0
+        pos[placed] = acc[placed] / cnt[placed, None] + rng.normal(scale=0.05, size=(placed.sum(), 2))
+    return pos, known
+
+
+def force_layout(n_nodes: int, edges: Sequence[Edge], init_pos: Optional[Dict[int, Sequence[float]]] = None,
+                 iterations: int = 150, seed: int = 42, sample_size: int = 96) -> np.ndarray:
+    """
+    Layout de fuerzas vectorizado. Devuelve un arreglo (n_nodes, 2) normalizado a [-1, 1].
+    init_pos: {índice: (x, y)} de una ejecución anterior para arrancar en caliente.
+    """
+    if n_nodes == 0:
+        return np.zeros((0, 2))
+    rng = np.random.default_rng(seed)
+
+    if edges:
+        edge_i = np.array([e[0] for e in edges], dtype=np.int64)
+        edge_j = np.array([e[1] for e in edges], dtype=np.int64)
+        # Pesos normalizados a [0, 1] (medidas como PMI pueden ser negativas)
+        weight = np.clip(np.array([e[2] for e in edges], dtype=np.float64), 0, None)
+        weight = weight / weight.max() if weight.max() > 0 else np.ones_like(weight)
+    else:
+        edge_i = edge_j = np.zeros(0, dtype=np.int64)
+        weight = np.zeros(0)
+
+    pos, known = _initial_positions(n_nodes, edge_i, edge_j, init_pos, rng)
+
+    warm = init_pos is not None and known.mean() > 0.5
+    if warm:
+        iterations = max(20, iterations // 4)
+    k = np.sqrt(4.0 / n_nodes)                     # distancia ideal en el cuadrado [-1, 1]²
+    temperature = 0.01 if warm else 0.2
+    cooling = temperature / (iterations + 1)
+
+    exact = n_nodes <= MAX_EXACT_NODES
+    pos = pos.astype(np.float32)
+    for _ in range(iterations):
+        # Repulsión k²/d (contra todos los nodos o contra una muestra escalada a n)
+        others = pos if exact else pos[rng.choice(n_nodes, size=min(sample_size, n_nodes), replace=False)]
+        dx = pos[:, 0, None] - others[None, :, 0]
+        dy = pos[:, 1, None] - others[None, :, 1]
+        factor = (k * k) / np.maximum(dx * dx + dy * dy, 1e-6)
+        scale = n_nodes / len(others)
+        disp = np.stack(((dx * factor).sum(axis=1), (dy * factor).sum(axis=1)), axis=1) * scale
+
+        # Atracción d²/k a lo largo de las aristas, ponderada por peso
+        if len(edge_i):
+            delta = pos[edge_i] - pos[edge_j]
+            dist = np.sqrt(np.maximum((delta ** 2).sum(axis=1), 1e-12))
+            force = delta * (dist * weight / k)[:, None]
+            for axis in range(2):
+                disp[:, axis] += (np.bincount(edge_j, force[:, axis], minlength=n_nodes)
+                                  - np.bincount(edge_i, force[:, axis], minlength=n_nodes))
+
+        # Paso limitado por la temperatura
+        length = np.sqrt(np.maximum((disp ** 2).sum(axis=1), 1e-12))
+        pos += (disp / length[:, None] * np.minimum(length, temperature)[:, None]).astype(np.float32)
+        temperature = max(temperature - cooling, 1e-4)
+
+    pos = pos.astype(np.float64)
+    pos -= pos.mean(axis=0)
+    scale = np.abs(pos).max()
+    return pos / scale if scale > 0 else pos
+
+
+# ------------------------------
+# Posiciones en caché (arranque en caliente)
+# ------------------------------
+def layout_signature(names: Sequence[str], edges: Sequence[Edge]) -> str:
+    """Huella de la red: nodos y aristas (por nombre, con peso), sin depender del orden"""
+    pairs = sorted((min(names[i], names[j]), max(names[i], names[j]), round(float(w), 6)) for i, j, w in edges)
+    payload = json.dumps([sorted(names), pairs], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _read_layout_file(path: str) -> Tuple[Optional[str], Dict[str, List[float]]]:
+    if not os.path.exists(path):
+        return None, {}
+    with open(path, 'r', encoding='utf-8') as f:
+        saved = json.load(f)
+    if 'positions' in saved:
+        return saved.get('signature'), saved['positions']
+    # Formato anterior: solo {nombre: [x, y]}
+    return None, saved
+
+
+def load_positions(path: str, names: Sequence[str]) -> Optional[Dict[int, List[float]]]:
+    """Posiciones guardadas para los nodos `names` (por índice); None si no hay ninguna"""
+    _, saved = _read_layout_file(path)
+    init = {i: saved[name] for i, name in enumerate(names) if name in saved}
+    return init or None
+
+
+def save_positions(path: str, names: Sequence[str], pos: np.ndarray, signature: Optional[str] = None):
+    """Guarda las posiciones por nombre de nodo, conservando las de nodos que ya no están"""
+    _, saved = _read_layout_file(path)
+    saved.update({name: [round(float(x), 5), round(float(y), 5)] for name, (x, y) in zip(names, pos)})
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'signature': signature, 'positions': saved}, f, ensure_ascii=False)
+
+
+def cached_layout(path: str, names: Sequence[str], edges: Sequence[Edge], **kwargs) -> np.ndarray:
+    """
+    Posiciones guardadas en `path` si la red (nodos y aristas) no cambió desde que se
+    calcularon; si cambió, force_layout arrancando desde ellas y se actualiza el archivo
+    """
+    signature = layout_signature(names, edges)
+    saved_signature, saved = _read_layout_file(path)
+    if saved_signature == signature and all(name in saved for name in names):
+        return np.array([saved[name] for name in names], dtype=np.float64).reshape(len(names), 2)
+    init = {i: saved[name] for i, name in enumerate(names) if name in saved}
+    pos = force_layout(len(names), edges, init_pos=init or None, **kwargs)
+    save_positions(path, names, pos, signature)
+    return pos
+
+
+# ------------------------------
+# Dibujo interactivo
+# ------------------------------
+def network_figure(names: Sequence[str], pos: np.ndarray, edges: Sequence[Edge],
+                   sizes: Optional[Sequence[float]] = None, title: str = '', height: int = 700,
+                   show_labels: Optional[bool] = None):
+    """Red en Plotly: una traza de líneas para las aristas y una traza WebGL para los nodos"""
+    import plotly.graph_objects as go
+
+    n = len(names)
+    xs, ys = [], []
+    for i, j, _ in edges:
+        xs.extend((pos[i, 0], pos[j, 0], None))
+        ys.extend((pos[i, 1], pos[j, 1], None))
+
+    sizes = np.ones(n) if sizes is None else np.asarray(sizes, dtype=np.float64)
+    marker_size = 6 + 24 * np.sqrt(sizes / sizes.max()) if n and sizes.max() > 0 else np.full(n, 8.0)
+    degree = np.zeros(n, dtype=np.int64)
+    for i, j, _ in edges:
+        degree[i] += 1
+        degree[j] += 1
+
+    if show_labels is None:
+        show_labels = n <= 150
+    hover = [f"{name}<br>Frecuencia: {s:g}<br>Conexiones: {d}" for name, s, d in zip(names, sizes, degree)]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=xs, y=ys, mode='lines', line=dict(color='rgba(150,150,150,0.4)', width=0.8),
+                             hoverinfo='skip', showlegend=False))
+    fig.add_trace(go.Scattergl(
+        x=pos[:, 0], y=pos[:, 1],
+        mode='markers+text' if show_labels else 'markers',
+        text=list(names) if show_labels else None,
+        textposition='top center',
+        hovertext=hover, hoverinfo='text',
+        marker=dict(size=marker_size, color=degree, colorscale='Viridis', showscale=True,
+                    colorbar=dict(title='Conexiones'), line=dict(width=0.5, color='white')),
+        showlegend=False
+    ))
+    fig.update_layout(
+        title=title, height=height, plot_bgcolor='white',
+        margin=dict(l=10, r=10, t=50, b=10),
+        xaxis=dict(visible=False), yaxis=dict(visible=False, scaleanchor='x')
+    )
+    return fig
@@ -0,0 +1,222 @@
+# nube_palabras.py
+"""
+Caché de nubes de palabras, compartida por el Requerimiento 3 (nubes por categoría) y el
+Requerimiento 5 (nube del corpus).
+
+WordCloud.generate_from_frequencies es costoso (ubica cada palabra comprobando colisiones
+sobre todo el lienzo), así que cada imagen se genera una sola vez:
+- Clave: hash SHA-1 de las max_words palabras más frecuentes (las únicas que WordCloud usa),
+  del tamaño y del estilo. La semilla es fija, así que la misma clave da la misma imagen.
+- Memoria (LRU de imágenes PIL) -> disco (PNG en cache_dir, como máximo max_disk archivos;
+  al pasarse se borran los de uso más antiguo) -> renderizado.
+- preview(): la misma nube a una fracción de la resolución; el costo crece con el área del
+  lienzo, así que a 1/4 de lado se genera unas 16 veces más rápido.
+- render_async(): la versión completa se genera en un hilo de fondo; si llega una petición
+  nueva, las que aún no empezaron se cancelan (al mover un slider solo importa el último valor).
+  Un renderizado fallido se devuelve una vez (para mostrar el error) y la siguiente petición
+  lo intenta de nuevo.
+- show_wordcloud(): en Streamlit muestra la vista previa de inmediato y la reemplaza por la
+  versión completa cuando termina, sin bloquear el resto de la página.
+"""
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Mapping, Optional
+
+DEFAULT_STYLE = {'background_color': 'white', 'colormap': 'viridis', 'random_state': 42}
+PREVIEW_SCALE = 0.25
+
+
+def top_frequencies(frequencies: Mapping[str, float], max_words: int) -> Dict[str, float]:
+    """Las max_words palabras más frecuentes en orden determinista (frecuencia, palabra)"""
+    items = sorted(((w, float(f)) for w, f in frequencies.items() if f > 0), key=lambda x: (-x[1], x[0]))
+    return dict(items[:max_words])
+
+
+def wordcloud_key(frequencies: Mapping[str, float], max_words: int = 100, width: int = 800,
+                  height: int = 400, **style) -> str:
+    payload = {
+        'words': list(top_frequencies(frequencies, max_words).items()),
+        'max_words': max_words, 'width': width, 'height': height,
+        'style': {**DEFAULT_STYLE, **style},
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def render_wordcloud(frequencies: Mapping[str, float], max_words: int = 100, width: int = 800,
+                     height: int = 400, **style):
+    """Genera la nube (imagen PIL) sin pasar por la caché"""
+    from wordcloud import WordCloud
+    words = top_frequencies(frequencies, max_words)
+    wc = WordCloud(width=width, height=height, max_words=max_words, **{**DEFAULT_STYLE, **style})
+    return wc.generate_from_frequencies(words).to_image()
+
+
+class WordCloudCache:
+    def __init__(self, cache_dir: str, max_memory: int = 32, max_disk: int = 64):
+        self.cache_dir = cache_dir
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self._memory = OrderedDict()
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='wordcloud')
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.png')
+
+    def _remember(self, key: str, image):
+        with self._lock:
+            self._memory[key] = image
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, key: str):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        path = self._path(key)
+        if os.path.exists(path):
+            from PIL import Image
+            with Image.open(path) as img:
+                image = img.copy()
+            # La fecha de modificación marca el último uso para la limpieza del disco
+            os.utime(path)
+            self._remember(key, image)
+            return image
+        return None
+
+    def _evict_disk(self):
+        """Borra los PNG de uso más antiguo cuando el directorio pasa de max_disk archivos"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.png'):
+                try:
+                    entries.append((entry.stat().st_mtime_ns, entry.path))
+                except FileNotFoundError:
+                    continue
+        if len(entries) <= self.max_disk:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_disk]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _render(self, key: str, frequencies, max_words, width, height, style):
+        image = render_wordcloud(frequencies, max_words, width, height, **style)
+        tmp_path = self._path(key) + '.tmp'
+        image.save(tmp_path, format='PNG')
+        os.replace(tmp_path, self._path(key))
+        self._remember(key, image)
+        self._evict_disk()
+        return image
+
+    # ------------------------------
+    # API
+    # ------------------------------
+    def contains(self, frequencies, max_words=100, width=800, height=400, **style) -> bool:
+        key = wordcloud_key(frequencies, max_words, width, height, **style)
+        return key in self._memory or os.path.exists(self._path(key))
+
+    def get(self, frequencies, max_words=100, width=800, height=400, **style):
+        """Imagen de la nube (la genera en este hilo si no está en caché); None si no hay palabras"""
+        if not top_frequencies(frequencies, max_words):
+            return None
+        key = wordcloud_key(frequencies, max_words, width, height, **style)
+        image = self._lookup(key)
+        if image is not None:
+            return image
+        future = self._pending.get(key)
+        if future is not None and not future.cancelled():
+            return future.result()
+        return self._render(key, frequencies, max_words, width, height, style)
+
+    def preview(self, frequencies, max_words=100, width=800, height=400, scale=PREVIEW_SCALE, **style):
+        """Versión de baja resolución (también en caché)"""
+        return self.get(frequencies, max_words, max(int(width * scale), 50), max(int(height * scale), 25), **style)
+
+    def render_async(self, frequencies, max_words=100, width=800, height=400, **style) -> Optional[Future]:
+        """Genera la versión completa en segundo plano; devuelve el Future (None si no hay palabras)"""
+        if not top_frequencies(frequencies, max_words):
+            return None
+        key = wordcloud_key(frequencies, max_words, width, height, **style)
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None and not future.cancelled():
+                if future.done() and future.exception() is not None:
+                    # El fallo se informa una vez; la próxima petición vuelve a intentarlo
+                    del self._pending[key]
+                return future
+            # Las peticiones anteriores que aún no empezaron ya no interesan
+            for other_key, other in list(self._pending.items()):
+                if other.cancel() or other.done():
+                    del self._pending[other_key]
+            frequencies = dict(frequencies)
+            future = self._executor.submit(self._render, key, frequencies, max_words, width, height, style)
+            self._pending[key] = future
+        return future
+
+    def save(self, frequencies, path: str, max_words=200, width=800, height=400, **style) -> Optional[str]:
+        """Copia la nube (desde la caché o recién generada) a `path`"""
+        image = self.get(frequencies, max_words, width, height, **style)
+        if image is None:
+            return None
+        image.save(path, format='PNG')
+        return path
+
+
+@lru_cache(maxsize=None)
+def get_wordcloud_cache(cache_dir: str) -> WordCloudCache:
+    """Una instancia por directorio, compartida entre vistas y ejecuciones de Streamlit"""
+    return WordCloudCache(cache_dir)
+
+
+def wordcloud_cache_dir(project_root: str) -> str:
+    return os.path.join(project_root, 'resultados', 'cache_nubes')
+
+
+def show_wordcloud(cache: WordCloudCache, frequencies, max_words=100, width=800, height=400,
+                   poll_seconds=0.5, **style):
+    """
+    Muestra la nube en Streamlit: la imagen completa si ya está en caché; si no, la vista
+    previa en un fragmento que se refresca solo hasta que la versión completa está lista
+    (entonces relanza la página una vez para mostrarla).
+    """
+    import streamlit as st
+
+    if not top_frequencies(frequencies, max_words):
+        st.info("No hay términos para generar nube de palabras.")
+        return
+    if cache.contains(frequencies, max_words, width, height, **style):
+        st.image(cache.get(frequencies, max_words, width, height, **style), use_container_width=True)
+        return
+
+    future = cache.render_async(frequencies, max_words, width, height, **style)
+    if future.done():
+        # Terminó entre la consulta a la caché y ahora, o falló: no hace falta refrescar nada
+        try:
+            st.image(future.result(), use_container_width=True)
+        except Exception as e:
+            st.error(f"No se pudo generar la nube de palabras: {e}")
+        return
+    preview = cache.preview(frequencies, max_words, width, height, **style)
+
+    @st.fragment(run_every=poll_seconds)
+    def _full_resolution():
+        if future.done():
+            # Una ejecución completa toma la imagen de la caché y ya no define este fragmento,
+            # así que el refresco periódico se detiene
+            st.rerun()
+        st.image(preview, use_container_width=True)
+        st.caption("Vista previa: generando la nube en resolución completa...")
+
+    _full_resolution()
@@ -1,12 +1,14 @@
 # requerimiento3/req3_palabras.py
 import streamlit as st
 import json
-import re
 from collections import Counter
-from itertools import combinations
 from pathlib import Path
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+from requerimiento1.corpus import load_corpus, corpus_version
+from requerimiento3.requerimiento3_palabras import KeywordMatcher, run_analysis, load_abstracts, source_signature
+from requerimiento3.extraccion_terminos import get_candidate_stats
+from requerimiento3.coocurrencia import MEASURES, matrix_from_counts, association_matrix, threshold_edges
+from requerimiento3.layout_red import prune_edges, cached_layout, network_figure
+from requerimiento3.nube_palabras import get_wordcloud_cache, wordcloud_cache_dir, show_wordcloud
 
 # --- CARGA DE CATEGORÍAS Y SINÓNIMOS ---
 @st.cache_data
@@ -29,42 +31,25 @@ def cargar_categorias(categorias_json_path):
 
     return categorias, sinonimos
 
-# --- FUNCIONES AUXILIARES ---
-def normalize_text(text):
-    """Normaliza texto: minúsculas y quita signos de puntuación"""
-    text = text.lower()
-    text = re.sub(r'[^\w\s-]', '', text)
-    return text
-
-def parse_ris_file(filepath):
-    """Parsea archivo RIS y devuelve lista de abstracts"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    records = []
-    current_record = {}
-
-    for line in content.split('\n'):
-        line = line.strip()
-        if line.startswith('AB  - '):
-            current_record['abstract'] = line[6:]
-        elif line.startswith('ER  -'):
-            if current_record and 'abstract' in current_record:
-                records.append(current_record)
-            current_record = {}
-    return records
-
-def find_terms_in_abstract(abstract, categoria, categorias, sinonimos):
-    abstract_norm = normalize_text(abstract)
-    terms_found = set()
-    for term in categorias[categoria]:
-        term_norm = term.lower()
-        if re.search(r'\b' + re.escape(term_norm) + r'\b', abstract_norm):
-            terms_found.add(term)
-        for syn, primary in sinonimos.items():
-            if primary == term_norm and re.search(r'\b' + re.escape(syn) + r'\b', abstract_norm):
-                terms_found.add(term)
-    return terms_found
+@st.cache_resource
+def cargar_matcher(categorias_json_path):
+    """Matcher precompilado con todos los términos y sinónimos de todas las categorías"""
+    categorias, sinonimos = cargar_categorias(categorias_json_path)
+    return KeywordMatcher(categorias, sinonimos)
+
+def abstracts_corpus(project_root):
+    """Abstracts del archivo unificado desde la caché compartida (solo se leen si se recorren)"""
+    yield from load_corpus(project_root, load_abstracts)
+
+@st.cache_data(show_spinner="Analizando categorías...")
+def analizar_categorias(project_root, ris_path, categorias_json_path, output_dir, ris_version, categorias_mtime, _matcher):
+    """Frecuencias y co-ocurrencia de todas las categorías (la versión del corpus y la fecha de las categorías invalidan el caché)"""
+    return run_analysis(ris_path, categorias_json_path, output_dir, _matcher, abstracts=abstracts_corpus(project_root))
+
+@st.cache_resource(show_spinner="Extrayendo términos candidatos...")
+def cargar_candidatos(project_root, ris_path, output_dir, ris_version):
+    """N-gramas candidatos del corpus (se recalculan solo si cambia el archivo unificado)"""
+    return get_candidate_stats(abstracts_corpus(project_root), output_dir, source_signature(ris_path))
 
 # --- FUNCIÓN PRINCIPAL PARA STREAMLIT ---
 def mostrar_requerimiento_3(project_root):
@@ -74,38 +59,32 @@ def mostrar_requerimiento_3(project_root):
     project_root = Path(project_root)  # Convierte a Path
     categorias_json_path = project_root / 'requerimiento3' / 'categorias.json'
     categorias, sinonimos = cargar_categorias(categorias_json_path)
+    matcher = cargar_matcher(categorias_json_path)
 
-    # --- Selección de categoría ---
-    categorias_list = list(categorias.keys())
-    
-    # Fijar directamente la categoría
-    selected_categoria = "Concepts of Generative AI in Education"
-    st.write(f"Analizando categoría: **{selected_categoria}**")
-
-    # --- Parsear archivo RIS ---
+    # --- Archivo unificado ---
     ris_file = project_root / 'resultados' / 'requerimiento1' / 'resultados_unificados.ris'
     if not ris_file.exists():
         st.warning("⚠️ No se encontró el archivo unificado de Requerimiento 1. Ejecuta primero R1.")
         return
 
-    records = parse_ris_file(ris_file)
-
-    # --- Contar frecuencia ---
-    freq_global = Counter()
-    freq_categoria = Counter()
-    cooccurrence_matrix = Counter()
-
-    for record in records:
-        abstract = record.get('abstract', '')
-        if not abstract:
-            continue
-        terms = find_terms_in_abstract(abstract, selected_categoria, categorias, sinonimos)
-        freq_categoria.update(terms)
-        words_in_abstract = normalize_text(abstract).split()
-        freq_global.update(words_in_abstract)
-        # Co-ocurrencia
-        for pair in combinations(sorted(terms), 2):
-            cooccurrence_matrix[pair] += 1
+    # --- Análisis de todas las categorías (una pasada, reutilizado desde disco) ---
+    output_dir = project_root / 'resultados' / 'requerimiento3'
+    ris_version = corpus_version(str(ris_file))
+    resultados = analizar_categorias(str(project_root), str(ris_file), str(categorias_json_path), str(output_dir),
+                                     ris_version, categorias_json_path.stat().st_mtime, matcher)
+    st.caption(f"{resultados['n_abstracts']} abstracts analizados para {len(categorias)} categorías")
+
+    # --- Selección de categoría ---
+    categorias_list = list(categorias.keys())
+    default_categoria = "Concepts of Generative AI in Education"
+    selected_categoria = st.selectbox(
+        "Categoría",
+        categorias_list,
+        index=categorias_list.index(default_categoria) if default_categoria in categorias_list else 0
+    )
+
+    freq_categoria = resultados['freq_categoria'].get(selected_categoria, Counter())
+    cooccurrence_matrix = resultados['cooccurrence'].get(selected_categoria, Counter())
 
     # --- Mostrar tabla de frecuencia ---
     st.subheader(f"Frecuencia de términos - {selected_categoria}")
@@ -118,45 +97,49 @@ def mostrar_requerimiento_3(project_root):
 
     # --- Nube de palabras ---
     st.subheader("Nube de palabras")
-    if freq_categoria:
-        plt.figure(figsize=(10,5))
-        wc = WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(freq_categoria)
-        plt.imshow(wc, interpolation='bilinear')
-        plt.axis('off')
-        st.pyplot(plt)
-        plt.close()
+    wordcloud_path = output_dir / f'wordcloud_{selected_categoria}.png'
+    if freq_categoria and wordcloud_path.exists():
+        st.image(str(wordcloud_path), use_container_width=True)
+    elif freq_categoria:
+        show_wordcloud(get_wordcloud_cache(wordcloud_cache_dir(str(project_root))), freq_categoria, max_words=200)
     else:
         st.info("No hay términos para generar nube de palabras.")
 
     # --- Sugerencia de nuevas palabras ---
     st.subheader("Palabras nuevas sugeridas (Top 15)")
-    top_new_words = [w for w, f in freq_global.most_common(15)
-                    if w.lower() not in [t.lower() for t in categorias[selected_categoria]]]
-    st.write(top_new_words)
-
-    # --- Precisión estimada de las palabras nuevas ---
-    palabras_existentes = [t.lower() for t in categorias[selected_categoria]]
-    nuevas = [w.lower() for w in top_new_words]
-    n_correctas = sum(1 for w in nuevas if w in palabras_existentes)  # esto compara con la lista original
-    precision = n_correctas / len(nuevas) if nuevas else 0
-    st.write(f"Precisión estimada de las palabras nuevas: {precision:.2f}")
+    metodos = {'TF-IDF': 'tfidf', 'Chi-cuadrado (vs. documentos de la categoría)': 'chi2', 'C-value': 'cvalue'}
+    metodo = st.radio("Clasificar candidatos por", list(metodos), horizontal=True)
+    candidatos = cargar_candidatos(str(project_root), str(ris_file), str(output_dir), ris_version)
+    terminos_categoria = categorias[selected_categoria] + [s for s, p in sinonimos.items()
+                                                          if p in {t.lower() for t in categorias[selected_categoria]}]
+    sugerencias = candidatos.rank(metodos[metodo], terminos_categoria, top_n=15)
+    if sugerencias:
+        st.table(pd.DataFrame(sugerencias).rename(columns={'term': 'Término', 'score': 'Puntaje',
+                                                           'df': 'Documentos', 'frequency': 'Frecuencia'}))
+    else:
+        st.info("No hay candidatos para este método (la categoría no aparece en los abstracts).")
 
 
     # --- Opcional: Red de co-ocurrencia ---
-    import networkx as nx
     if cooccurrence_matrix:
         st.subheader("Red de co-ocurrencia")
-        G = nx.Graph()
-        for term in freq_categoria.keys():
-            G.add_node(term)
-        for (t1, t2), w in cooccurrence_matrix.items():
-            G.add_edge(t1, t2, weight=w)
-        plt.figure(figsize=(12,8))
-        pos = nx.spring_layout(G, k=0.5)
-        nx.draw_networkx_nodes(G, pos, node_size=50)
-        nx.draw_networkx_edges(G, pos, alpha=0.3)
-        nx.draw_networkx_labels(G, pos, font_size=8)
-        plt.title('Red de Co-ocurrencia de Términos', fontsize=14)
-        plt.axis('off')
-        st.pyplot(plt)
-        plt.close()
+        col1, col2 = st.columns(2)
+        with col1:
+            medida = st.selectbox("Medida de asociación", list(MEASURES),
+                                  index=MEASURES.index('association_strength'))
+        with col2:
+            min_cooc = st.slider("Co-ocurrencia mínima", 1, max(2, max(cooccurrence_matrix.values())), 1)
+
+        terms = sorted(freq_categoria)
+        C = matrix_from_counts(terms, freq_categoria, cooccurrence_matrix)
+        A = association_matrix(C, medida, n_docs=resultados['n_abstracts'])
+        edges = threshold_edges(A, C, min_cooccurrence=min_cooc)
+
+        edges = prune_edges(edges, len(terms), max_edges=2000)
+
+        # Layout de fuerzas con arranque en caliente desde las posiciones guardadas
+        layout_path = output_dir / f'layout_{selected_categoria}.json'
+        pos = cached_layout(str(layout_path), terms, edges)
+        fig = network_figure(terms, pos, edges, sizes=[freq_categoria[t] for t in terms],
+                             title='Red de Co-ocurrencia de Términos')
+        st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,229 @@
+# requerimiento3_palabras.py
+"""
+Búsqueda de términos de categorías (y sus sinónimos) en abstracts para el Requerimiento 3.
+
+Todos los términos y sinónimos de todas las categorías se compilan una sola vez en una
+expresión regular de alternancia; cada abstract se recorre una única vez y cada coincidencia
+se traduce a los pares (categoría, término principal) que representa.
+
+- La alternancia va dentro de un lookahead y ordenada de mayor a menor longitud, así en cada
+  posición se obtiene el patrón más largo que termina en límite de palabra sin consumir texto
+  (se detectan coincidencias solapadas, p. ej. "machine learning" y "learning").
+- Los patrones más cortos que empiezan en la misma posición son prefijos del encontrado; se
+  precalculan (solo los que cortan en límite de palabra) para no perder ninguno.
+El resultado es el mismo que buscar cada término y sinónimo con re.search(r'\\bpatrón\\b').
+
+analyze_categories recorre el corpus una vez para todas las categorías y run_analysis guarda
+el resultado (palabras_clave.json y wordcloud_*.png en resultados/requerimiento3) para
+reutilizarlo mientras no cambien el archivo unificado ni categorias.json.
+"""
+import os
+import re
+import json
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Set
+
+from requerimiento3.coocurrencia import binary_matrix, cooccurrence_matrix, pair_counts
+from requerimiento3.nube_palabras import get_wordcloud_cache, render_wordcloud
+
+
+def normalize_text(text):
+    """Normaliza texto: minúsculas y quita signos de puntuación"""
+    text = text.lower()
+    text = re.sub(r'[^\w\s-]', '', text)
+    return text
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+
+class KeywordMatcher:
+    def __init__(self, categorias: Dict[str, List[str]], sinonimos: Dict[str, str]):
+        self.categorias = categorias
+
+        # primario (minúsculas) -> sinónimos
+        synonyms_by_primary = defaultdict(list)
+        for syn, primary in sinonimos.items():
+            synonyms_by_primary[primary].append(syn)
+
+        # patrón -> pares (categoría, término) que representa
+        self.targets = defaultdict(set)
+        for categoria, terms in categorias.items():
+            for term in terms:
+                term_norm = term.lower()
+                for pattern in [term_norm] + synonyms_by_primary.get(term_norm, []):
+                    if pattern:
+                        self.targets[pattern].add((categoria, term))
+
+        patterns = sorted(self.targets, key=lambda p: (-len(p), p))
+        self.regex = None
+        if patterns:
+            alternation = '|'.join(re.escape(p) for p in patterns)
+            self.regex = re.compile(r'(?=\b(' + alternation + r')\b)')
+
+        # patrón -> patrones más cortos que son prefijo suyo y terminan en límite de palabra
+        self.prefixes = {}
+        for pattern in patterns:
+            shorter = []
+            for cut in range(1, len(pattern)):
+                prefix = pattern[:cut]
+                if prefix in self.targets and _is_word_char(prefix[-1]) != _is_word_char(pattern[cut]):
+                    shorter.append(prefix)
+            self.prefixes[pattern] = shorter
+
+    def match(self, abstract: str) -> Dict[str, Set[str]]:
+        """Términos encontrados en el abstract, agrupados por categoría (una sola pasada)"""
+        found = defaultdict(set)
+        if self.regex is None or not abstract:
+            return found
+        matched = set()
+        for m in self.regex.finditer(normalize_text(abstract)):
+            pattern = m.group(1)
+            matched.add(pattern)
+            matched.update(self.prefixes[pattern])
+        for pattern in matched:
+            for categoria, term in self.targets[pattern]:
+                found[categoria].add(term)
+        return found
+
+    def find_terms(self, abstract: str, categoria: str) -> Set[str]:
+        """Términos de una sola categoría presentes en el abstract"""
+        return self.match(abstract).get(categoria, set())
+
+
+# ------------------------------
+# Análisis de todas las categorías en una sola pasada
+# ------------------------------
+ANALYSIS_FILE = 'palabras_clave.json'
+
+
+def iter_abstracts(filepath):
+    """Recorre el archivo RIS línea a línea y entrega los abstracts (sin cargarlo completo)"""
+    abstract = None
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('AB  - '):
+                abstract = line[6:]
+            elif line.startswith('ER  -'):
+                if abstract:
+                    yield abstract
+                abstract = None
+
+
+def load_abstracts(filepath):
+    """Lista de abstracts del archivo RIS (lector para requerimiento1.corpus.load_corpus)"""
+    return list(iter_abstracts(filepath))
+
+
+def analyze_categories(abstracts, matcher: KeywordMatcher):
+    """
+    Una pasada por el corpus para todas las categorías: frecuencia de términos y
+    co-ocurrencia (pares de términos en el mismo abstract) por categoría, más la
+    frecuencia global de palabras. La co-ocurrencia se calcula como Xᵀ·X sobre la matriz
+    binaria documentos x términos de cada categoría.
+    """
+    doc_terms = {categoria: [] for categoria in matcher.categorias}
+    freq_global = Counter()
+    n_abstracts = 0
+
+    for abstract in abstracts:
+        if not abstract:
+            continue
+        n_abstracts += 1
+        freq_global.update(normalize_text(abstract).split())
+        for categoria, terms in matcher.match(abstract).items():
+            doc_terms[categoria].append(terms)
+
+    freq_categoria, cooccurrence = {}, {}
+    for categoria, docs in doc_terms.items():
+        X, terms = binary_matrix(docs, list(dict.fromkeys(matcher.categorias[categoria])))
+        C = cooccurrence_matrix(X)
+        freq_categoria[categoria] = Counter({t: int(f) for t, f in zip(terms, C.diagonal()) if f})
+        cooccurrence[categoria] = Counter(pair_counts(C, terms))
+
+    return {
+        'n_abstracts': n_abstracts,
+        'freq_categoria': freq_categoria,
+        'cooccurrence': cooccurrence,
+        'freq_global': freq_global,
+    }
+
+
+def source_signature(*paths):
+    """Tamaño y fecha de modificación de los archivos de entrada (para invalidar resultados)"""
+    return {str(p): [os.path.getsize(p), os.path.getmtime(p)] for p in paths}
+
+
+def save_analysis(results, output_dir, sources=None):
+    """Guarda el análisis en JSON y genera wordcloud_<categoría>.png y wordcloud_global.png"""
+    os.makedirs(output_dir, exist_ok=True)
+    data = {
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'sources': sources or {},
+        'n_abstracts': results['n_abstracts'],
+        'freq_categoria': {c: dict(freq.most_common()) for c, freq in results['freq_categoria'].items()},
+        'cooccurrence': {c: [[t1, t2, w] for (t1, t2), w in pairs.most_common()]
+                         for c, pairs in results['cooccurrence'].items()},
+        'freq_global': dict(results['freq_global'].most_common()),
+    }
+    out_path = os.path.join(output_dir, ANALYSIS_FILE)
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+    # Caché de nubes compartida con el Requerimiento 5 (resultados/cache_nubes)
+    cache = get_wordcloud_cache(os.path.join(os.path.dirname(os.path.abspath(output_dir)), 'cache_nubes'))
+    for categoria, freq in results['freq_categoria'].items():
+        save_wordcloud(freq, os.path.join(output_dir, f'wordcloud_{categoria}.png'), cache=cache)
+    save_wordcloud(results['freq_global'], os.path.join(output_dir, 'wordcloud_global.png'),
+                   exclude_stopwords=True, cache=cache)
+    return out_path
+
+
+def load_analysis(output_dir, sources=None):
+    """Carga el análisis guardado; devuelve None si no existe o si cambiaron las entradas"""
+    path = os.path.join(output_dir, ANALYSIS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if sources is not None and data.get('sources') != sources:
+        return None
+    return {
+        'n_abstracts': data['n_abstracts'],
+        'freq_categoria': {c: Counter(freq) for c, freq in data['freq_categoria'].items()},
+        'cooccurrence': {c: Counter({(t1, t2): w for t1, t2, w in pairs})
+                         for c, pairs in data['cooccurrence'].items()},
+        'freq_global': Counter(data['freq_global']),
+    }
+
+
+def save_wordcloud(frequencies, path, width=800, height=400, exclude_stopwords=False, cache=None):
+    """Nube de palabras a partir de frecuencias (no genera nada si están vacías); con `cache`
+    solo se renderiza si esas frecuencias no se habían dibujado antes"""
+    from wordcloud import STOPWORDS
+    if exclude_stopwords:
+        frequencies = {w: f for w, f in frequencies.items() if w not in STOPWORDS}
+    if not frequencies:
+        return None
+    if cache is not None:
+        return cache.save(frequencies, path, max_words=200, width=width, height=height)
+    render_wordcloud(frequencies, max_words=200, width=width, height=height).save(path, format='PNG')
+    return path
+
+
+def run_analysis(ris_path, categorias_path, output_dir, matcher: KeywordMatcher, force=False, abstracts=None):
+    """
+    Reutiliza el análisis guardado si las entradas no cambiaron; si no, lo recalcula y lo guarda.
+    `abstracts` permite pasar los abstracts ya cargados (por defecto se leen de ris_path).
+    """
+    sources = json.loads(json.dumps(source_signature(ris_path, categorias_path)))
+    if not force:
+        cached = load_analysis(output_dir, sources)
+        if cached is not None:
+            return cached
+    results = analyze_categories(iter_abstracts(ris_path) if abstracts is None else abstracts, matcher)
+    save_analysis(results, output_dir, sources)
+    return results
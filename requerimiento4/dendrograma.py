@@ -0,0 +1,107 @@
+# dendrograma.py
+"""
+Renderizado rápido de dendrogramas grandes para el Requerimiento 4.
+
+- Con más de `max_leaves` hojas el árbol se trunca (truncate_mode='lastp'): solo se dibujan
+  las últimas fusiones y cada subárbol colapsado aparece como una hoja "(n)".
+- La figura interactiva se arma con Plotly a partir de las coordenadas que calcula
+  scipy (dendrogram(no_plot=True)), en una sola traza de líneas.
+- Los subárboles colapsados se pueden expandir bajo demanda: subtree_linkage extrae la
+  matriz Z de un nodo y se dibuja con el mismo renderizador.
+"""
+import numpy as np
+from scipy.cluster.hierarchy import dendrogram
+
+MAX_LEAVES = 60
+
+
+def dendrogram_coordinates(Z, labels=None, max_leaves=MAX_LEAVES):
+    """Coordenadas del dendrograma (truncado si hay más de max_leaves hojas)"""
+    n = Z.shape[0] + 1
+    kwargs = {
+        'no_plot': True,
+        'distance_sort': 'descending',
+        'show_leaf_counts': True,
+        'labels': list(labels) if labels is not None else None,
+    }
+    if n > max_leaves:
+        kwargs.update(truncate_mode='lastp', p=max_leaves)
+    return dendrogram(Z, **kwargs)
+
+
+def collapsed_nodes(Z, p=MAX_LEAVES):
+    """
+    Nodos que quedan como hojas al truncar con 'lastp' (los p clusters que existen antes
+    de las últimas p-1 fusiones). Devuelve [(node_id, tamaño)] de los que agrupan más de
+    un documento, ordenados de mayor a menor.
+    """
+    n = Z.shape[0] + 1
+    if n <= p:
+        return []
+    active = set(range(n))
+    for m in range(n - p):
+        active.discard(int(Z[m, 0]))
+        active.discard(int(Z[m, 1]))
+        active.add(n + m)
+    nodes = [(node, int(Z[node - n, 3])) for node in active if node >= n]
+    return sorted(nodes, key=lambda item: -item[1])
+
+
+def subtree_linkage(Z, node_id):
+    """
+    Matriz Z del subárbol con raíz en node_id y los índices originales de sus hojas,
+    renumerados como lo espera scipy (hojas 0..L-1, fusiones en orden original).
+    """
+    n = Z.shape[0] + 1
+    if node_id < n:
+        return np.zeros((0, 4)), np.array([node_id])
+
+    merges, leaves = [], []
+    stack = [node_id]
+    while stack:
+        node = stack.pop()
+        if node < n:
+            leaves.append(node)
+        else:
+            merges.append(node - n)
+            stack.extend((int(Z[node - n, 0]), int(Z[node - n, 1])))
+
+    leaves = np.sort(np.array(leaves))
+    merges = np.sort(np.array(merges))
+    new_ids = {int(leaf): i for i, leaf in enumerate(leaves)}
+    for pos, m in enumerate(merges):
+        new_ids[n + int(m)] = len(leaves) + pos
+
+    Z_sub = Z[merges].copy()
+    Z_sub[:, 0] = [new_ids[int(a)] for a in Z[merges, 0]]
+    Z_sub[:, 1] = [new_ids[int(b)] for b in Z[merges, 1]]
+    return Z_sub, leaves
+
+
+def plotly_dendrogram(Z, labels=None, title='', threshold=None, max_leaves=MAX_LEAVES, height=500):
+    """Dendrograma interactivo en Plotly (una traza de segmentos), truncado si es grande"""
+    import plotly.graph_objects as go
+    info = dendrogram_coordinates(Z, labels, max_leaves)
+
+    xs, ys = [], []
+    for icoord, dcoord in zip(info['icoord'], info['dcoord']):
+        xs.extend(icoord + [None])
+        ys.extend(dcoord + [None])
+
+    fig = go.Figure(go.Scatter(x=xs, y=ys, mode='lines', line=dict(color='#3498db', width=1.2),
+                               hoverinfo='y', showlegend=False))
+
+    tick_text = [str(label)[:40] for label in info['ivl']]
+    fig.update_layout(
+        title=title,
+        height=height,
+        margin=dict(l=40, r=20, t=50, b=160),
+        xaxis=dict(tickmode='array', tickvals=[5 + 10 * i for i in range(len(tick_text))],
+                   ticktext=tick_text, tickangle=-45, showgrid=False, zeroline=False),
+        yaxis=dict(title='Distancia', zeroline=False),
+        plot_bgcolor='white'
+    )
+    if threshold:
+        fig.add_hline(y=threshold, line_dash='dash', line_color='red',
+                      annotation_text=f'Umbral: {threshold:.2f}')
+    return fig
@@ -2,19 +2,29 @@ import streamlit as st
 import os
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from scipy.cluster.hierarchy import dendrogram, linkage, fcluster
 from scipy.spatial.distance import pdist, squareform
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.metrics import silhouette_score, calinski_harabasz_score, davies_bouldin_score
-from sentence_transformers import SentenceTransformer
+from sklearn.preprocessing import normalize
+from sklearn.metrics import silhouette_score
+from scipy import sparse
+from sklearn.cluster import MiniBatchKMeans
+from requerimiento2 import embeddings as sbert_embeddings
+from requerimiento2.tfidf_corpus import get_corpus_tfidf
+from requerimiento1.corpus import load_corpus
+from requerimiento4.dendrograma import MAX_LEAVES, plotly_dendrogram, collapsed_nodes, subtree_linkage
 import json
+import hashlib
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    # fastcluster: misma API que scipy.cluster.hierarchy.linkage pero más rápido (opcional)
+    import fastcluster
+except ImportError:
+    fastcluster = None
+
 class HierarchicalClusteringAnalyzer:
     def __init__(self, project_root):
         self.project_root = project_root
@@ -22,6 +32,10 @@ class HierarchicalClusteringAnalyzer:
         self.abstracts = []
         self.titles = []
         self.results = {}
+        self.tfidf_model = None
+        # Artefactos intermedios del último análisis, por embedding:
+        # textos, títulos, embeddings, distancias condensadas y matrices Z por linkage
+        self.artifacts = {}
         
     def load_data(self):
         """Carga los datos del archivo unificado del Requerimiento 1"""
@@ -30,9 +44,9 @@ class HierarchicalClusteringAnalyzer:
         if not os.path.exists(unified_path):
             raise FileNotFoundError("No se encontró el archivo unificado. Ejecuta primero el Requerimiento 1.")
         
-        # Usar la misma función de carga del Requerimiento 2
+        # Misma función de carga del Requerimiento 2, a través de la caché compartida del corpus
         from requerimiento2.requerimiento2_similitud import load_unified_ris
-        self.df = load_unified_ris(unified_path)
+        self.df = load_corpus(self.project_root, load_unified_ris)
         
         # Filtrar abstracts no vacíos
         valid_indices = []
@@ -51,6 +65,9 @@ class HierarchicalClusteringAnalyzer:
         if len(self.abstracts) < 3:
             raise ValueError("Se necesitan al menos 3 documentos con abstracts válidos para clustering")
         
+        # Modelo TF-IDF del corpus: se ajusta una sola vez y se reutiliza en análisis y guardado
+        self.tfidf_model = get_corpus_tfidf(self.project_root)
+        
         st.info(f"Cargados {len(self.abstracts)} documentos con abstracts válidos")
         return len(self.abstracts)
     
@@ -71,47 +88,261 @@ class HierarchicalClusteringAnalyzer:
         return [clean_text(text) for text in texts]
     
     def create_tfidf_embeddings(self, texts):
-        """Crea embeddings TF-IDF"""
-        processed_texts = self.preprocess_text(texts)
-        vectorizer = TfidfVectorizer(
-            max_features=1000,
-            stop_words='english',
-            min_df=2,
-            max_df=0.8
-        )
-        tfidf_matrix = vectorizer.fit_transform(processed_texts)
-        return tfidf_matrix.toarray(), vectorizer
-    
-    def create_sbert_embeddings(self, texts):
-        """Crea embeddings usando SBERT"""
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        embeddings = model.encode(texts, show_progress_bar=False)
-        return embeddings
-    
-    def compute_distance_matrix(self, embeddings, method='cosine'):
-        """Calcula matriz de distancias"""
-        if method == 'cosine':
-            similarity_matrix = cosine_similarity(embeddings)
-            distance_matrix = 1 - similarity_matrix
-        elif method == 'euclidean':
-            distance_matrix = pdist(embeddings, metric='euclidean')
-            distance_matrix = squareform(distance_matrix)
-        else:
+        """Crea embeddings TF-IDF a partir de las filas del modelo del corpus"""
+        if self.tfidf_model is None:
+            self.tfidf_model = get_corpus_tfidf(self.project_root)
+        tfidf_matrix = self.tfidf_model.tfidf_texts(texts, min_df=2, max_df=0.8, max_features=1000,
+                                                    stop_words='english')
+        return tfidf_matrix, self.tfidf_model
+    
+    def create_sbert_embeddings(self, texts, backend=None):
+        """Crea embeddings usando SBERT (backend: torch, int8, onnx u onnx-int8)"""
+        return sbert_embeddings.encode(texts, model_name='all-MiniLM-L6-v2', backend=backend)
+    
+    def compute_distance_matrix(self, embeddings, method='cosine', block_elements=2 ** 23):
+        """
+        Calcula la matriz de distancias en forma condensada (como pdist).
+        Acepta embeddings densos o dispersos (CSR); el coseno se calcula con productos
+        X·Xᵀ por bloques de filas, sin materializar la matriz n×n completa.
+        """
+        if method not in ('cosine', 'euclidean'):
             raise ValueError("Método de distancia no soportado")
         
-        return distance_matrix
+        if method == 'euclidean' and not sparse.issparse(embeddings):
+            return pdist(embeddings, metric='euclidean')
+        
+        X = normalize(embeddings) if method == 'cosine' else embeddings
+        n = X.shape[0]
+        if method == 'euclidean':
+            sq_norms = np.asarray(X.multiply(X).sum(axis=1)).ravel()
+        
+        condensed = np.empty(n * (n - 1) // 2, dtype=np.float64)
+        block = max(1, block_elements // max(n, 1))
+        for start in range(0, n - 1, block):
+            end = min(start + block, n - 1)
+            products = X[start:end] @ X.T
+            products = products.toarray() if sparse.issparse(products) else np.asarray(products)
+            for i in range(start, end):
+                row = products[i - start, i + 1:]
+                if method == 'cosine':
+                    dist = 1.0 - row
+                else:
+                    dist = np.sqrt(np.maximum(sq_norms[i] + sq_norms[i + 1:] - 2.0 * row, 0.0))
+                offset = i * n - i * (i + 1) // 2
+                condensed[offset:offset + n - i - 1] = dist
+        
+        return np.clip(condensed, 0.0, None, out=condensed)
     
     def hierarchical_clustering(self, distance_matrix, method='ward'):
-        """Aplica clustering jerárquico"""
-        # Convertir a forma condensada para scipy
-        condensed_dist = distance_matrix[np.triu_indices(len(distance_matrix), k=1)]
+        """Aplica clustering jerárquico (acepta distancias condensadas o cuadradas)"""
+        distance_matrix = np.asarray(distance_matrix)
+        if distance_matrix.ndim == 2:
+            # Convertir a forma condensada para scipy
+            condensed_dist = distance_matrix[np.triu_indices(len(distance_matrix), k=1)]
+        else:
+            condensed_dist = distance_matrix
         
         # Aplicar linkage
+        if fastcluster is not None:
+            return fastcluster.linkage(condensed_dist, method=method)
         Z = linkage(condensed_dist, method=method)
         return Z
     
-    def calculate_clustering_metrics(self, embeddings, labels):
-        """Calcula métricas de calidad del clustering"""
+    def build_centroids(self, embeddings, n_centroids=300, random_state=42):
+        """
+        Primera etapa del modo escalable: agrupa todos los documentos con MiniBatchKMeans
+        (sobre vectores normalizados) en a lo sumo `n_centroids` grupos.
+        Devuelve centroides, asignación documento -> grupo y tamaño de cada grupo.
+        """
+        X = normalize(embeddings)
+        k = min(n_centroids, X.shape[0])
+        kmeans = MiniBatchKMeans(n_clusters=k, batch_size=1024, n_init=3, random_state=random_state)
+        labels = kmeans.fit_predict(X)
+        # Descartar centroides que quedaron vacíos y renumerar
+        used, assignments = np.unique(labels, return_inverse=True)
+        centroids = kmeans.cluster_centers_[used]
+        sizes = np.bincount(assignments)
+        return centroids, assignments, sizes
+    
+    def _cluster_centroids(self, embeddings, labels):
+        """Centroides por cluster (k × d denso) y tamaños; soporta matrices dispersas"""
+        unique_labels, inverse = np.unique(labels, return_inverse=True)
+        n = len(labels)
+        indicator = sparse.csr_matrix((np.ones(n), (inverse, np.arange(n))), shape=(len(unique_labels), n))
+        sizes = np.asarray(indicator.sum(axis=1)).ravel()
+        sums = indicator @ embeddings
+        sums = sums.toarray() if sparse.issparse(sums) else np.asarray(sums)
+        return sums / sizes[:, None], sizes, inverse
+    
+    def _calinski_harabasz(self, embeddings, labels):
+        """Calinski-Harabasz calculado con centroides (sin densificar los embeddings)"""
+        centroids, sizes, _ = self._cluster_centroids(embeddings, labels)
+        n, k = len(labels), len(sizes)
+        if sparse.issparse(embeddings):
+            total_sq = float(embeddings.multiply(embeddings).sum())
+        else:
+            total_sq = float(np.sum(np.square(embeddings)))
+        mean = (sizes @ centroids) / n
+        extra = float(np.sum(sizes * np.sum(np.square(centroids - mean), axis=1)))
+        intra = total_sq - float(np.sum(sizes * np.sum(np.square(centroids), axis=1)))
+        if intra <= 0:
+            return 1.0
+        return extra * (n - k) / (intra * (k - 1.0))
+    
+    def _davies_bouldin(self, embeddings, labels):
+        """Davies-Bouldin calculado con centroides (sin densificar los embeddings)"""
+        centroids, sizes, inverse = self._cluster_centroids(embeddings, labels)
+        intra = np.zeros(len(sizes))
+        for c in range(len(sizes)):
+            members = embeddings[np.flatnonzero(inverse == c)]
+            if sparse.issparse(members):
+                sq = np.asarray(members.multiply(members).sum(axis=1)).ravel()
+            else:
+                sq = np.sum(np.square(members), axis=1)
+            proj = np.asarray(members @ centroids[c]).ravel()
+            dist = np.sqrt(np.maximum(sq - 2.0 * proj + centroids[c] @ centroids[c], 0.0))
+            intra[c] = dist.mean()
+        
+        centroid_distances = squareform(pdist(centroids, metric='euclidean'))
+        if np.allclose(intra, 0) or np.allclose(centroid_distances, 0):
+            return 0.0
+        centroid_distances[centroid_distances == 0] = np.inf
+        combined = intra[:, None] + intra
+        return float(np.mean(np.max(combined / centroid_distances, axis=1)))
+    
+    def search_cut_height(self, Z, embeddings, assignments=None, min_k=2, max_k=None):
+        """
+        Recorre todos los niveles de corte del dendrograma y puntúa cada uno con
+        Calinski-Harabasz de forma incremental.
+        
+        Por cada cluster activo se mantienen su vector suma S_c, su tamaño n_c y ||S_c||².
+        Al fusionar a y b: ||S_a+S_b||² = ||S_a||² + ||S_b||² + 2·S_a·S_b, de modo que
+        Q = Σ ||S_c||²/n_c se actualiza en O(d) por fusión y en cada nivel con k clusters:
+            tr(W) = Σ||x_i||² - Q,   tr(B) = Q - ||S||²/n,
+            CH(k) = (tr(B)/(k-1)) / (tr(W)/(n-k))
+        Así se evalúan los n-1 cortes en un solo recorrido, sin fcluster ni métricas por nivel.
+        En modo escalable las hojas de Z son grupos (assignments = grupo de cada documento).
+        """
+        is_sparse = sparse.issparse(embeddings)
+        if is_sparse:
+            embeddings = embeddings.tocsr()
+            total_sq = float(embeddings.multiply(embeddings).sum())
+        else:
+            embeddings = np.asarray(embeddings, dtype=np.float64)
+            total_sq = float(np.sum(np.square(embeddings)))
+        n = embeddings.shape[0]
+        
+        # Sumas y tamaños de las hojas del dendrograma
+        if assignments is None:
+            leaf_sums = embeddings
+            leaf_sizes = np.ones(n)
+        else:
+            n_groups = int(assignments.max()) + 1
+            indicator = sparse.csr_matrix((np.ones(n), (assignments, np.arange(n))), shape=(n_groups, n))
+            leaf_sizes = np.asarray(indicator.sum(axis=1)).ravel()
+            leaf_sums = indicator @ embeddings
+            if sparse.issparse(leaf_sums):
+                leaf_sums = leaf_sums.toarray()
+            is_sparse = False
+        n_leaves = len(leaf_sizes)
+        
+        def row(i):
+            return leaf_sums[i] if not is_sparse else leaf_sums.getrow(i)
+        
+        def dot(a, b):
+            return float(a.multiply(b).sum()) if is_sparse else float(a @ b)
+        
+        total_sum = np.asarray(leaf_sums.sum(axis=0)).ravel()
+        global_term = float(total_sum @ total_sum) / n
+        
+        sums, sizes, sq = {}, {}, {}
+        Q = 0.0
+        for i in range(n_leaves):
+            sums[i] = row(i)
+            sizes[i] = leaf_sizes[i]
+            sq[i] = dot(sums[i], sums[i])
+            Q += sq[i] / sizes[i]
+        
+        if max_k is None:
+            max_k = max(10, int(np.sqrt(n)))
+        max_k = min(max_k, n_leaves - 1, n - 1)
+        scores = {}
+        
+        for m in range(n_leaves - 1):
+            a, b = int(Z[m, 0]), int(Z[m, 1])
+            new_id = n_leaves + m
+            sq_new = sq[a] + sq[b] + 2.0 * dot(sums[a], sums[b])
+            size_new = sizes[a] + sizes[b]
+            Q += sq_new / size_new - sq[a] / sizes[a] - sq[b] / sizes[b]
+            sums[new_id] = sums[a] + sums[b]
+            sizes[new_id], sq[new_id] = size_new, sq_new
+            for old in (a, b):
+                del sums[old], sizes[old], sq[old]
+            
+            k = n_leaves - (m + 1)
+            if min_k <= k <= max_k:
+                within = total_sq - Q
+                between = Q - global_term
+                # Sin dispersión interna (duplicados, cortes casi todo singletons) CH vale 1.0,
+                # igual que sklearn.metrics.calinski_harabasz_score, en lugar de ganar con infinito
+                scores[k] = 1.0 if within <= 1e-12 else (between / (k - 1)) / (within / (n - k))
+        
+        if not scores:
+            return {'best_k': 1, 'threshold': float(Z[-1, 2]), 'scores': {}}
+        
+        best_k = max(scores, key=scores.get)
+        # Altura de corte entre la última fusión aplicada y la siguiente
+        lower = Z[n_leaves - best_k - 1, 2]
+        upper = Z[n_leaves - best_k, 2]
+        return {'best_k': int(best_k), 'threshold': float((lower + upper) / 2), 'scores': scores}
+    
+    def _stratified_sample(self, labels, sample_size, random_state=0):
+        """Índices (ordenados) de una muestra estratificada por cluster de tamaño ~sample_size"""
+        rng = np.random.default_rng(random_state)
+        n = len(labels)
+        chosen = []
+        for label in np.unique(labels):
+            members = np.flatnonzero(labels == label)
+            k = max(1, int(round(sample_size * len(members) / n)))
+            chosen.append(rng.choice(members, size=min(k, len(members)), replace=False))
+        return np.sort(np.concatenate(chosen))
+    
+    def _condensed_subset(self, distances, n, idx):
+        """Distancias condensadas entre los puntos `idx` (ordenados) de una matriz condensada de n puntos"""
+        I, J = np.triu_indices(len(idx), k=1)
+        i, j = idx[I], idx[J]
+        return distances[n * i - i * (i + 1) // 2 + (j - i - 1)]
+    
+    def silhouette_precomputed(self, embeddings, labels, distances=None, sample_size=None, random_state=0):
+        """
+        Silhouette con metric='precomputed' sobre distancias coseno.
+        Usa las distancias condensadas ya calculadas si se pasan; con sample_size toma una
+        muestra estratificada por cluster en lugar de los n puntos.
+        """
+        labels = np.asarray(labels)
+        n = len(labels)
+        if sample_size and n > sample_size:
+            idx = self._stratified_sample(labels, sample_size, random_state)
+        else:
+            idx = np.arange(n)
+        
+        if distances is not None:
+            sub = self._condensed_subset(np.asarray(distances), n, idx)
+        else:
+            sub = self.compute_distance_matrix(embeddings[idx], 'cosine')
+        
+        sub_labels = labels[idx]
+        n_labels = len(np.unique(sub_labels))
+        if n_labels < 2 or n_labels >= len(idx):
+            return -1
+        return float(silhouette_score(squareform(sub, checks=False), sub_labels, metric='precomputed'))
+    
+    def calculate_clustering_metrics(self, embeddings, labels, sample_size=None, distances=None):
+        """
+        Calcula métricas de calidad del clustering.
+        distances: distancias condensadas entre los mismos documentos (se reutilizan para silhouette)
+        sample_size: tamaño de la muestra estratificada para silhouette
+        """
         if len(np.unique(labels)) < 2:
             return {
                 'silhouette': -1,
@@ -120,9 +351,9 @@ class HierarchicalClusteringAnalyzer:
             }
         
         try:
-            silhouette = silhouette_score(embeddings, labels)
-            calinski = calinski_harabasz_score(embeddings, labels)
-            davies = davies_bouldin_score(embeddings, labels)
+            silhouette = self.silhouette_precomputed(embeddings, labels, distances, sample_size)
+            calinski = self._calinski_harabasz(embeddings, labels)
+            davies = self._davies_bouldin(embeddings, labels)
         except:
             silhouette = -1
             calinski = -1
@@ -134,10 +365,15 @@ class HierarchicalClusteringAnalyzer:
             'davies_bouldin': davies
         }
     
-    def plot_dendrogram(self, Z, titles, method_name, threshold=None):
-        """Genera y muestra dendrograma"""
+    def plot_dendrogram(self, Z, titles, method_name, threshold=None, max_leaves=MAX_LEAVES):
+        """Genera dendrograma estático (matplotlib); con muchas hojas se trunca a las últimas max_leaves"""
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots(figsize=(12, 8))
         
+        truncate = {}
+        if Z.shape[0] + 1 > max_leaves:
+            truncate = {'truncate_mode': 'lastp', 'p': max_leaves}
+        
         # Crear dendrograma
         dendrogram(
             Z,
@@ -145,24 +381,35 @@ class HierarchicalClusteringAnalyzer:
             orientation='top',
             distance_sort='descending',
             show_leaf_counts=True,
-            ax=ax
+            ax=ax,
+            **truncate
         )
         
         if threshold:
             ax.axhline(y=threshold, color='r', linestyle='--', label=f'Umbral: {threshold:.2f}')
         
-        plt.title(f'Dendrograma - {method_name}', fontsize=14, fontweight='bold')
-        plt.xlabel('Documentos')
-        plt.ylabel('Distancia')
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
+        ax.set_title(f'Dendrograma - {method_name}', fontsize=14, fontweight='bold')
+        ax.set_xlabel('Documentos' if not truncate else f'Documentos (últimas {max_leaves} fusiones)')
+        ax.set_ylabel('Distancia')
+        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+        fig.tight_layout()
         
         return fig
     
-    def analyze_clustering(self, max_docs=50):
-        """Análisis principal de clustering"""
+    def analyze_clustering(self, max_docs=50, scalable=False, n_centroids=300, max_workers=4):
+        """
+        Análisis principal de clustering.
+        Con scalable=True se agrupa el corpus completo en dos etapas: MiniBatchKMeans hasta
+        `n_centroids` grupos y linkage jerárquico sobre sus centroides. El dendrograma muestra
+        los grupos como hojas colapsadas que se pueden expandir para ver sus documentos.
+        Las seis combinaciones embedding × linkage se evalúan en un pool de hilos que comparte
+        las distancias, y cada una se muestra en la interfaz en cuanto termina.
+        """
+        if scalable:
+            texts = self.abstracts
+            titles = [f"Doc {i+1}: {title[:50]}..." for i, title in enumerate(self.titles)]
         # Limitar número de documentos para mejor visualización
-        if len(self.abstracts) > max_docs:
+        elif len(self.abstracts) > max_docs:
             st.warning(f"Limite de documentos({len(self.abstracts)}). Se han definido {max_docs} documentos para analizar.")
             texts = self.abstracts[:max_docs]
             titles = [f"Doc {i+1}: {self.titles[i][:50]}..." for i in range(max_docs)]
@@ -174,71 +421,234 @@ class HierarchicalClusteringAnalyzer:
         linkage_methods = ['ward', 'complete', 'average']
         embedding_methods = ['tfidf', 'sbert']
         
+        # Silhouette es O(n²): con muchos documentos se estima sobre una muestra estratificada
+        sample_size = 2000 if len(texts) > 2000 else None
+        
         results = {}
         
+        # Marcadores en orden fijo (st.empty): cada combinación reemplaza el suyo apenas termina
+        slots = {}
         for emb_method in embedding_methods:
             st.subheader(f"Embeddings: {emb_method.upper()}")
+            slots[emb_method] = {'info': st.empty()}
+            for link_method in linkage_methods:
+                slots[emb_method][link_method] = st.empty()
+                slots[emb_method][link_method].write(f"**Método de linkage:** {link_method} _(calculando...)_")
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            # 1. Embeddings y distancias de cada método (compartidas por sus tres linkages)
+            prepared = {pool.submit(self.prepare_embedding, emb, texts, titles, scalable, n_centroids): emb
+                        for emb in embedding_methods}
+            evaluations = {}
+            for future in as_completed(prepared):
+                emb_method = prepared[future]
+                try:
+                    artifact = future.result()
+                except Exception as e:
+                    slots[emb_method]['info'].error(f"Error creando embeddings {emb_method}: {str(e)}")
+                    for link_method in linkage_methods:
+                        slots[emb_method][link_method].empty()
+                    continue
+                if scalable:
+                    slots[emb_method]['info'].info(
+                        f"{len(texts)} documentos agrupados en {len(artifact['group_sizes'])} grupos antes del linkage")
+                # 2. Las seis combinaciones se evalúan en paralelo sobre las distancias compartidas
+                for link_method in linkage_methods:
+                    evaluations[pool.submit(self.evaluate_combination, emb_method, link_method, sample_size)] = \
+                        (emb_method, link_method)
             
-            # Crear embeddings
-            if emb_method == 'tfidf':
-                embeddings, vectorizer = self.create_tfidf_embeddings(texts)
-            else:  # sbert
-                embeddings = self.create_sbert_embeddings(texts)
+            # 3. Mostrar cada combinación en cuanto termina
+            for future in as_completed(evaluations):
+                emb_method, link_method = evaluations[future]
+                # slot.container() reemplaza el texto "calculando..." del marcador
+                with slots[emb_method][link_method].container():
+                    st.write(f"**Método de linkage:** {link_method}")
+                    try:
+                        key, result, Z, leaf_clusters = future.result()
+                    except Exception as e:
+                        st.error(f"Error con {emb_method}-{link_method}: {str(e)}")
+                        continue
+                    results[key] = result
+                    self.render_combination(st.container(), emb_method, link_method, result, Z, leaf_clusters, titles)
+        
+        # Mantener el orden de las combinaciones independientemente del orden de llegada
+        order = [f"{e}_{l}" for e in embedding_methods for l in linkage_methods]
+        return {key: results[key] for key in order if key in results}
+    
+    def evaluate_combination(self, emb_method, link_method, sample_size=None):
+        """Linkage, corte y métricas de una combinación embedding × linkage (sin llamadas a Streamlit)"""
+        artifact = self.artifacts[emb_method]
+        assignments = artifact['assignments']
+        
+        # Clustering jerárquico
+        Z = self.linkage_for(emb_method, link_method)
+        
+        # Buscar el mejor corte del dendrograma (Calinski-Harabasz incremental sobre todos los niveles)
+        cut = self.search_cut_height(Z, artifact['embeddings'], assignments)
+        threshold = cut['threshold']
+        
+        # Asignar clusters (en modo escalable: cluster del grupo de cada documento)
+        leaf_clusters = fcluster(Z, cut['best_k'], criterion='maxclust')
+        clusters = leaf_clusters[assignments] if assignments is not None else leaf_clusters
+        
+        # Calcular métricas (silhouette sobre las distancias ya calculadas cuando son por documento)
+        distances = artifact['distances'] if assignments is None else None
+        metrics = self.calculate_clustering_metrics(artifact['embeddings'], clusters,
+                                                    sample_size=sample_size, distances=distances)
+        
+        key = f"{emb_method}_{link_method}"
+        result = {
+            'linkage_matrix': Z.tolist(),
+            'clusters': clusters.tolist(),
+            'threshold': threshold,
+            'metrics': metrics,
+            'n_clusters': len(np.unique(clusters)),
+            'cut_search': {
+                'best_k': cut['best_k'],
+                'calinski_harabasz_by_k': {str(k): v for k, v in sorted(cut['scores'].items())}
+            }
+        }
+        if assignments is not None:
+            result['mode'] = 'scalable'
+            result['group_assignments'] = assignments.tolist()
+            result['group_sizes'] = artifact['group_sizes'].tolist()
+        return key, result, Z, leaf_clusters
+    
+    def render_combination(self, container, emb_method, link_method, result, Z, leaf_clusters, titles):
+        """Muestra métricas y dendrograma de una combinación dentro de su contenedor"""
+        artifact = self.artifacts[emb_method]
+        metrics = result['metrics']
+        with container:
+            # Mostrar métricas
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Silhouette", f"{metrics['silhouette']:.3f}")
+            with col2:
+                st.metric("Calinski-Harabasz", f"{metrics['calinski_harabasz']:.3f}")
+            with col3:
+                st.metric("Davies-Bouldin", f"{metrics['davies_bouldin']:.3f}")
+            st.caption(f"Corte óptimo: k = {result['cut_search']['best_k']} clusters "
+                       f"(altura {result['threshold']:.3f}, Calinski-Harabasz sobre todos los niveles)")
+            
+            # Dendrograma interactivo (truncado si es grande) con subárboles expandibles
+            leaf_titles = artifact['leaf_titles']
+            st.plotly_chart(plotly_dendrogram(Z, leaf_titles, f"Dendrograma - {emb_method.upper()} - {link_method}",
+                                              result['threshold']), use_container_width=True)
+            self.show_expandable_subtrees(Z, leaf_titles, key=f"{emb_method}_{link_method}")
             
+            if artifact['assignments'] is not None:
+                self.show_expandable_groups(leaf_clusters, artifact['assignments'], titles)
+    
+    def prepare_embedding(self, emb_method, texts, titles, scalable=False, n_centroids=300):
+        """
+        Calcula embeddings y distancias condensadas para un método de embedding y los
+        guarda en self.artifacts para que save_results y los linkages los reutilicen.
+        """
+        # Crear embeddings
+        if emb_method == 'tfidf':
+            embeddings, _ = self.create_tfidf_embeddings(texts)
+        else:  # sbert
+            embeddings = self.create_sbert_embeddings(texts)
+        
+        if scalable:
+            # Etapa 1: k-means a centroides; etapa 2: linkage sobre los centroides
+            centroids, assignments, sizes = self.build_centroids(embeddings, n_centroids)
+            distance_matrix = self.compute_distance_matrix(centroids, 'cosine')
+            leaf_titles = [f"Grupo {g+1} ({sizes[g]} docs)" for g in range(len(sizes))]
+        else:
             # Matriz de distancias
             distance_matrix = self.compute_distance_matrix(embeddings, 'cosine')
+            assignments, sizes, leaf_titles = None, None, titles
+        
+        self.artifacts[emb_method] = {
+            'texts': texts,
+            'titles': titles,
+            'leaf_titles': leaf_titles,
+            'embeddings': embeddings,
+            'distances': distance_matrix,
+            'assignments': assignments,
+            'group_sizes': sizes,
+            'linkages': {}
+        }
+        return self.artifacts[emb_method]
+    
+    def linkage_for(self, emb_method, link_method):
+        """Matriz Z del linkage pedido, calculada una sola vez sobre las distancias guardadas"""
+        artifact = self.artifacts[emb_method]
+        if link_method not in artifact['linkages']:
+            artifact['linkages'][link_method] = self.hierarchical_clustering(artifact['distances'], link_method)
+        return artifact['linkages'][link_method]
+    
+    def show_expandable_subtrees(self, Z, leaf_titles, key, max_nodes=8):
+        """
+        Explorador de los subárboles colapsados del dendrograma truncado. Solo se construye el
+        subárbol elegido; sus propios nodos colapsados forman el siguiente nivel. La ruta
+        (nodos elegidos en cada nivel) vive en session_state y el explorador es un fragmento,
+        así que navegar no vuelve a ejecutar el análisis.
+        """
+        if not collapsed_nodes(Z, MAX_LEAVES):
+            return
+        path_key = f"subtree_path_{key}"
+        # La ruta se guarda junto con la huella de Z: un análisis nuevo empieza desde la raíz
+        fingerprint = hashlib.sha1(np.ascontiguousarray(Z).tobytes()).hexdigest()
+        if st.session_state.get(path_key, (None, None))[0] != fingerprint:
+            st.session_state[path_key] = (fingerprint, [])
+        
+        @st.fragment
+        def _explorer():
+            path = st.session_state[path_key][1]
+            # Cada nodo de la ruta está numerado dentro del subárbol del nivel anterior
+            Z_level, labels = Z, list(leaf_titles)
+            for node_id in path:
+                Z_level, leaves = subtree_linkage(Z_level, node_id)
+                labels = [labels[i] for i in leaves]
+            if path:
+                st.plotly_chart(plotly_dendrogram(Z_level, labels, f"Subárbol - nivel {len(path)} ({len(labels)} hojas)",
+                                                  height=400), use_container_width=True)
             
-            for link_method in linkage_methods:
-                st.write(f"**Método de linkage:** {link_method}")
-                
-                try:
-                    # Clustering jerárquico
-                    Z = self.hierarchical_clustering(distance_matrix, link_method)
-                    
-                    # Determinar umbral automático (percentil 70 de las distancias)
-                    threshold = np.percentile(Z[:, 2], 70)
-                    
-                    # Asignar clusters
-                    clusters = fcluster(Z, threshold, criterion='distance')
-                    
-                    # Calcular métricas
-                    metrics = self.calculate_clustering_metrics(embeddings, clusters)
-                    
-                    # Guardar resultados
-                    key = f"{emb_method}_{link_method}"
-                    results[key] = {
-                        'linkage_matrix': Z.tolist(),
-                        'clusters': clusters.tolist(),
-                        'threshold': threshold,
-                        'metrics': metrics,
-                        'n_clusters': len(np.unique(clusters))
-                    }
-                    
-                    # Mostrar métricas
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("Silhouette", f"{metrics['silhouette']:.3f}")
-                    with col2:
-                        st.metric("Calinski-Harabasz", f"{metrics['calinski_harabasz']:.3f}")
-                    with col3:
-                        st.metric("Davies-Bouldin", f"{metrics['davies_bouldin']:.3f}")
-                    
-                    # Plot dendrogram
-                    fig = self.plot_dendrogram(Z, titles, f"{emb_method.upper()} - {link_method}", threshold)
-                    st.pyplot(fig)
-                    
-                except Exception as e:
-                    st.error(f"Error con {emb_method}-{link_method}: {str(e)}")
-        
-        return results
+            nodes = collapsed_nodes(Z_level, MAX_LEAVES)
+            sizes = dict(nodes[:max_nodes])
+            col1, col2, col3 = st.columns([4, 1, 1])
+            with col1:
+                node_id = st.selectbox("Subárbol colapsado", list(sizes), format_func=lambda n: f"{sizes[n]} hojas",
+                                       key=f"{path_key}_{len(path)}", disabled=not sizes)
+            # Los callbacks actualizan la ruta antes de que el fragmento se vuelva a dibujar
+            with col2:
+                st.button("Expandir", key=f"{path_key}_expand", disabled=not sizes,
+                          on_click=path.append, args=(node_id,))
+            with col3:
+                st.button("Volver", key=f"{path_key}_back", disabled=not path, on_click=path.pop)
+            if len(nodes) > max_nodes:
+                st.caption(f"Mostrando los {max_nodes} subárboles colapsados más grandes de {len(nodes)}")
+        
+        _explorer()
+    
+    def show_expandable_groups(self, leaf_clusters, assignments, titles, max_clusters=20, max_titles=30):
+        """Muestra cada cluster del corte como nodo expandible con sus grupos y documentos"""
+        doc_clusters = leaf_clusters[assignments]
+        cluster_ids, counts = np.unique(doc_clusters, return_counts=True)
+        order = np.argsort(-counts)
+        for idx in order[:max_clusters]:
+            cluster_id = cluster_ids[idx]
+            groups = np.flatnonzero(leaf_clusters == cluster_id)
+            with st.expander(f"Cluster {cluster_id}: {counts[idx]} documentos en {len(groups)} grupos"):
+                docs = np.flatnonzero(doc_clusters == cluster_id)
+                for d in docs[:max_titles]:
+                    st.write(f"- (Grupo {assignments[d] + 1}) {titles[d]}")
+                if len(docs) > max_titles:
+                    st.write(f"... y {len(docs) - max_titles} documentos más")
+        if len(cluster_ids) > max_clusters:
+            st.caption(f"Mostrando los {max_clusters} clusters más grandes de {len(cluster_ids)}")
     
     def determine_best_algorithm(self, results):
-        """Determina el mejor algoritmo basado en métricas"""
+        """Determina el mejor algoritmo basado en métricas ya calculadas en analyze_clustering"""
         best_score = -float('inf')
         best_algorithm = None
         
         for algo, data in results.items():
-            metrics = data['metrics']
+            metrics = data.get('metrics')
+            if not metrics:
+                continue
             # Score compuesto (mayor es mejor)
             score = (metrics['silhouette'] + 
                     metrics['calinski_harabasz'] / 1000 -  # Normalizar
@@ -267,29 +677,24 @@ class HierarchicalClusteringAnalyzer:
         with open(json_path, 'w', encoding='utf-8') as f:
             json.dump(results_data, f, indent=2)
         
-        # Guardar figura del mejor algoritmo
+        # Guardar figura del mejor algoritmo reutilizando los artefactos del análisis
         best_emb, best_link = best_algorithm.split('_')
         
-        if len(self.abstracts) > 50:
-            texts = self.abstracts[:50]
-            titles = [f"Doc {i+1}" for i in range(50)]
-        else:
-            texts = self.abstracts
-            titles = [f"Doc {i+1}: {title[:30]}..." for i, title in enumerate(self.titles)]
-        
-        # Recrear el mejor dendrograma
-        if best_emb == 'tfidf':
-            embeddings, _ = self.create_tfidf_embeddings(texts)
-        else:
-            embeddings = self.create_sbert_embeddings(texts)
+        if best_emb not in self.artifacts:
+            # save_results llamado sin analyze_clustering previo en este analizador
+            n = len(results[best_algorithm]['clusters'])
+            titles = [f"Doc {i+1}: {title[:50]}..." for i, title in enumerate(self.titles[:n])]
+            self.prepare_embedding(best_emb, self.abstracts[:n], titles)
         
-        distance_matrix = self.compute_distance_matrix(embeddings, 'cosine')
-        Z = self.hierarchical_clustering(distance_matrix, best_link)
+        Z = self.linkage_for(best_emb, best_link)
+        titles = self.artifacts[best_emb]['leaf_titles']
         threshold = results[best_algorithm]['threshold']
         
         fig = self.plot_dendrogram(Z, titles, f"MEJOR: {best_emb.upper()} - {best_link}", threshold)
         fig_path = os.path.join(output_dir, "best_dendrogram.png")
-        fig.savefig(fig_path, dpi=300, bbox_inches='tight')
+        fig.savefig(fig_path, dpi=150, bbox_inches='tight')
+        import matplotlib.pyplot as plt
+        plt.close(fig)
         
         return json_path, fig_path
 
@@ -313,14 +718,24 @@ def mostrar_requerimiento_4(project_root):
         col1, col2 = st.columns(2)
         with col1:
             st.info(f"**Documentos cargados:** {n_docs}")
+            scalable = st.checkbox("Modo escalable (corpus completo)", value=False,
+                                   help="Agrupa todos los documentos con MiniBatchKMeans y aplica el "
+                                        "clustering jerárquico sobre los centroides")
         with col2:
-            max_docs = st.slider("Límite de documentos para análisis", 
-                               min_value=10, max_value=100, value=min(50, n_docs))
+            if scalable:
+                n_centroids = st.number_input("Número de grupos (centroides)", min_value=10,
+                                              max_value=2000, value=max(10, min(300, n_docs)), step=10)
+                max_docs = n_docs
+            else:
+                max_docs = st.slider("Límite de documentos para análisis", 
+                                   min_value=10, max_value=max(10, n_docs), value=min(50, n_docs))
+                n_centroids = None
         
         if st.button("Ejecutar Análisis de Clustering", type="primary"):
             with st.spinner("Realizando clustering jerárquico..."):
                 # Ejecutar análisis
-                results = analyzer.analyze_clustering(max_docs=max_docs)
+                results = analyzer.analyze_clustering(max_docs=max_docs, scalable=scalable,
+                                                      n_centroids=n_centroids or 300)
                 
                 if results:
                     # Determinar mejor algoritmo
@@ -0,0 +1,246 @@
+# gazetteer_paises.py
+"""
+Gazetteer de países para atribuir cada publicación a un país (Requerimiento 5).
+
+- Alias de cada país: nombres de pycountry (oficial, común), gentilicios, nombres en
+  español/portugués, regiones e instituciones conocidas; todos apuntan a un código ISO-3.
+- Un solo patrón compilado: los alias se factorizan en un trie de prefijos (equivalente en
+  regex a Aho-Corasick: cada posición del texto se descarta en cuanto no sigue ningún
+  prefijo) con límites de palabra y preferencia por la coincidencia más larga, así 'us' ya no coincide dentro de "focus" ni 'mit' dentro de "limit".
+  Las siglas (US, UK, MIT, IIT, ...) solo coinciden en mayúsculas.
+- Frases que contienen un alias pero no son un país ("Latin America", "New Mexico") son
+  alias propios: al ser más largas ganan la coincidencia y se resuelven a su país o a nada.
+- match(): extractall vectorizado sobre una columna; en cada texto gana la última
+  coincidencia (en afiliaciones el país suele ir al final: "MIT, Cambridge, MA, USA").
+- standardize_country() / country_name(): nombre normalizado e ISO-3 con lru_cache;
+  pycountry.search_fuzzy solo se usa como último recurso y una vez por nombre distinto.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+import pycountry
+
+# Nombres para mostrar cuando el de pycountry es poco habitual
+DISPLAY_NAMES = {
+    'USA': 'United States', 'GBR': 'United Kingdom', 'RUS': 'Russia', 'KOR': 'South Korea',
+    'PRK': 'North Korea', 'IRN': 'Iran', 'VNM': 'Vietnam', 'TWN': 'Taiwan', 'SYR': 'Syria',
+    'LAO': 'Laos', 'BOL': 'Bolivia', 'VEN': 'Venezuela', 'TZA': 'Tanzania', 'MDA': 'Moldova',
+    'CZE': 'Czech Republic', 'TUR': 'Turkey', 'BRN': 'Brunei', 'COD': 'DR Congo',
+    'PSE': 'Palestine', 'NLD': 'Netherlands', 'CIV': "Cote d'Ivoire",
+}
+
+# Alias adicionales: variantes de nombre, países constituyentes y regiones inequívocas
+EXTRA_ALIASES = {
+    'USA': ['united states of america', 'united states', 'u.s.a.', 'u.s.', 'america',
+            'new mexico', 'new jersey', 'new england', 'new york', 'california', 'texas',
+            'massachusetts'],
+    'GBR': ['united kingdom', 'u.k.', 'great britain', 'britain', 'england', 'scotland', 'wales',
+            'northern ireland', 'london'],
+    'CHN': ["people's republic of china", 'peoples republic of china', 'pr china', 'p.r. china',
+            'mainland china', 'beijing', 'shanghai', 'hong kong sar'],
+    'KOR': ['south korea', 'republic of korea', 'korea'],
+    'RUS': ['russia'],
+    'IRN': ['iran'],
+    'VNM': ['vietnam'],
+    'TUR': ['turkey'],
+    'CZE': ['czech republic'],
+    'NLD': ['holland', 'the netherlands'],
+    'ARE': ['united arab emirates'],
+    'AUS': ['new south wales'],
+    'CAN': ['british columbia'],
+    'DEU': ['deutschland'],
+    'CHE': ['zurich', 'geneva'],
+}
+
+# Nombres en español / portugués habituales en afiliaciones latinoamericanas
+NATIVE_NAMES = {
+    'ESP': ['espana'], 'MEX': ['mexico'], 'BRA': ['brasil'], 'DEU': ['alemania'],
+    'FRA': ['francia'], 'GBR': ['reino unido', 'inglaterra'], 'USA': ['estados unidos', 'eeuu', 'ee.uu.'],
+    'ITA': ['italia'], 'JPN': ['japon'], 'PER': ['peru'], 'CHE': ['suiza'], 'SWE': ['suecia'],
+    'NLD': ['paises bajos', 'holanda'], 'BEL': ['belgica'], 'CAN': ['canada'], 'RUS': ['rusia'],
+    'KOR': ['corea del sur'], 'PAN': ['panama'], 'DOM': ['republica dominicana'],
+}
+
+# Gentilicios (en revistas y afiliaciones: "Chinese Academy of Sciences", "Indian Institute ...")
+DEMONYMS = {
+    'USA': ['american'], 'GBR': ['british', 'english', 'scottish', 'welsh'], 'CHN': ['chinese'],
+    'DEU': ['german'], 'FRA': ['french'], 'CAN': ['canadian'], 'AUS': ['australian'],
+    'JPN': ['japanese'], 'ESP': ['spanish'], 'ITA': ['italian'], 'BRA': ['brazilian'],
+    'IND': ['indian'], 'KOR': ['korean'], 'NLD': ['dutch'], 'CHE': ['swiss'], 'SWE': ['swedish'],
+    'MEX': ['mexican'], 'ARG': ['argentinian', 'argentine'], 'CHL': ['chilean'],
+    'COL': ['colombian'], 'RUS': ['russian'], 'POL': ['polish'], 'PRT': ['portuguese'],
+    'GRC': ['greek'], 'TUR': ['turkish'], 'IRN': ['iranian'], 'EGY': ['egyptian'],
+    'ZAF': ['south african'], 'NZL': ['new zealand'], 'IRL': ['irish'], 'NOR': ['norwegian'],
+    'DNK': ['danish'], 'FIN': ['finnish'], 'AUT': ['austrian'], 'BEL': ['belgian'],
+    'ISR': ['israeli'], 'SAU': ['saudi'], 'PAK': ['pakistani'], 'MYS': ['malaysian'],
+    'IDN': ['indonesian'], 'THA': ['thai'], 'VNM': ['vietnamese'], 'NGA': ['nigerian'],
+    'PER': ['peruvian'], 'ECU': ['ecuadorian'], 'VEN': ['venezuelan'], 'CUB': ['cuban'],
+    'SGP': ['singaporean'], 'TWN': ['taiwanese'],
+}
+
+# Instituciones conocidas (también se buscan en el campo de autores)
+INSTITUTIONS = {
+    'university of california': 'USA', 'stanford university': 'USA', 'harvard': 'USA',
+    'massachusetts institute of technology': 'USA', 'carnegie mellon': 'USA',
+    'georgia institute of technology': 'USA', 'georgia tech': 'USA', 'university of georgia': 'USA',
+    'university of oxford': 'GBR', 'oxford university': 'GBR',
+    'university of cambridge': 'GBR', 'cambridge university': 'GBR', 'imperial college': 'GBR',
+    'university of toronto': 'CAN', 'university of sydney': 'AUS', 'university of tokyo': 'JPN',
+    'tsinghua': 'CHN', 'peking university': 'CHN', 'eth zurich': 'CHE', 'epfl': 'CHE',
+    'max planck': 'DEU', 'fraunhofer': 'DEU', 'technical university of munich': 'DEU',
+    'university of sao paulo': 'BRA', 'indian institute of technology': 'IND',
+    'national university of singapore': 'SGP', 'universidad nacional de colombia': 'COL',
+    'universidad de los andes': 'COL', 'universidad del quindio': 'COL',
+}
+
+# Siglas: solo coinciden respetando mayúsculas
+ACRONYMS = {
+    'US': 'USA', 'USA': 'USA', 'UK': 'GBR', 'MIT': 'USA', 'UCLA': 'USA', 'IIT': 'IND',
+    'UAE': 'ARE', 'PRC': 'CHN', 'KAIST': 'KOR', 'CNRS': 'FRA', 'CSIC': 'ESP', 'UNAM': 'MEX',
+    'USP': 'BRA', 'ETH': 'CHE', 'NUS': 'SGP',
+}
+
+# Frases que contienen un alias pero no identifican un país
+NON_COUNTRY_PHRASES = ['latin america', 'latin american', 'south america', 'south american',
+                       'north america', 'north american', 'central america', 'central american']
+
+# Nombres de pycountry que casi siempre son otra cosa en textos bibliográficos
+AMBIGUOUS_NAMES = {'jersey'}
+
+
+def normalize_text(values: pd.Series) -> pd.Series:
+    """Texto sin acentos (NFKD -> ASCII), sin alterar mayúsculas"""
+    return (values.fillna('').astype(str)
+            .str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii'))
+
+
+def _normalize_alias(alias: str) -> str:
+    return normalize_text(pd.Series([alias])).iloc[0].lower().strip()
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Expresión regular factorizada por prefijos comunes que reconoce exactamente `words`,
+    prefiriendo la alternativa más larga: ['us', 'usa'] -> 'us(?:a)?'
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        ends = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if ends:
+            return ('(?:' + body + ')?') if len(branches) == 1 else body + '?'
+        return body
+
+    return build(trie)
+
+
+class CountryGazetteer:
+    def __init__(self, aliases: Dict[str, Optional[str]], acronyms: Dict[str, str]):
+        """
+        aliases : alias en minúsculas -> ISO-3 (None para frases que no son un país)
+        acronyms: sigla exacta -> ISO-3
+        """
+        self.aliases = {_normalize_alias(a): code for a, code in aliases.items() if a}
+        self.acronyms = dict(acronyms)
+        insensitive = trie_pattern(self.aliases)
+        sensitive = trie_pattern(self.acronyms)
+        alternatives = [f'(?i:{insensitive})'] if insensitive else []
+        alternatives += [sensitive] if sensitive else []
+        self.pattern = re.compile(r'(?<![\w.])(' + '|'.join(alternatives) + r')(?![\w])')
+
+    def codes(self, tokens: pd.Series) -> pd.Series:
+        """ISO-3 de cada coincidencia (las siglas primero, luego el alias en minúsculas)"""
+        return tokens.map(self.acronyms).fillna(tokens.str.lower().map(self.aliases))
+
+    def match(self, texts: pd.Series) -> pd.Series:
+        """ISO-3 de la última coincidencia de cada texto (None si no hay ninguna)"""
+        if texts.empty:
+            return pd.Series(dtype=object, index=texts.index)
+        found = normalize_text(texts).str.extractall(self.pattern)
+        if found.empty:
+            return pd.Series(None, dtype=object, index=texts.index)
+        codes = self.codes(found[0]).dropna()
+        return codes.groupby(level=0).last().reindex(texts.index).astype(object)
+
+    def lookup(self, name: str) -> Optional[str]:
+        """ISO-3 si el nombre completo es un alias o sigla conocido"""
+        name = str(name).strip()
+        if name in self.acronyms:
+            return self.acronyms[name]
+        return self.aliases.get(_normalize_alias(name))
+
+
+def _pycountry_aliases() -> Dict[str, str]:
+    aliases = {}
+    for country in pycountry.countries:
+        for attr in ('name', 'common_name', 'official_name'):
+            value = getattr(country, attr, None)
+            if value:
+                value = re.sub(r'^the\s+', '', value, flags=re.IGNORECASE)
+                aliases[_normalize_alias(value)] = country.alpha_3
+    for name in AMBIGUOUS_NAMES:
+        aliases.pop(name, None)
+    return aliases
+
+
+def _merge(aliases: Dict[str, Optional[str]], table: Dict[str, Iterable[str]]):
+    for code, names in table.items():
+        for name in names:
+            aliases[_normalize_alias(name)] = code
+
+
+@lru_cache(maxsize=1)
+def default_gazetteer() -> CountryGazetteer:
+    """Nombres de países, gentilicios, regiones, instituciones y siglas"""
+    aliases = _pycountry_aliases()
+    for table in (EXTRA_ALIASES, NATIVE_NAMES, DEMONYMS):
+        _merge(aliases, table)
+    aliases.update({_normalize_alias(k): v for k, v in INSTITUTIONS.items()})
+    aliases.update({_normalize_alias(p): None for p in NON_COUNTRY_PHRASES})
+    return CountryGazetteer(aliases, ACRONYMS)
+
+
+@lru_cache(maxsize=1)
+def institution_gazetteer() -> CountryGazetteer:
+    """Solo instituciones y siglas: para el campo de autores, donde apellidos como
+    'Jordan' o 'Chad' darían falsos positivos con nombres de países"""
+    return CountryGazetteer(dict(INSTITUTIONS), ACRONYMS)
+
+
+@lru_cache(maxsize=None)
+def country_name(iso3: str) -> str:
+    """Nombre para mostrar de un código ISO-3"""
+    if iso3 in DISPLAY_NAMES:
+        return DISPLAY_NAMES[iso3]
+    country = pycountry.countries.get(alpha_3=iso3)
+    if country is None:
+        return iso3
+    return getattr(country, 'common_name', None) or country.name
+
+
+@lru_cache(maxsize=4096)
+def standardize_country(name: str) -> Tuple[Optional[str], str]:
+    """(ISO-3, nombre normalizado) de un nombre de país; (None, nombre) si no se reconoce"""
+    if not name or name == 'Unknown':
+        return None, 'Unknown'
+    code = default_gazetteer().lookup(name)
+    if code is None:
+        try:
+            code = pycountry.countries.lookup(name).alpha_3
+        except LookupError:
+            try:
+                code = pycountry.countries.search_fuzzy(name)[0].alpha_3
+            except LookupError:
+                return None, name
+    return code, country_name(code)
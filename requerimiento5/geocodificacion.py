@@ -0,0 +1,219 @@
+# geocodificacion.py
+"""
+Geocodificación sin red para el mapa interactivo (folium) del Requerimiento 5.
+
+- centroides.json (incluido en el repositorio): centroide aproximado de cada país por código
+  ISO-3 y coordenadas de las principales ciudades académicas y editoriales.
+- OfflineGeocoder resuelve un nombre de lugar ("Armenia, Colombia", "Cham", "USA") con esa
+  tabla y el gazetteer de países: primero la ciudad, después el país mencionado en el texto.
+- Cada nombre resuelto se guarda en una caché SQLite persistente (y en memoria), de modo que
+  las siguientes ejecuciones no vuelven a interpretar el texto. Con add_place se pueden
+  registrar coordenadas a mano, que tienen prioridad sobre la tabla.
+- Ninguna función hace llamadas de red: el resultado es determinista y funciona sin conexión
+  (sin límites de peticiones de Nominatim). El mapa folium, por defecto, tampoco pide
+  teselas: solo dibuja los centroides incluidos (ver folium_map).
+"""
+import os
+import json
+import sqlite3
+from functools import lru_cache
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from requerimiento5.gazetteer_paises import default_gazetteer, country_name, normalize_text
+
+CENTROIDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'centroides.json')
+COLUMNS = ['place', 'lat', 'lon', 'iso_alpha', 'source']
+
+
+@lru_cache(maxsize=4)
+def load_centroids(path: str = CENTROIDS_PATH) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def place_keys(names: pd.Series) -> pd.Series:
+    """Clave de búsqueda: sin acentos, minúsculas, espacios simples, sin puntuación en los extremos"""
+    return (normalize_text(names).str.lower()
+            .str.replace(r'\s+', ' ', regex=True)
+            .str.strip(' .,;:()[]'))
+
+
+class OfflineGeocoder:
+    def __init__(self, cache_path: Optional[str] = None, centroids_path: str = CENTROIDS_PATH):
+        centroids = load_centroids(centroids_path)
+        self.countries = centroids['countries']
+        self.cities = centroids['cities']
+        self.cache_path = cache_path
+        self._memory = {}
+        if cache_path:
+            os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+            with self._connect() as conn:
+                conn.execute('CREATE TABLE IF NOT EXISTS places ('
+                             'key TEXT PRIMARY KEY, lat REAL, lon REAL, iso_alpha TEXT, source TEXT)')
+
+    def _connect(self):
+        return sqlite3.connect(self.cache_path)
+
+    # ------------------------------
+    # Resolución con la tabla incluida
+    # ------------------------------
+    def _resolve_bundled(self, keys: pd.Series, texts: pd.Series) -> pd.DataFrame:
+        """
+        Ciudad (el texto completo o cualquiera de sus segmentos separados por comas, en orden)
+        y, si no hay ciudad, centroide del país. El país se busca en el texto original, para
+        respetar las siglas en mayúsculas (US, UK).
+        """
+        result = pd.DataFrame(index=keys.index, columns=['lat', 'lon', 'iso_alpha', 'source'], dtype=object)
+        country = default_gazetteer().match(texts)
+
+        segments = keys.str.split(',').explode().str.strip()
+        candidates = pd.concat([keys, segments])
+        city = candidates.map(self.cities).dropna()
+        # Si el texto también nombra un país, la ciudad debe pertenecer a él
+        city_iso = city.str[0]
+        expected = country.reindex(city.index)
+        city = city[expected.isna().to_numpy() | (expected == city_iso).to_numpy()]
+        city = city[~city.index.duplicated()]
+        if not city.empty:
+            result.loc[city.index, 'lat'] = city.str[1]
+            result.loc[city.index, 'lon'] = city.str[2]
+            result.loc[city.index, 'iso_alpha'] = city.str[0]
+            result.loc[city.index, 'source'] = 'city'
+
+        centroid = country.map(self.countries, na_action='ignore')
+        ok = centroid.notna() & result['source'].isna()
+        if ok.any():
+            result.loc[ok, 'lat'] = centroid[ok].str[0]
+            result.loc[ok, 'lon'] = centroid[ok].str[1]
+            result.loc[ok, 'iso_alpha'] = country[ok]
+            result.loc[ok, 'source'] = 'country'
+        return result.dropna(subset=['source'])
+
+    # ------------------------------
+    # Caché persistente
+    # ------------------------------
+    def _read_cache(self, keys: Iterable[str]) -> dict:
+        keys = list(keys)
+        if not self.cache_path or not keys:
+            return {}
+        found = {}
+        with self._connect() as conn:
+            for start in range(0, len(keys), 900):
+                chunk = keys[start:start + 900]
+                rows = conn.execute(f"SELECT key, lat, lon, iso_alpha, source FROM places "
+                                    f"WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+                found.update({row[0]: row[1:] for row in rows})
+        return found
+
+    def _write_cache(self, records: dict):
+        if not self.cache_path or not records:
+            return
+        with self._connect() as conn:
+            conn.executemany('INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?)',
+                             [(key, *values) for key, values in records.items()])
+
+    def add_place(self, name: str, lat: float, lon: float, iso_alpha: Optional[str] = None):
+        """Registra coordenadas manuales para un lugar (prioridad sobre la tabla incluida)"""
+        key = place_keys(pd.Series([name])).iloc[0]
+        values = (float(lat), float(lon), iso_alpha, 'manual')
+        self._memory[key] = values
+        self._write_cache({key: values})
+
+    # ------------------------------
+    # API
+    # ------------------------------
+    def geocode_many(self, names: Iterable[str]) -> pd.DataFrame:
+        """Coordenadas de cada nombre distinto (memoria -> SQLite -> tabla incluida)"""
+        names = pd.Series(list(names), dtype=object).dropna().astype(str)
+        names = names[names.str.strip() != ''].drop_duplicates()
+        if names.empty:
+            return pd.DataFrame(columns=COLUMNS)
+        keys = place_keys(names)
+
+        missing = [k for k in keys.unique() if k not in self._memory]
+        self._memory.update(self._read_cache(missing))
+        pending = pd.Series([k for k in missing if k not in self._memory], dtype=object)
+        if not pending.empty:
+            raw_names = dict(zip(keys, names))
+            resolved = self._resolve_bundled(pending, pending.map(raw_names))
+            records = {pending[i]: (float(lat), float(lon), iso, source)
+                       for i, lat, lon, iso, source in zip(resolved.index, resolved['lat'], resolved['lon'],
+                                                           resolved['iso_alpha'], resolved['source'])}
+            self._memory.update(records)
+            self._write_cache(records)
+
+        rows = [(name, *self._memory[key]) for name, key in zip(names, keys) if key in self._memory]
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def geocode(self, name: str) -> Optional[dict]:
+        found = self.geocode_many([name])
+        return None if found.empty else found.iloc[0].to_dict()
+
+    def country_points(self, country_data: pd.DataFrame) -> pd.DataFrame:
+        """Centroides para una tabla con columnas iso_alpha y count (country_data del analizador)"""
+        if country_data is None or country_data.empty or 'iso_alpha' not in country_data.columns:
+            return pd.DataFrame(columns=['label', 'lat', 'lon', 'count'])
+        counts = country_data.dropna(subset=['iso_alpha']).groupby('iso_alpha')['count'].sum()
+        coords = counts.index.to_series().map(self.countries, na_action='ignore').dropna()
+        return pd.DataFrame({
+            'label': [country_name(code) for code in coords.index],
+            'lat': coords.str[0].to_numpy(),
+            'lon': coords.str[1].to_numpy(),
+            'count': counts[coords.index].to_numpy(),
+        })
+
+    def place_points(self, places: pd.Series) -> pd.DataFrame:
+        """Conteo de publicaciones por lugar (p.ej. ciudad de publicación) con sus coordenadas"""
+        counts = places.dropna().astype(str).str.strip()
+        counts = counts[counts != ''].value_counts()
+        if counts.empty:
+            return pd.DataFrame(columns=['label', 'lat', 'lon', 'count'])
+        located = self.geocode_many(counts.index).set_index('place')
+        return pd.DataFrame({
+            'label': located.index,
+            'lat': located['lat'].to_numpy(dtype=np.float64),
+            'lon': located['lon'].to_numpy(dtype=np.float64),
+            'count': counts[located.index].to_numpy(),
+        })
+
+
+def folium_map(layers: dict, zoom_start: int = 2, tiles: Optional[str] = None, attr: Optional[str] = None,
+               reference: bool = True):
+    """
+    Mapa folium con una capa de círculos por cada DataFrame (label, lat, lon, count) de
+    `layers` ({nombre: (puntos, color)}); el radio crece con la raíz del conteo.
+
+    Sin `tiles` no se descarga ninguna tesela: como referencia se dibujan en gris los
+    centroides incluidos de todos los países. Para un mapa base sin conexión, `tiles` debe
+    ser un servidor de teselas local (p.ej. 'http://localhost:8080/{z}/{x}/{y}.png', con su
+    `attr`); un proveedor público como 'OpenStreetMap' requiere red. folium enlaza Leaflet
+    desde un CDN, así que en un equipo totalmente aislado esos archivos también deben
+    servirse localmente.
+    """
+    import folium
+
+    fmap = folium.Map(location=[20, 0], zoom_start=zoom_start, tiles=tiles, attr=attr)
+    if reference:
+        group = folium.FeatureGroup(name='Países (referencia)')
+        for code, (lat, lon) in load_centroids()['countries'].items():
+            folium.CircleMarker(location=[lat, lon], radius=2, color='#999999', fill=True,
+                                fill_opacity=0.8, weight=0, tooltip=country_name(code)).add_to(group)
+        group.add_to(fmap)
+    for layer_name, (points, color) in layers.items():
+        if points is None or points.empty:
+            continue
+        group = folium.FeatureGroup(name=layer_name)
+        max_count = float(points['count'].max())
+        for row in points.itertuples(index=False):
+            folium.CircleMarker(
+                location=[row.lat, row.lon],
+                radius=4 + 20 * np.sqrt(row.count / max_count),
+                color=color, fill=True, fill_opacity=0.6, weight=1,
+                tooltip=f"{row.label}: {row.count} publicaciones",
+            ).add_to(group)
+        group.add_to(fmap)
+    folium.LayerControl(collapsed=False).add_to(fmap)
+    return fmap
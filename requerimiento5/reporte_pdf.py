@@ -0,0 +1,176 @@
+# reporte_pdf.py
+"""
+Reporte PDF del Requerimiento 5 (mapa de calor, nube de palabras y línea temporal).
+
+- Reutiliza las figuras ya generadas en la sesión: no recalcula datos geográficos, nube ni
+  línea temporal.
+- Las imágenes estáticas se generan en paralelo (ThreadPoolExecutor). Las figuras Plotly
+  pasan por un único servidor kaleido que se arranca una sola vez por proceso (un Chrome con
+  varias pestañas) en lugar de iniciar un navegador por cada write_image.
+- Cada PNG queda en caché en memoria por hash de la figura y tamaño: exportar de nuevo sin
+  cambios no vuelve a renderizar nada.
+- Si kaleido/Chrome no están disponibles, las figuras Plotly se dibujan con matplotlib a
+  partir de sus trazas (barras para el mapa, líneas para la serie temporal).
+- El PDF se construye en un BytesIO, listo para st.download_button, sin archivos temporales.
+"""
+import io
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+REPORT_TITLE = "Análisis Visual de Producción Científica"
+
+# (clave de la figura, título de la sección, mensaje si no hay figura)
+SECTIONS = (
+    ('heatmap', "1. Mapa de Calor Geográfico", "No hay datos suficientes para el mapa de calor"),
+    ('wordcloud', "2. Nube de Palabras", "No hay datos suficientes para la nube de palabras"),
+    ('timeline', "3. Línea Temporal", "No hay datos suficientes para la línea temporal"),
+)
+
+IMAGE_SIZE = (800, 400)
+MAX_CACHED_IMAGES = 32
+
+_image_cache = OrderedDict()
+_cache_lock = threading.Lock()
+# lru_cache no serializa las primeras llamadas: sin el lock, el hilo que arranca la página y los
+# hilos de figure_png podrían iniciar el servidor dos veces
+_kaleido_lock = threading.Lock()
+
+
+def warm_kaleido(n_tabs: int = 3) -> bool:
+    """Arranca (una vez) el servidor kaleido compartido; False si no está disponible"""
+    with _kaleido_lock:
+        return _start_kaleido(n_tabs)
+
+
+@lru_cache(maxsize=1)
+def _start_kaleido(n_tabs: int) -> bool:
+    try:
+        import kaleido
+    except ImportError:
+        return False
+    if hasattr(kaleido, 'start_sync_server'):
+        try:
+            # Sin Chrome el servidor quedaría marcado como activo y cada exportación se bloquearía:
+            # construir un Kaleido (sin abrirlo) verifica antes que el navegador exista
+            kaleido.Kaleido(n=1)
+            kaleido.start_sync_server(n=n_tabs, silence_warnings=True)
+        except Exception:
+            return False
+    return True
+
+
+def _figure_hash(fig, width: int, height: int) -> Optional[str]:
+    if hasattr(fig, 'to_json'):
+        payload = fig.to_json()
+    elif hasattr(fig, 'tobytes'):
+        payload = fig.tobytes()
+    else:
+        return None
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    return hashlib.sha1(payload + f'|{width}x{height}'.encode()).hexdigest()
+
+
+def _plotly_fallback_png(fig, width: int, height: int) -> bytes:
+    """Versión matplotlib de una figura Plotly (sin Chrome): barras para mapas, líneas para series"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    mpl_fig = Figure(figsize=(width / 100, height / 100), dpi=100)
+    FigureCanvasAgg(mpl_fig)
+    ax = mpl_fig.add_subplot(111)
+    for trace in fig.data:
+        if trace.type == 'choropleth':
+            pairs = sorted(zip(trace.z, trace.hovertext if trace.hovertext is not None else trace.locations),
+                           key=lambda p: -p[0])[:20]
+            ax.barh([str(label) for _, label in pairs][::-1], [value for value, _ in pairs][::-1], color='#440154')
+            ax.set_xlabel('Publicaciones')
+        elif trace.x is not None and trace.y is not None:
+            ax.plot(list(trace.x), list(trace.y), marker='o', markersize=3, label=trace.name)
+    if fig.layout.title.text:
+        ax.set_title(fig.layout.title.text, fontsize=10)
+    if 0 < len(ax.get_lines()) <= 15:
+        ax.legend(fontsize=6)
+    mpl_fig.tight_layout()
+    buffer = io.BytesIO()
+    mpl_fig.savefig(buffer, format='png', facecolor='white')
+    return buffer.getvalue()
+
+
+def figure_png(fig, width: int = IMAGE_SIZE[0], height: int = IMAGE_SIZE[1]) -> bytes:
+    """PNG de una figura Plotly, matplotlib o imagen PIL (con caché por contenido)"""
+    key = _figure_hash(fig, width, height)
+    if key is not None:
+        with _cache_lock:
+            if key in _image_cache:
+                _image_cache.move_to_end(key)
+                return _image_cache[key]
+
+    buffer = io.BytesIO()
+    if hasattr(fig, 'to_plotly_json'):
+        try:
+            import plotly.io as pio
+            png = pio.to_image(fig, format='png', width=width, height=height) if warm_kaleido() else None
+        except Exception:
+            png = None
+        png = png or _plotly_fallback_png(fig, width, height)
+    elif hasattr(fig, 'savefig'):
+        fig.savefig(buffer, format='png', bbox_inches='tight', dpi=150, facecolor='white')
+        png = buffer.getvalue()
+    else:
+        fig.save(buffer, format='PNG')
+        png = buffer.getvalue()
+
+    if key is not None:
+        with _cache_lock:
+            _image_cache[key] = png
+            while len(_image_cache) > MAX_CACHED_IMAGES:
+                _image_cache.popitem(last=False)
+    return png
+
+
+def render_images(figures: Dict[str, object], max_workers: int = 3) -> Dict[str, Optional[bytes]]:
+    """PNG de todas las figuras en paralelo (None para las que faltan)"""
+    available = {name: fig for name, fig in figures.items() if fig is not None}
+    images = {name: None for name in figures}
+    if not available:
+        return images
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(available))) as pool:
+        futures = {name: pool.submit(figure_png, fig) for name, fig in available.items()}
+        images.update({name: future.result() for name, future in futures.items()})
+    return images
+
+
+def build_pdf(images: Dict[str, Optional[bytes]], sections: Sequence[Tuple[str, str, str]] = SECTIONS,
+              title: str = REPORT_TITLE) -> bytes:
+    """Documento PDF (bytes) con una sección por figura"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=16, spaceAfter=30, alignment=1)
+
+    story = [Paragraph(title, title_style), Spacer(1, 20)]
+    for key, heading, missing in sections:
+        story.append(Paragraph(heading, styles['Heading2']))
+        png = images.get(key)
+        if png:
+            story.append(Image(io.BytesIO(png), width=6 * inch, height=3 * inch))
+        else:
+            story.append(Paragraph(missing, styles['Italic']))
+        story.append(Spacer(1, 20))
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def build_report(figures: Dict[str, object], max_workers: int = 3) -> bytes:
+    """Renderiza las figuras en paralelo y arma el PDF en memoria"""
+    return build_pdf(render_images(figures, max_workers=max_workers))
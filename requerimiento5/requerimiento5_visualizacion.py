@@ -1,29 +1,39 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from wordcloud import WordCloud
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
 import json
 import os
+import re
+import threading
+from collections import Counter
 from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
-# Para el mapa geográfico
-import pycountry
-from geopy.geocoders import Nominatim
-import folium
-from streamlit_folium import folium_static
+from scipy import sparse
+from requerimiento2.coautoria import CoauthorshipNetwork
+from requerimiento2.citas import to_numeric_counts
+from requerimiento5.tendencias import get_trend_matrix
+from requerimiento5.gazetteer_paises import default_gazetteer, institution_gazetteer, country_name, standardize_country
+from requerimiento5.geocodificacion import OfflineGeocoder, folium_map
+from requerimiento3.nube_palabras import get_wordcloud_cache, wordcloud_cache_dir, show_wordcloud
+from requerimiento3.layout_red import cached_layout, network_figure, prune_edges
+from requerimiento1.corpus import load_corpus, corpus_version
 
-# Para exportar a PDF
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
+# Para exportar a PDF (reportlab y kaleido se importan al generar el reporte).
+# plotly, matplotlib y streamlit_folium se importan dentro de las funciones que dibujan,
+# para no cargarlos al abrir el tablero.
+from requerimiento5.reporte_pdf import build_report, warm_kaleido
+
+WORDCLOUD_STOPWORDS = {
+    'this', 'that', 'with', 'from', 'have', 'has', 'had', 'were', 'which', 
+    'their', 'what', 'will', 'would', 'about', 'when', 'them', 'some', 
+    'into', 'such', 'than', 'then', 'also', 'more', 'most', 'these', 
+    'there', 'other', 'using', 'based', 'study', 'research', 'paper',
+    'results', 'method', 'approach', 'model', 'system', 'data', 'analysis',
+    'however', 'therefore', 'addition', 'further', 'different', 'various'
+}
 
 class ScientificVisualization:
     def __init__(self, project_root):
@@ -85,7 +95,9 @@ class ScientificVisualization:
                             'DO': 'doi',
                             'UR': 'url',
                             'L1': 'pdf_url',
-                            'LA': 'language'
+                            'LA': 'language',
+                            'C1': 'citations',
+                            'C2': 'versions'
                         }
                         
                         if tag in field_map:
@@ -133,6 +145,9 @@ class ScientificVisualization:
         if 'title' in df.columns:
             df['title'] = df['title'].fillna('Sin título')
         
+        for column in ('citations', 'versions'):
+            df[column] = to_numeric_counts(df[column]) if column in df.columns else np.nan
+        
         return df
     
     def _extract_year(self, year_str):
@@ -173,25 +188,54 @@ class ScientificVisualization:
         if not os.path.exists(unified_path):
             raise FileNotFoundError("No se encontró el archivo unificado. Ejecuta primero el Requerimiento 1.")
         
-        self.df = self.load_ris_data(unified_path)
+        self.df = load_corpus(self.project_root, load_records)
         
         st.success(f"Cargados {len(self.df)} documentos")
         return len(self.df)
     
+    def _text_column(self, column, first_only=False):
+        """Columna como texto: listas (etiquetas RIS repetidas) unidas con '; ', vacíos como ''"""
+        if column not in self.df.columns:
+            return pd.Series('', index=self.df.index)
+        values = self.df[column]
+        is_list = values.map(lambda v: isinstance(v, list))
+        if is_list.any():
+            values = values.copy()
+            values[is_list] = values[is_list].map(lambda v: v[0] if first_only and v else '; '.join(map(str, v)))
+        return values.fillna('').astype(str)
+    
+    def _valid_records_mask(self):
+        """Registros con título y al menos año, autores o abstract (>10 caracteres)"""
+        has_title = self._text_column('title').str.strip() != ''
+        has_year = self.df['year'].notna() if 'year' in self.df.columns else pd.Series(False, index=self.df.index)
+        has_authors = self._text_column('authors').str.strip() != ''
+        has_abstract = self._text_column('abstract').str.strip().str.len() > 10
+        return has_title & (has_year | has_authors | has_abstract)
+    
     def extract_geographic_data(self):
-        countries = []
-        valid_records = 0
-        
-        for idx, row in self.df.iterrows():
-            if self._is_valid_record(row):
-                country = self._extract_country_from_record(row)
-                countries.append(country)
-                valid_records += 1
-            else:
-                countries.append('Skipped')
-                self.skipped_records += 1
-        
-        self.df['country'] = countries
+        valid = self._valid_records_mask()
+        self.skipped_records += int((~valid).sum())
+        
+        # Fuentes en orden de prioridad: ciudad, editorial, afiliación, autores, revista
+        # (en autores solo instituciones, para no confundir apellidos con países)
+        gazetteer = default_gazetteer()
+        sources = [
+            (self._text_column('city').str.strip(), gazetteer),
+            (self._text_column('publisher'), gazetteer),
+            (self._text_column('affiliation'), gazetteer),
+            (self._text_column('authors'), institution_gazetteer()),
+            (self._text_column('journal'), gazetteer),
+        ]
+        iso = pd.Series(None, index=self.df.index, dtype=object)
+        for text, source_gazetteer in sources:
+            pending = valid & iso.isna() & (text != '')
+            if pending.any():
+                iso[pending] = source_gazetteer.match(text[pending])
+        
+        country = iso.map(country_name, na_action='ignore').fillna('Unknown')
+        country[~valid] = 'Skipped'
+        self.df['country'] = country
+        self.df['country_iso'] = iso.where(valid)
         
         valid_country_data = self.df[self.df['country'] != 'Skipped']
         
@@ -199,137 +243,15 @@ class ScientificVisualization:
             self.country_data = pd.DataFrame(valid_country_data['country'].value_counts()).reset_index()
             self.country_data.columns = ['country', 'count']
             
-            self.country_data['country_clean'] = self.country_data['country'].apply(self._standardize_country_name)
+            standardized = self.country_data['country'].map(standardize_country)
+            self.country_data['iso_alpha'] = standardized.str[0]
+            self.country_data['country_clean'] = standardized.str[1]
             self.country_data = self.country_data[self.country_data['country_clean'] != 'Unknown']
         else:
-            self.country_data = pd.DataFrame(columns=['country', 'count', 'country_clean'])
+            self.country_data = pd.DataFrame(columns=['country', 'count', 'iso_alpha', 'country_clean'])
         
         return self.country_data
     
-    def _is_valid_record(self, row):
-        has_title = 'title' in row and pd.notna(row['title']) and str(row['title']).strip() != ''
-        
-        if not has_title:
-            return False
-        
-        has_any_data = False
-        
-        if 'year' in row and pd.notna(row['year']):
-            has_any_data = True
-        
-        if not has_any_data and 'authors' in row and pd.notna(row['authors']) and str(row['authors']).strip() != '':
-            has_any_data = True
-        
-        if not has_any_data and 'abstract' in row and pd.notna(row['abstract']) and len(str(row['abstract']).strip()) > 10:
-            has_any_data = True
-        
-        return has_title and has_any_data
-    
-    def _extract_country_from_record(self, row):
-        if 'city' in row and pd.notna(row['city']) and str(row['city']).strip():
-            city_country = str(row['city']).strip()
-            country = self._extract_country_from_text(city_country)
-            if country != 'Unknown':
-                return country
-        
-        if 'publisher' in row and pd.notna(row['publisher']):
-            publisher = str(row['publisher'])
-            country = self._extract_country_from_text(publisher)
-            if country != 'Unknown':
-                return country
-        
-        if 'affiliation' in row and pd.notna(row['affiliation']):
-            affiliation = str(row['affiliation'])
-            country = self._extract_country_from_text(affiliation)
-            if country != 'Unknown':
-                return country
-        
-        if 'authors' in row and pd.notna(row['authors']):
-            author = str(row['authors'])
-            country = self._extract_country_from_author(author)
-            if country != 'Unknown':
-                return country
-        
-        if 'journal' in row and pd.notna(row['journal']):
-            journal = str(row['journal'])
-            country = self._extract_country_from_text(journal)
-            if country != 'Unknown':
-                return country
-        
-        return 'Unknown'
-    
-    def _extract_country_from_author(self, author_text):
-        author_text = author_text.lower()
-        
-        patterns = {
-            'university of california': 'United States',
-            'stanford university': 'United States',
-            'mit': 'United States',
-            'harvard': 'United States',
-            'oxford': 'United Kingdom',
-            'cambridge': 'United Kingdom',
-            'university of toronto': 'Canada',
-            'university of sydney': 'Australia',
-            'university of tokyo': 'Japan',
-            'tsinghua': 'China',
-            'peking university': 'China',
-            'eth zurich': 'Switzerland',
-            'max planck': 'Germany',
-            'technical university': 'Germany',
-            'university of sao paulo': 'Brazil',
-            'iit': 'India',
-            'national university of singapore': 'Singapore'
-        }
-        
-        for pattern, country in patterns.items():
-            if pattern in author_text:
-                return country
-        
-        return 'Unknown'
-    
-    def _extract_country_from_text(self, text):
-        text = str(text).lower()
-        
-        country_keywords = {
-            'usa': 'United States', 'united states': 'United States', 'us': 'United States', 'u.s.': 'United States',
-            'china': 'China', 'peoples republic of china': 'China', 'chinese': 'China',
-            'uk': 'United Kingdom', 'united kingdom': 'United Kingdom', 'england': 'United Kingdom', 'british': 'United Kingdom',
-            'germany': 'Germany', 'deutschland': 'Germany', 'german': 'Germany',
-            'france': 'France', 'french': 'France',
-            'canada': 'Canada', 'canadian': 'Canada',
-            'australia': 'Australia', 'australian': 'Australia',
-            'japan': 'Japan', 'japanese': 'Japan',
-            'spain': 'Spain', 'spanish': 'Spain',
-            'italy': 'Italy', 'italian': 'Italy',
-            'brazil': 'Brazil', 'brasil': 'Brazil', 'brazilian': 'Brazil',
-            'india': 'India', 'indian': 'India',
-            'korea': 'South Korea', 'south korea': 'South Korea', 'korean': 'South Korea',
-            'netherlands': 'Netherlands', 'holland': 'Netherlands', 'dutch': 'Netherlands',
-            'switzerland': 'Switzerland', 'swiss': 'Switzerland',
-            'sweden': 'Sweden', 'swedish': 'Sweden',
-            'mexico': 'Mexico', 'mexican': 'Mexico',
-            'argentina': 'Argentina', 'argentinian': 'Argentina',
-            'chile': 'Chile', 'chilean': 'Chile',
-            'colombia': 'Colombia', 'colombian': 'Colombia',
-            'russia': 'Russia', 'russian': 'Russia'
-        }
-        
-        for keyword, country in country_keywords.items():
-            if keyword in text:
-                return country
-        
-        return 'Unknown'
-    
-    def _standardize_country_name(self, country_name):
-        if country_name == 'Unknown':
-            return 'Unknown'
-        
-        try:
-            country = pycountry.countries.search_fuzzy(country_name)
-            return country[0].name
-        except:
-            return country_name
-    
     def create_heatmap(self):
         if self.country_data is None:
             self.extract_geographic_data()
@@ -338,15 +260,17 @@ class ScientificVisualization:
             st.warning("No hay datos geográficos suficientes para generar el mapa de calor")
             return None
         
-        country_counts = self.country_data.groupby('country_clean')['count'].sum().reset_index()
+        country_counts = (self.country_data.dropna(subset=['iso_alpha'])
+                          .groupby(['iso_alpha', 'country_clean'])['count'].sum().reset_index())
         
+        import plotly.express as px
         fig = px.choropleth(
             country_counts,
-            locations='country_clean',
-            locationmode='country names',
+            locations='iso_alpha',
+            locationmode='ISO-3',
             color='count',
             hover_name='country_clean',
-            hover_data={'count': True, 'country_clean': False},
+            hover_data={'count': True, 'iso_alpha': False},
             color_continuous_scale='Viridis',
             title='Distribución Geográfica de Publicaciones por País del Primer Autor'
         )
@@ -363,51 +287,33 @@ class ScientificVisualization:
         return fig
     
     def generate_wordcloud_data(self):
-        all_text = []
+        abstracts = self._text_column('abstract').str.strip()
+        keywords = self._text_column('keywords').str.strip()
+        titles = self._text_column('title').str.strip()
         
-        for idx, row in self.df.iterrows():
-            if 'abstract' in row and pd.notna(row['abstract']) and str(row['abstract']).strip():
-                abstract = str(row['abstract']).strip()
-                if len(abstract) > 10:
-                    all_text.append(abstract)
-            
-            if 'keywords' in row and pd.notna(row['keywords']) and str(row['keywords']).strip():
-                keywords = str(row['keywords']).strip()
-                all_text.append(keywords)
-            
-            if 'title' in row and pd.notna(row['title']) and str(row['title']).strip():
-                title = str(row['title']).strip()
-                if len(title) > 5:
-                    all_text.append(title)
+        all_text = pd.concat([
+            abstracts[abstracts.str.len() > 10],
+            keywords[keywords != ''],
+            titles[titles.str.len() > 5],
+        ], ignore_index=True)
         
         if len(all_text) == 0:
             st.warning("No hay textos válidos para generar la nube de palabras")
             return None
         
-        full_text = ' '.join(all_text)
+        words = all_text.str.lower().str.findall(r'\b[a-zA-Z]{4,}\b').explode().dropna()
+        words = words[~words.isin(WORDCLOUD_STOPWORDS)]
         
-        import re
-        from collections import Counter
-        
-        words = re.findall(r'\b[a-zA-Z]{4,}\b', full_text.lower())
-        
-        stopwords = set([
-            'this', 'that', 'with', 'from', 'have', 'has', 'had', 'were', 'which', 
-            'their', 'what', 'will', 'would', 'about', 'when', 'them', 'some', 
-            'into', 'such', 'than', 'then', 'also', 'more', 'most', 'these', 
-            'there', 'other', 'using', 'based', 'study', 'research', 'paper',
-            'results', 'method', 'approach', 'model', 'system', 'data', 'analysis',
-            'however', 'therefore', 'addition', 'further', 'different', 'various'
-        ])
-        
-        filtered_words = [word for word in words if word not in stopwords]
-        
-        if len(filtered_words) == 0:
+        if len(words) == 0:
             return None
         
-        self.word_freq = Counter(filtered_words)
+        self.word_freq = Counter(words.value_counts().to_dict())
         return self.word_freq
     
+    @property
+    def wordcloud_cache(self):
+        return get_wordcloud_cache(wordcloud_cache_dir(self.project_root))
+    
     def create_wordcloud(self, max_words=100):
         if self.word_freq is None:
             word_freq = self.generate_wordcloud_data()
@@ -421,14 +327,9 @@ class ScientificVisualization:
             st.warning("No hay palabras suficientes para generar la nube")
             return None
         
-        wordcloud = WordCloud(
-            width=800,
-            height=400,
-            background_color='white',
-            colormap='viridis',
-            max_words=max_words
-        ).generate_from_frequencies(wordcloud_dict)
+        wordcloud = self.wordcloud_cache.get(self.word_freq, max_words=max_words)
         
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots(figsize=(10, 5))
         ax.imshow(wordcloud, interpolation='bilinear')
         ax.axis('off')
@@ -438,40 +339,28 @@ class ScientificVisualization:
         return fig
     
     def create_timeline(self):
-        years = []
-        journals = []
+        has_year = self.df['year'].notna() if 'year' in self.df.columns else pd.Series(False, index=self.df.index)
         
-        for idx, row in self.df.iterrows():
-            year = None
-            if 'year' in row and pd.notna(row['year']):
-                year = row['year']
-            
-            journal = 'Unknown'
-            if 'journal' in row and pd.notna(row['journal']) and str(row['journal']).strip():
-                journal = str(row['journal']).strip()
-            
-            if year is not None:
-                years.append(year)
-                journals.append(journal)
-        
-        if len(years) == 0:
+        if not has_year.any():
             st.warning("No hay registros con datos de año para la línea temporal")
             return None
         
+        journals = self._text_column('journal', first_only=True).str.strip()
         timeline_data = pd.DataFrame({
-            'year': years,
-            'journal': journals
+            'year': self.df.loc[has_year, 'year'],
+            'journal': journals[has_year].replace('', 'Unknown')
         })
         
         timeline_summary = timeline_data.groupby(['year', 'journal']).size().reset_index()
         timeline_summary.columns = ['year', 'journal', 'count']
         
+        import plotly.express as px
         fig = px.line(
             timeline_summary,
             x='year',
             y='count',
             color='journal',
-            title=f'Línea Temporal de Publicaciones por Año y Revista ({len(years)} registros con año)',
+            title=f'Línea Temporal de Publicaciones por Año y Revista ({len(timeline_data)} registros con año)',
             labels={'year': 'Año', 'count': 'Número de Publicaciones', 'journal': 'Revista'}
         )
         
@@ -483,79 +372,192 @@ class ScientificVisualization:
         
         return fig
     
-    def export_to_pdf(self, output_dir):
-        """Exporta los tres gráficos a PDF - VERSIÓN MEJORADA"""
+    def report_figures(self, max_words=100):
+        """Figuras del reporte PDF (la nube sale de la caché de imágenes)"""
+        if self.word_freq is None:
+            self.generate_wordcloud_data()
+        return {
+            'heatmap': self.create_heatmap(),
+            'wordcloud': self.wordcloud_cache.get(self.word_freq, max_words=max_words) if self.word_freq else None,
+            'timeline': self.create_timeline(),
+        }
+    
+    def report_pdf(self, figures=None, max_words=100):
+        """PDF en memoria (bytes); `figures` permite reutilizar las figuras ya generadas en la sesión"""
+        report = self.report_figures(max_words) if figures is None else figures
+        return build_report(report)
+    
+    def export_to_pdf(self, output_dir, figures=None):
+        """Exporta los tres gráficos a PDF en output_dir/analisis_visual.pdf"""
         os.makedirs(output_dir, exist_ok=True)
         pdf_path = os.path.join(output_dir, "analisis_visual.pdf")
         
         try:
-            # Crear documento PDF
-            doc = SimpleDocTemplate(pdf_path, pagesize=letter)
-            styles = getSampleStyleSheet()
-            story = []
-            
-            # Título
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=16,
-                spaceAfter=30,
-                alignment=1
-            )
-            
-            story.append(Paragraph("Análisis Visual de Producción Científica", title_style))
-            story.append(Spacer(1, 20))
-            
-            # Guardar gráficos temporalmente
-            temp_dir = os.path.join(output_dir, "temp")
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            # 1. Mapa de calor
-            story.append(Paragraph("1. Mapa de Calor Geográfico", styles['Heading2']))
-            map_fig = self.create_heatmap()
-            if map_fig:
-                map_path = os.path.join(temp_dir, "mapa_calor.png")
-                map_fig.write_image(map_path, width=800, height=400)
-                story.append(Image(map_path, width=6*inch, height=3*inch))
-            else:
-                story.append(Paragraph("No hay datos suficientes para el mapa de calor", styles['Italic']))
-            story.append(Spacer(1, 20))
-            
-            # 2. Nube de palabras
-            story.append(Paragraph("2. Nube de Palabras", styles['Heading2']))
-            wc_fig = self.create_wordcloud()
-            if wc_fig:
-                wc_path = os.path.join(temp_dir, "nube_palabras.png")
-                wc_fig.savefig(wc_path, bbox_inches='tight', dpi=150, facecolor='white')
-                story.append(Image(wc_path, width=6*inch, height=3*inch))
-            else:
-                story.append(Paragraph("No hay datos suficientes para la nube de palabras", styles['Italic']))
-            story.append(Spacer(1, 20))
-            
-            # 3. Línea temporal
-            story.append(Paragraph("3. Línea Temporal", styles['Heading2']))
-            timeline_fig = self.create_timeline()
-            if timeline_fig:
-                timeline_path = os.path.join(temp_dir, "linea_temporal.png")
-                timeline_fig.write_image(timeline_path, width=800, height=400)
-                story.append(Image(timeline_path, width=6*inch, height=3*inch))
-            else:
-                story.append(Paragraph("No hay datos suficientes para la línea temporal", styles['Italic']))
-            
-            # Construir PDF
-            doc.build(story)
-            
-            # Limpiar archivos temporales
-            import shutil
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
-            
+            pdf_bytes = self.report_pdf(figures)
+            with open(pdf_path, 'wb') as f:
+                f.write(pdf_bytes)
             return pdf_path
             
         except Exception as e:
             st.error(f"Error al generar PDF: {str(e)}")
             return None
 
+def load_records(ris_path):
+    """Registros del RIS con los campos del Requerimiento 5 (lector para requerimiento1.corpus.load_corpus)"""
+    return ScientificVisualization(None).load_ris_data(ris_path)
+
+@st.cache_resource(show_spinner="Calculando matriz años x términos...")
+def cargar_tendencias(project_root, source, unified_version, _df):
+    """Matriz de tendencias por fuente; se reconstruye solo si cambia el archivo unificado"""
+    return get_trend_matrix(project_root, _df, source, sources={'unified': unified_version})
+
+def mostrar_tendencias(project_root, df):
+    st.subheader("Tendencias y Temas Emergentes")
+    st.write("Crecimiento anual y ráfagas (Kleinberg) de términos, palabras clave y revistas")
+    
+    fuentes = {'Términos de títulos y abstracts': 'terms', 'Palabras clave': 'keywords', 'Revistas': 'journal'}
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        fuente = st.selectbox("Fuente", list(fuentes), key="trend_source")
+    with col2:
+        ventana = st.slider("Ventana de años para el crecimiento", 1, 5, 3, key="trend_window")
+    with col3:
+        sensibilidad = st.slider("Sensibilidad de ráfagas (s)", 1.5, 4.0, 2.0, 0.5, key="trend_s")
+    
+    unified_path = os.path.join(project_root, "resultados", "requerimiento1", "resultados_unificados.ris")
+    matrix = cargar_tendencias(project_root, fuentes[fuente], corpus_version(unified_path), df)
+    if len(matrix.years) < 2 or not matrix.terms:
+        st.warning("No hay suficientes años o términos para analizar tendencias")
+        return
+    
+    emergentes = matrix.emerging(recent_years=ventana, top_n=20, s=sensibilidad)
+    crecimiento = matrix.growth(window=ventana).head(20)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("**Temas emergentes (ráfagas recientes):**")
+        st.dataframe(emergentes)
+    with col2:
+        st.write("**Mayor crecimiento anual:**")
+        st.dataframe(crecimiento)
+    
+    sugeridos = list(dict.fromkeys(emergentes['term'].head(5).tolist() + crecimiento['term'].head(3).tolist()))
+    seleccion = st.multiselect("Términos a graficar", matrix.terms, default=sugeridos[:5], key="trend_terms")
+    if seleccion:
+        import plotly.express as px
+        series = matrix.series(seleccion, relative=True).rename_axis('Año')
+        fig = px.line(series, markers=True, title='Evolución anual',
+                      labels={'value': 'Proporción de documentos', 'variable': 'Término'})
+        st.plotly_chart(fig, use_container_width=True)
+
+def generar_visualizaciones(analyzer, project_root):
+    """Calcula mapa, nube, línea temporal y red de co-autoría (sin dibujarlos)"""
+    results = {}
+    
+    # 1. Mapa de calor y capas del mapa interactivo (centroides y ciudades desde la tabla local)
+    analyzer.extract_geographic_data()
+    results['map_fig'] = analyzer.create_heatmap()
+    results['country_data'] = analyzer.country_data
+    geocoder = OfflineGeocoder(os.path.join(project_root, "resultados", "requerimiento5", "geocodificacion.sqlite"))
+    layers = {'Países': (geocoder.country_points(analyzer.country_data), '#1f77b4')}
+    if 'city' in analyzer.df.columns:
+        layers['Ciudad de publicación'] = (
+            geocoder.place_points(analyzer._text_column('city', first_only=True)), '#d62728')
+    results['map_layers'] = layers
+    
+    # 2. Frecuencias de la nube (la imagen se genera al mostrarla, según max_words)
+    results['word_freq'] = analyzer.word_freq or analyzer.generate_wordcloud_data()
+    
+    # 3. Línea temporal
+    results['timeline_fig'] = analyzer.create_timeline()
+    
+    # 4. Red de co-autoría
+    network = CoauthorshipNetwork.from_authors(analyzer.df['authors'])
+    summary = network.summary()
+    results['network_summary'] = summary
+    results['network_fig'] = None
+    if summary['n_edges'] > 0:
+        results['centralities'] = network.centralities().drop(columns=['key', 'component']).head(20)
+        # Se dibujan solo los autores con más artículos para que la red sea legible
+        top = np.argsort(-network.papers_per_author, kind='stable')[:300]
+        sub = network.adjacency()[top][:, top]
+        upper = sparse.triu(sub, k=1).tocoo()
+        edges = [(int(i), int(j), float(w)) for i, j, w in zip(upper.row, upper.col, upper.data)]
+        edges = prune_edges(edges, len(top), max_edges=2000)
+        names = [str(name) for name in network.names[top]]
+        layout_path = os.path.join(project_root, "resultados", "requerimiento5", "layout_coautoria.json")
+        pos = cached_layout(layout_path, names, edges)
+        results['network_fig'] = network_figure(names, pos, edges, sizes=network.papers_per_author[top],
+                                                 title='Red de Co-autoría')
+    return results
+
+def mostrar_visualizaciones(analyzer, results, max_words, show_raw_data):
+    """Muestra las visualizaciones calculadas por generar_visualizaciones"""
+    # 1. MAPA DE CALOR
+    st.subheader("Mapa de Calor Geográfico")
+    st.write("Distribución de publicaciones por país del primer autor")
+    
+    if results['map_fig']:
+        st.plotly_chart(results['map_fig'], use_container_width=True)
+    else:
+        st.warning("No hay datos geográficos suficientes para generar el mapa")
+    
+    layers = results['map_layers']
+    if any(not points.empty for points, _ in layers.values()):
+        st.write("**Mapa interactivo** (países y ciudades de publicación)")
+        from streamlit_folium import folium_static
+        folium_static(folium_map(layers), width=900, height=450)
+    
+    if show_raw_data and results['country_data'] is not None:
+        st.write("**Datos geográficos:**")
+        st.dataframe(results['country_data'])
+    
+    # 2. NUBE DE PALABRAS
+    st.subheader("Nube de Palabras")
+    st.write("Términos más frecuentes en abstracts y keywords")
+    
+    word_freq = results['word_freq']
+    if word_freq:
+        # Vista previa inmediata; la versión completa se genera en segundo plano y queda en caché
+        show_wordcloud(analyzer.wordcloud_cache, word_freq, max_words=max_words)
+        
+        # Mostrar tabla de frecuencias
+        top_words = pd.DataFrame(
+            word_freq.most_common(20), 
+            columns=['Palabra', 'Frecuencia']
+        )
+        st.write("**Top 20 palabras más frecuentes:**")
+        st.dataframe(top_words)
+    else:
+        st.warning("No hay textos suficientes para generar la nube de palabras")
+    
+    # 3. LÍNEA TEMPORAL
+    st.subheader("Línea Temporal de Publicaciones")
+    st.write("Evolución de publicaciones por año y revista")
+    
+    if results['timeline_fig']:
+        st.plotly_chart(results['timeline_fig'], use_container_width=True)
+    else:
+        st.warning("No hay suficientes datos de años para generar la línea temporal")
+    
+    # 4. RED DE CO-AUTORÍA
+    st.subheader("Red de Co-autoría")
+    st.write("Autores conectados por artículos firmados en conjunto")
+    
+    summary = results['network_summary']
+    if results['network_fig'] is not None:
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Autores", summary['n_authors'])
+        col2.metric("Colaboraciones", summary['n_edges'])
+        col3.metric("Componentes", summary['n_components'])
+        col4.metric("Componente mayor", summary['largest_component'])
+        
+        st.write("**Autores más centrales:**")
+        st.dataframe(results['centralities'])
+        st.plotly_chart(results['network_fig'], use_container_width=True)
+    else:
+        st.warning("No hay suficientes datos de autores para construir la red de co-autoría")
+
 def mostrar_requerimiento_5(project_root):
     st.markdown('<div class="requirement-title">Requerimiento 5: Visualizaciones Avanzadas</div>', unsafe_allow_html=True)
     
@@ -564,6 +566,8 @@ def mostrar_requerimiento_5(project_root):
     - **Mapa de calor geográfico** con distribución por países
     - **Nube de palabras** dinámica de términos más frecuentes  
     - **Línea temporal** de publicaciones por año y revista
+    - **Red de co-autoría** con centralidades de los autores
+    - **Tendencias** por año y detección de temas emergentes
     - **Exportación a PDF** de todos los análisis
     """)
     
@@ -592,57 +596,24 @@ def mostrar_requerimiento_5(project_root):
         with col2:
             show_raw_data = st.checkbox("Mostrar datos brutos", value=False)
         
-        # Botón principal para generar visualizaciones
+        # Botón principal: calcula las visualizaciones una vez y las guarda en session_state;
+        # se muestran en cada ejecución para que los controles (p.ej. el número de palabras)
+        # no hagan desaparecer la sección
         if st.button("Generar Visualizaciones", type="primary", key="generate_viz"):
             with st.spinner("Generando análisis visual..."):
                 st.session_state.visualizations_generated = True
-                
-                # 1. MAPA DE CALOR
-                st.subheader("Mapa de Calor Geográfico")
-                st.write("Distribución de publicaciones por país del primer autor")
-                
-                analyzer.extract_geographic_data()
-                map_fig = analyzer.create_heatmap()
-                
-                if map_fig:
-                    st.plotly_chart(map_fig, use_container_width=True)
-                else:
-                    st.warning("No hay datos geográficos suficientes para generar el mapa")
-                
-                if show_raw_data and analyzer.country_data is not None:
-                    st.write("**Datos geográficos:**")
-                    st.dataframe(analyzer.country_data)
-                
-                # 2. NUBE DE PALABRAS
-                st.subheader("Nube de Palabras")
-                st.write("Términos más frecuentes en abstracts y keywords")
-                
-                wc_fig = analyzer.create_wordcloud(max_words=max_words)
-                
-                if wc_fig:
-                    st.pyplot(wc_fig)
-                    
-                    # Mostrar tabla de frecuencias
-                    word_freq = analyzer.generate_wordcloud_data()
-                    if word_freq:
-                        top_words = pd.DataFrame(
-                            word_freq.most_common(20), 
-                            columns=['Palabra', 'Frecuencia']
-                        )
-                        st.write("**Top 20 palabras más frecuentes:**")
-                        st.dataframe(top_words)
-                else:
-                    st.warning("No hay textos suficientes para generar la nube de palabras")
-                
-                # 3. LÍNEA TEMPORAL
-                st.subheader("Línea Temporal de Publicaciones")
-                st.write("Evolución de publicaciones por año y revista")
-                
-                timeline_fig = analyzer.create_timeline()
-                if timeline_fig:
-                    st.plotly_chart(timeline_fig, use_container_width=True)
-                else:
-                    st.warning("No hay suficientes datos de años para generar la línea temporal")
+                # El servidor kaleido arranca en segundo plano para que el PDF no espere a Chrome
+                threading.Thread(target=warm_kaleido, daemon=True).start()
+                st.session_state.viz_results = generar_visualizaciones(analyzer, project_root)
+                # Figuras que reutiliza el reporte PDF
+                st.session_state.report_figures = {'heatmap': st.session_state.viz_results['map_fig'],
+                                                   'timeline': st.session_state.viz_results['timeline_fig']}
+        
+        if st.session_state.visualizations_generated and st.session_state.get('viz_results'):
+            mostrar_visualizaciones(analyzer, st.session_state.viz_results, max_words, show_raw_data)
+        
+        # Tendencias (independiente del botón: los controles son interactivos)
+        mostrar_tendencias(project_root, analyzer.df)
         
         # Mostrar sección de exportación a PDF SOLO si las visualizaciones fueron generadas
         if st.session_state.visualizations_generated:
@@ -652,15 +623,26 @@ def mostrar_requerimiento_5(project_root):
             if st.button("Generar Reporte PDF", key="generate_pdf"):
                 with st.spinner("Generando PDF..."):
                     output_dir = os.path.join(project_root, "resultados", "requerimiento5")
-                    pdf_path = analyzer.export_to_pdf(output_dir)
+                    figures = st.session_state.get('report_figures')
+                    if figures is not None:
+                        figures = dict(figures)
+                        word_freq = analyzer.word_freq
+                        figures['wordcloud'] = (analyzer.wordcloud_cache.get(word_freq, max_words=max_words)
+                                                if word_freq else None)
+                    
+                    try:
+                        pdf_bytes = analyzer.report_pdf(figures, max_words=max_words)
+                    except Exception as e:
+                        pdf_bytes = None
+                        st.error(f"Error al generar PDF: {str(e)}")
                     
-                    if pdf_path and os.path.exists(pdf_path):
+                    if pdf_bytes:
+                        os.makedirs(output_dir, exist_ok=True)
+                        pdf_path = os.path.join(output_dir, "analisis_visual.pdf")
+                        with open(pdf_path, "wb") as pdf_file:
+                            pdf_file.write(pdf_bytes)
                         st.success(f"✅ PDF generado exitosamente: {pdf_path}")
                         
-                        # Mostrar enlace de descarga
-                        with open(pdf_path, "rb") as pdf_file:
-                            pdf_bytes = pdf_file.read()
-                        
                         st.download_button(
                             label="Descargar PDF",
                             data=pdf_bytes,
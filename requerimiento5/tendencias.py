@@ -0,0 +1,251 @@
+# tendencias.py
+"""
+Tendencias temporales: frecuencia por año, crecimiento y ráfagas (bursts) de términos,
+palabras clave o revistas.
+
+- Se arma una sola vez la matriz dispersa años x términos (número de documentos de cada
+  año que contienen el término) multiplicando la matriz indicadora años x documentos por
+  la matriz binaria documentos x términos. Las consultas posteriores solo leen esa matriz.
+- Crecimiento: tasa anual compuesta entre dos ventanas de años (frecuencias relativas),
+  y variación interanual.
+- Ráfagas: modelo de Kleinberg de dos estados para datos por lotes (documentos por año).
+  El estado "ráfaga" emite con probabilidad s·p (p = proporción global del término) y
+  entrar en él cuesta gamma·ln(n) (n = número de años). Viterbi se resuelve vectorizado
+  para todos los términos a la vez (matrices años x términos).
+"""
+import os
+import json
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+from requerimiento2.tfidf_corpus import clean_text
+
+
+class TrendMatrix:
+    def __init__(self, years: np.ndarray, terms: List[str], counts: sparse.csr_matrix, docs_per_year: np.ndarray):
+        self.years = np.asarray(years, dtype=np.int64)
+        self.terms = list(terms)
+        self.counts = counts.tocsr()
+        self.docs_per_year = np.asarray(docs_per_year, dtype=np.int64)
+        self.index = {t: i for i, t in enumerate(self.terms)}
+
+    # ------------------------------
+    # Construcción
+    # ------------------------------
+    @classmethod
+    def from_doc_matrix(cls, years: Sequence, X: sparse.spmatrix, terms: List[str]) -> 'TrendMatrix':
+        """Agrega una matriz documentos x términos a años x términos (documentos sin año se descartan)"""
+        years = pd.to_numeric(pd.Series(list(years)), errors='coerce')
+        valid = years.notna().to_numpy()
+        X = sparse.csr_matrix(X)[valid]
+        doc_years = years[valid].astype(int).to_numpy()
+        if len(doc_years) == 0:
+            return cls(np.zeros(0), terms, sparse.csr_matrix((0, len(terms))), np.zeros(0))
+
+        # Años consecutivos (los años sin publicaciones cuentan como 0)
+        all_years = np.arange(doc_years.min(), doc_years.max() + 1)
+        row = doc_years - all_years[0]
+        indicator = sparse.csr_matrix((np.ones(len(row)), (row, np.arange(len(row)))),
+                                      shape=(len(all_years), len(row)))
+        X.data = np.ones_like(X.data)
+        counts = (indicator @ X).astype(np.int64)
+        docs_per_year = np.bincount(row, minlength=len(all_years))
+        return cls(all_years, terms, counts, docs_per_year)
+
+    @classmethod
+    def from_texts(cls, years: Sequence, texts: Sequence[str], ngram_range=(1, 2), min_df=2) -> 'TrendMatrix':
+        """Términos (n-gramas sin stopwords) de títulos/abstracts"""
+        vectorizer = CountVectorizer(preprocessor=clean_text, stop_words='english', binary=True,
+                                     ngram_range=ngram_range, min_df=min_df, dtype=np.int32)
+        try:
+            X = vectorizer.fit_transform(texts)
+        except ValueError:
+            vectorizer.set_params(min_df=1)
+            X = vectorizer.fit_transform(texts)
+        return cls.from_doc_matrix(years, X, vectorizer.get_feature_names_out().tolist())
+
+    @classmethod
+    def from_labels(cls, years: Sequence, labels: Sequence) -> 'TrendMatrix':
+        """Etiquetas por documento (p. ej. revista o lista de palabras clave)"""
+        values = pd.Series(list(labels)).map(
+            lambda v: [str(x).strip().lower() for x in v] if isinstance(v, (list, tuple))
+            else [x.strip().lower() for x in str(v).split(';')] if isinstance(v, str) else []
+        )
+        long = values.explode()
+        long = long[long.notna() & (long != '')]
+        codes, terms = pd.factorize(long)
+        X = sparse.csr_matrix((np.ones(len(codes)), (long.index.to_numpy(), codes)),
+                              shape=(len(values), len(terms)))
+        return cls.from_doc_matrix(years, X, list(terms))
+
+    # ------------------------------
+    # Persistencia
+    # ------------------------------
+    def save(self, storage_dir: str, sources: Optional[dict] = None) -> str:
+        os.makedirs(storage_dir, exist_ok=True)
+        sparse.save_npz(os.path.join(storage_dir, 'counts.npz'), self.counts)
+        with open(os.path.join(storage_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'years': self.years.tolist(), 'terms': self.terms,
+                       'docs_per_year': self.docs_per_year.tolist(), 'sources': sources or {}}, f, ensure_ascii=False)
+        return storage_dir
+
+    @classmethod
+    def load(cls, storage_dir: str, sources: Optional[dict] = None) -> Optional['TrendMatrix']:
+        """Matriz guardada; None si no existe o si las fuentes cambiaron"""
+        meta_path = os.path.join(storage_dir, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if sources is not None and meta.get('sources') != sources:
+            return None
+        counts = sparse.load_npz(os.path.join(storage_dir, 'counts.npz'))
+        return cls(np.array(meta['years']), meta['terms'], counts, np.array(meta['docs_per_year']))
+
+    # ------------------------------
+    # Consultas
+    # ------------------------------
+    def series(self, terms: Sequence[str], relative: bool = False) -> pd.DataFrame:
+        """Documentos por año (o proporción del año) de los términos pedidos"""
+        cols = [self.index[t] for t in terms if t in self.index]
+        values = self.counts[:, cols].toarray().astype(np.float64)
+        if relative:
+            values = values / np.maximum(self.docs_per_year, 1)[:, None]
+        return pd.DataFrame(values, index=self.years, columns=[self.terms[c] for c in cols])
+
+    def growth(self, window: int = 3, min_docs: int = 3) -> pd.DataFrame:
+        """
+        Crecimiento de cada término: compara la frecuencia relativa media de los últimos
+        `window` años con la de los `window` anteriores (tasa anual compuesta) y da la
+        variación interanual del último año. Solo términos con al menos min_docs documentos.
+        """
+        n_years = len(self.years)
+        total = np.asarray(self.counts.sum(axis=0)).ravel()
+        keep = np.flatnonzero(total >= min_docs)
+        if n_years < 2 or len(keep) == 0:
+            return pd.DataFrame(columns=['term', 'documents', 'recent_share', 'previous_share',
+                                         'annual_growth', 'last_year_change'])
+
+        window = max(1, min(window, n_years // 2))
+        dense = self.counts[:, keep].toarray().astype(np.float64)
+        share = dense / np.maximum(self.docs_per_year, 1)[:, None]
+        recent = share[-window:].mean(axis=0)
+        previous = share[-2 * window:-window].mean(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            annual = np.where(previous > 0, (recent / previous) ** (1.0 / window) - 1.0, np.inf)
+            annual = np.where((previous == 0) & (recent == 0), 0.0, annual)
+            last_change = np.where(dense[-2] > 0, dense[-1] / dense[-2] - 1.0, np.nan)
+
+        return (pd.DataFrame({
+            'term': [self.terms[c] for c in keep],
+            'documents': total[keep],
+            'recent_share': recent.round(4),
+            'previous_share': previous.round(4),
+            'annual_growth': annual,
+            'last_year_change': last_change,
+        }).sort_values(['annual_growth', 'documents'], ascending=False).reset_index(drop=True))
+
+    def bursts(self, s: float = 2.0, gamma: float = 1.0, min_docs: int = 3) -> pd.DataFrame:
+        """
+        Ráfagas de Kleinberg (dos estados, datos por lotes) para todos los términos con al
+        menos min_docs documentos. Devuelve un intervalo por fila: término, año de inicio,
+        año de fin y peso (reducción de costo frente a quedarse en el estado base).
+        """
+        columns = ['term', 'start', 'end', 'weight']
+        n_years = len(self.years)
+        total = np.asarray(self.counts.sum(axis=0)).ravel()
+        keep = np.flatnonzero(total >= min_docs)
+        if n_years < 2 or len(keep) == 0:
+            return pd.DataFrame(columns=columns)
+
+        r = self.counts[:, keep].toarray().astype(np.float64)          # años x términos
+        d = np.maximum(self.docs_per_year, 1).astype(np.float64)[:, None]
+        r = np.minimum(r, d)
+        p0 = np.clip(r.sum(axis=0) / d.sum(), 1e-9, 1 - 1e-9)
+        p1 = np.clip(s * p0, 1e-9, 1 - 1e-9)
+
+        def cost(p):
+            # -log verosimilitud binomial sin el término combinatorio (igual para ambos estados)
+            return -(r * np.log(p) + (d - r) * np.log(1 - p))
+
+        emit = np.stack([cost(p0), cost(p1)])                           # estado x años x términos
+        up = gamma * np.log(n_years)
+
+        # Viterbi vectorizado sobre términos
+        n_terms = len(keep)
+        best = np.zeros((2, n_terms))
+        best[0] = emit[0, 0]
+        best[1] = emit[1, 0] + up
+        back = np.zeros((n_years, 2, n_terms), dtype=np.int8)
+        for t in range(1, n_years):
+            stay0, from1 = best[0], best[1]
+            to0 = np.minimum(stay0, from1)
+            back[t, 0] = (from1 < stay0).astype(np.int8)
+            stay1, from0 = best[1], best[0] + up
+            to1 = np.minimum(stay1, from0)
+            back[t, 1] = np.where(from0 < stay1, 0, 1).astype(np.int8)
+            best = np.stack([to0 + emit[0, t], to1 + emit[1, t]])
+
+        states = np.zeros((n_years, n_terms), dtype=np.int8)
+        states[-1] = (best[1] < best[0]).astype(np.int8)
+        cols = np.arange(n_terms)
+        for t in range(n_years - 1, 0, -1):
+            states[t - 1] = back[t, states[t], cols]
+
+        # Intervalos consecutivos en estado de ráfaga
+        saving = emit[0] - emit[1]
+        padded = np.vstack([np.zeros((1, n_terms), dtype=np.int8), states, np.zeros((1, n_terms), dtype=np.int8)])
+        change = np.diff(padded.astype(np.int8), axis=0)
+        starts_t, starts_c = np.nonzero(change == 1)
+        ends_t, _ = np.nonzero(change == -1)
+        order_s = np.lexsort((starts_t, starts_c))
+        order_e = np.lexsort((ends_t, np.nonzero(change == -1)[1]))
+        starts_t, starts_c = starts_t[order_s], starts_c[order_s]
+        ends_t = ends_t[order_e]
+        cum = np.vstack([np.zeros((1, n_terms)), np.cumsum(saving, axis=0)])
+        weights = cum[ends_t, starts_c] - cum[starts_t, starts_c]
+
+        return (pd.DataFrame({
+            'term': [self.terms[keep[c]] for c in starts_c],
+            'start': self.years[starts_t],
+            'end': self.years[ends_t - 1],
+            'weight': np.round(weights, 3),
+        }).sort_values('weight', ascending=False).reset_index(drop=True))
+
+    def emerging(self, recent_years: int = 3, top_n: int = 20, **burst_kwargs) -> pd.DataFrame:
+        """Términos con ráfagas activas en los últimos `recent_years` años, por peso"""
+        bursts = self.bursts(**burst_kwargs)
+        if bursts.empty or len(self.years) == 0:
+            return bursts
+        cutoff = self.years[-1] - recent_years + 1
+        return bursts[bursts['end'] >= cutoff].head(top_n).reset_index(drop=True)
+
+
+def trends_dir(project_root: str, source: str) -> str:
+    return os.path.join(project_root, "resultados", "requerimiento5", "tendencias", source)
+
+
+def build_trend_matrix(df: pd.DataFrame, source: str = 'terms') -> TrendMatrix:
+    """Matriz años x términos desde el DataFrame del Requerimiento 5 ('terms', 'keywords' o 'journal')"""
+    if source == 'terms':
+        texts = (df['title'].fillna('').astype(str) + ' ' + df['abstract'].fillna('').astype(str)).tolist()
+        return TrendMatrix.from_texts(df['year'], texts)
+    if source in ('keywords', 'journal'):
+        column = df[source] if source in df.columns else pd.Series([''] * len(df))
+        return TrendMatrix.from_labels(df['year'], column)
+    raise ValueError(f"Fuente de tendencias no soportada: {source}")
+
+
+def get_trend_matrix(project_root: str, df: pd.DataFrame, source: str = 'terms',
+                     sources: Optional[Dict] = None) -> TrendMatrix:
+    """Matriz precalculada desde disco si las fuentes no cambiaron; si no, la construye y la guarda"""
+    storage_dir = trends_dir(project_root, source)
+    matrix = TrendMatrix.load(storage_dir, sources) if sources is not None else None
+    if matrix is None:
+        matrix = build_trend_matrix(df, source)
+        matrix.save(storage_dir, sources)
+    return matrix
@@ -1,12 +1,22 @@
 import streamlit as st
 import sys, os
+import importlib
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from requerimiento1.req1_unificacion import mostrar_requerimiento_1
-from requerimiento2.req2_similitud import mostrar_requerimiento_2
-from requerimiento3.req3_palabras import mostrar_requerimiento_3
-from requerimiento4.requerimiento4_clustering import mostrar_requerimiento_4
-from requerimiento5.requerimiento5_visualizacion import mostrar_requerimiento_5
+# === VISTAS ===
+# (etiqueta, módulo, función). Solo se importa y ejecuta la vista seleccionada: st.tabs
+# ejecutaría las cinco en cada interacción y cargaría todas sus dependencias al abrir el tablero.
+VISTAS = [
+    ("Requerimiento 1: Unificación y Duplicados", "requerimiento1.req1_unificacion", "mostrar_requerimiento_1"),
+    ("Requerimiento 2: Similitud Textual", "requerimiento2.req2_similitud", "mostrar_requerimiento_2"),
+    ("Requerimiento 3: Palabras Clave y Frecuencia", "requerimiento3.req3_palabras", "mostrar_requerimiento_3"),
+    ("Requerimiento 4: Dendrograma de Similitud", "requerimiento4.requerimiento4_clustering", "mostrar_requerimiento_4"),
+    ("Requerimiento 5: Visualizaciones Avanzadas", "requerimiento5.requerimiento5_visualizacion", "mostrar_requerimiento_5"),
+]
+
+def cargar_vista(modulo, funcion):
+    """Importa el módulo de la vista al seleccionarla (después queda en sys.modules)"""
+    return getattr(importlib.import_module(modulo), funcion)
 
 # === CONFIGURACIÓN GENERAL ===
 
@@ -60,35 +70,18 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
-    # Crear pestañas
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "Requerimiento 1: Unificación y Duplicados",
-        "Requerimiento 2: Similitud Textual",
-        "Requerimiento 3: Palabras Clave y Frecuencia",
-        "Requerimiento 4: Dendrograma de Similitud",
-        "Requerimiento 5: Visualizaciones Avanzadas"
-    ])
-
+    # Navegación: la selección se conserva en session_state entre interacciones
+    etiquetas = [etiqueta for etiqueta, _, _ in VISTAS]
+    seleccion = st.sidebar.radio("Requerimiento", etiquetas, key="vista_seleccionada")
+    _, modulo, funcion = VISTAS[etiquetas.index(seleccion)]
+    mostrar = cargar_vista(modulo, funcion)
 
-    # === PESTAÑA 1 ===
-    with tab1:
+    if modulo == "requerimiento1.req1_unificacion":
         req1_results_dir = os.path.join(PROJECT_ROOT, "resultados", "requerimiento1")
         req1_script = os.path.join(PROJECT_ROOT, "requerimiento1", "scrapy", "MainScrapys.py")
-        mostrar_requerimiento_1(req1_results_dir, req1_script)
-
-    # ===PESTAÑA 2 ===
-    with tab2:
-        mostrar_requerimiento_2(PROJECT_ROOT)
-
-    # ===PESTAÑA 3 ===
-    with tab3:
-        mostrar_requerimiento_3(PROJECT_ROOT)
-    # ===PESTAÑA 4 ===
-    with tab4:
-        mostrar_requerimiento_4(PROJECT_ROOT)
-    # ===PESTAÑA 5 ===
-    with tab5:
-        mostrar_requerimiento_5(PROJECT_ROOT)
+        mostrar(req1_results_dir, req1_script)
+    else:
+        mostrar(PROJECT_ROOT)
 
 # === PUNTO DE ENTRADA ===
 if __name__ == "__main__":